@@ -0,0 +1,164 @@
+import datetime
+import re
+
+# ===============================================================
+#  Date / date-range parsing for catalogue text and event dates
+# ===============================================================
+#
+# Understands the formats that show up in rules.txt, pins and seeds:
+#   2025-12-12                      2025-12-12 to 2025-12-14
+#   12 Dec 2025 / 12th December 2025 / Dec 12, 2025
+#   12–14 Dec 2025                  12 Dec – 3 Jan 2026
+#   12/12/2025 (UK order)           December 2025 (whole month)
+#   Nov – Dec 2025 / Dec 2025 – Jan 2026 (whole months)
+#
+# Every match is returned as an inclusive (start, end) pair of dates.
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+_MON = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_YEAR = r"(\d{4})"
+_DASH = r"\s*(?:-|–|—|to|until|till)\s*"
+
+_TIME = r"(?:T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+
+ISO_RANGE = re.compile(
+    rf"\b(\d{{4}}-\d{{2}}-\d{{2}}){_TIME}(?:{_DASH}(\d{{4}}-\d{{2}}-\d{{2}}){_TIME})?\b"
+)
+DMY_RANGE = re.compile(
+    rf"\b{_DAY}(?:\s+{_MON}(?:,?\s+{_YEAR})?)?{_DASH}{_DAY}\s+{_MON},?\s+{_YEAR}\b",
+    re.I,
+)
+MDY_RANGE = re.compile(
+    rf"\b{_MON}\s+{_DAY}(?:{_DASH}(?:{_MON}\s+)?{_DAY})?,?\s+{_YEAR}\b",
+    re.I,
+)
+DMY = re.compile(rf"\b{_DAY}\s+{_MON},?\s+{_YEAR}\b", re.I)
+NUMERIC = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+MONTH_RANGE = re.compile(rf"\b{_MON}(?:\s+{_YEAR})?{_DASH}{_MON}\s+{_YEAR}\b", re.I)
+MONTH_YEAR = re.compile(rf"\b{_MON}\s+{_YEAR}\b", re.I)
+
+
+def _month(name):
+    return MONTHS[name[:3].lower()]
+
+
+def _date(year, month, day):
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+def _span(start, end):
+    if start is None:
+        return None
+    if end is None:
+        end = start
+    if end < start:
+        # "28 Dec – 2 Jan 2026": the start belongs to the previous year
+        start = _date(start.year - 1, start.month, start.day) or start
+    return start, end
+
+
+def _iso(m):
+    start = datetime.date.fromisoformat(m.group(1))
+    end = datetime.date.fromisoformat(m.group(2)) if m.group(2) else None
+    return _span(start, end)
+
+
+def _dmy_range(m):
+    d1, m1, y1, d2, m2, y2 = m.groups()
+    end = _date(y2, _month(m2), d2)
+    start = _date(y1 or y2, _month(m1 or m2), d1)
+    return _span(start, end)
+
+
+def _mdy_range(m):
+    m1, d1, m2, d2, year = m.groups()
+    start = _date(year, _month(m1), d1)
+    end = _date(year, _month(m2 or m1), d2) if d2 else None
+    return _span(start, end)
+
+
+def _dmy(m):
+    d, mon, year = m.groups()
+    return _span(_date(year, _month(mon), d), None)
+
+
+def _numeric(m):
+    d, mon, year = m.groups()
+    return _span(_date(year, mon, d), None)
+
+
+def _month_end(start):
+    nxt = _date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return nxt - datetime.timedelta(days=1)
+
+
+def _month_range(m):
+    m1, y1, m2, y2 = m.groups()
+    end = _date(y2, _month(m2), 1)
+    start = _date(y1 or y2, _month(m1), 1)
+    if start is None or end is None:
+        return None
+    return _span(start, _month_end(end))
+
+
+def _month_year(m):
+    mon, year = m.groups()
+    start = _date(year, _month(mon), 1)
+    if start is None:
+        return None
+    return start, _month_end(start)
+
+
+# Most specific first: a range must win over the single date inside it.
+_PATTERNS = [
+    (ISO_RANGE, _iso),
+    (DMY_RANGE, _dmy_range),
+    (MDY_RANGE, _mdy_range),
+    (DMY, _dmy),
+    (NUMERIC, _numeric),
+    (MONTH_RANGE, _month_range),
+    (MONTH_YEAR, _month_year),
+]
+
+
+def find_date_ranges(text: str):
+    """
+    Return every (start, end) date range found in text, in reading order.
+    """
+    if not isinstance(text, str) or not text:
+        return []
+
+    found = []
+    taken = []
+
+    for pattern, convert in _PATTERNS:
+        for m in pattern.finditer(text):
+            a, b = m.span()
+            if any(a < tb and ta < b for ta, tb in taken):
+                continue
+            try:
+                span = convert(m)
+            except ValueError:
+                span = None
+            if span:
+                taken.append((a, b))
+                found.append((a, span))
+
+    found.sort(key=lambda x: x[0])
+    return [span for _, span in found]
+
+
+def parse_date_range(text: str):
+    """
+    First (start, end) range in text, or None when no date is recognised.
+    """
+    ranges = find_date_ranges(text)
+    return ranges[0] if ranges else None
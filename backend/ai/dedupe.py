@@ -0,0 +1,237 @@
+import functools
+import hashlib
+import os
+import random
+
+from backend.ai.dates import parse_date_range
+from backend.ai.event_index import REGION_ALIASES, tokenize
+
+# ===============================================================
+#  Near-duplicate event detection
+# ===============================================================
+#
+# Events are compared on the normalised tokens of their title and
+# location (years and other bare numbers dropped), so "Winter
+# Wonderland, Hyde Park" and "Hyde Park Winter Wonderland 2025" are the
+# same event. Candidates come from MinHash/LSH buckets, so each event is
+# only checked against the few earlier events sharing a bucket rather
+# than against all of them. A candidate is a duplicate when
+#   - the token Jaccard similarity reaches THRESHOLD,
+#   - the titles agree: one title's tokens all appear in the other event,
+#     or the titles alone reach THRESHOLD ("Christmas Market" and
+#     "Christmas Fair" at the same park are different events),
+#   - the locations agree once generic place words and region names are
+#     set aside ("Greenwich Park" vs "Hyde Park", "Canterbury, Kent" vs
+#     "Rochester, Kent" do not), and
+#   - the dates do not contradict.
+#
+# Duplicates are merged into the first (highest priority) record, which
+# gets the others' missing fields and a "sources" list of their URLs.
+
+NUM_PERM = 36
+BANDS = 12          # 3 rows per band: ~95% recall at Jaccard 0.6
+THRESHOLD = float(os.getenv("POPFINDER_DEDUPE_THRESHOLD", "0.6"))
+MAX_BUCKET = 64     # generic buckets ("christmas market") stop growing here
+
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20251201)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+MERGE_FIELDS = ("title", "date", "location", "description", "url", "category")
+
+# location words that do not tell two venues apart
+GENERIC_PLACE = tokenize(
+    "park parks centre center hall halls garden gardens street road square "
+    "market arena showground ground venue palace house the uk england "
+    + " ".join(REGION_ALIASES)
+)
+
+
+def event_key(ev):
+    return (
+        (ev.get("title") or "").lower().strip(),
+        (ev.get("date") or "").lower().strip(),
+        (ev.get("location") or "").lower().strip(),
+    )
+
+
+def _words(text) -> frozenset:
+    return frozenset(t for t in tokenize(text) if not t.isdigit())
+
+
+def event_tokens(ev) -> frozenset:
+    return _words(f"{ev.get('title') or ''} {ev.get('location') or ''}")
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class _Shape:
+    """
+    What add() compares: all tokens, title tokens, and the distinctive
+    location tokens.
+    """
+    __slots__ = ("tokens", "title", "place")
+
+    def __init__(self, ev):
+        self.title = _words(ev.get("title") or "")
+        self.tokens = self.title | _words(ev.get("location") or "")
+        self.place = _words(ev.get("location") or "") - GENERIC_PLACE
+
+
+def _titles_agree(a, b, threshold):
+    if a.title and (a.title <= b.tokens or (b.title and b.title <= a.tokens)):
+        return True
+    return _jaccard(a.title, b.title) >= threshold
+
+
+def _places_agree(a, b):
+    """
+    Unknown locations match anything; otherwise they must share a
+    distinctive token, or one must be named in the other event.
+    """
+    if not a.place or not b.place:
+        return True
+    return bool(a.place & b.place) or a.place <= b.tokens or b.place <= a.tokens
+
+
+@functools.lru_cache(maxsize=100_000)
+def _token_sig(token):
+    """
+    The token's value under each of the NUM_PERM hash permutations
+    (cached: event vocabularies are small and repeat a lot).
+    """
+    h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+    return tuple((a * h + b) % _PRIME for a, b in _PERMS)
+
+
+def minhash(tokens) -> tuple:
+    return tuple(map(min, zip(*map(_token_sig, tokens))))
+
+
+def _dates_compatible(a, b):
+    """
+    Undated events match anything; dated ones must overlap.
+    """
+    if a is None or b is None:
+        return True
+    return a[0] <= b[1] and b[0] <= a[1]
+
+
+class Deduper:
+    """
+    Incremental deduper: add() events in priority order, then read the
+    merged records().
+    """
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.clusters = []      # lists of member events
+        self._shapes = []       # per cluster: _Shape of its first event
+        self._dates = []        # per cluster: (start, end) or None
+        self._exact = {}        # event_key -> cluster
+        self._same = {}         # (title, tokens, place, dates) -> cluster
+        self._buckets = {}      # (band, band signature) -> [cluster]
+        self.stats = {"events": 0, "merged": 0, "candidates": 0}
+
+    def add(self, ev) -> bool:
+        """
+        True when ev starts a new cluster, False when it was merged into
+        an earlier one.
+        """
+        self.stats["events"] += 1
+
+        key = event_key(ev)
+        if key in self._exact:
+            return self._join(self._exact[key], ev)
+
+        shape = _Shape(ev)
+        tokens = shape.tokens
+        dates = parse_date_range(str(ev.get("date") or ""))
+
+        # the tests below only look at the shape and the dates, so an event
+        # that normalises like an earlier one goes where that one went
+        same = (shape.title, tokens, shape.place, dates)
+        if same in self._same:
+            self._exact[key] = self._same[same]
+            return self._join(self._same[same], ev)
+
+        bands = []
+
+        if tokens:
+            sig = minhash(tokens)
+            bands = [(b, sig[b * ROWS:(b + 1) * ROWS]) for b in range(BANDS)]
+
+            # earliest (highest priority) clusters first
+            candidates = set().union(*(self._buckets.get(band, ()) for band in bands))
+            self.stats["candidates"] += len(candidates)
+
+            for cluster in sorted(candidates):
+                other = self._shapes[cluster]
+                if (
+                    _dates_compatible(dates, self._dates[cluster])
+                    and _jaccard(tokens, other.tokens) >= self.threshold
+                    and _titles_agree(shape, other, self.threshold)
+                    and _places_agree(shape, other)
+                ):
+                    self._exact[key] = self._same[same] = cluster
+                    return self._join(cluster, ev)
+
+        cluster = len(self.clusters)
+        self.clusters.append([ev])
+        self._shapes.append(shape)
+        self._dates.append(dates)
+        self._exact[key] = self._same[same] = cluster
+        for band in bands:
+            bucket = self._buckets.setdefault(band, [])
+            if len(bucket) < MAX_BUCKET:
+                bucket.append(cluster)
+        return True
+
+    def _join(self, cluster, ev):
+        self.clusters[cluster].append(ev)
+        self.stats["merged"] += 1
+        return False
+
+    def records(self) -> list:
+        out = []
+        for members in self.clusters:
+            if len(members) == 1:
+                out.append(members[0])
+            else:
+                out.append(merge_events(members))
+        return out
+
+
+def merge_events(members) -> dict:
+    """
+    One record for a group of duplicates: the first event, with empty
+    fields filled from the others and every member's URL in "sources".
+    Returns a new dict; the members are not modified.
+    """
+    merged = dict(members[0])
+
+    for ev in members[1:]:
+        for field in MERGE_FIELDS:
+            if not merged.get(field) and ev.get(field):
+                merged[field] = ev[field]
+
+    sources = []
+    for ev in members:
+        for src in ev.get("sources") or [ev.get("url")]:
+            if src and src not in sources:
+                sources.append(src)
+    merged["sources"] = sources
+    return merged
+
+
+def dedupe_events(events) -> list:
+    """
+    Events with near-duplicates merged, in first-seen order.
+    """
+    deduper = Deduper()
+    for ev in events:
+        deduper.add(ev)
+    return deduper.records()
@@ -0,0 +1,360 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+
+from backend.ai.dates import find_date_ranges, parse_date_range
+
+# ===============================================================
+#  Local event catalogue index
+# ===============================================================
+#
+# rules.txt, notes.txt, pins.json and seed_events.json are parsed once
+# into flat entries and indexed by token and date. A search then only
+# looks at (and only sends the model) the entries matching its query.
+#
+# The index is persisted next to the other caches and keyed on a hash of
+# its sources, so a restart with unchanged data skips the parse.
+
+INDEX_FILE = os.path.join(os.path.dirname(__file__), "../storage/event_index.json")
+INDEX_FORMAT = 1
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+URL_RE = re.compile(r"https?://[^\s<>\"')\]]+")
+BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "from", "in", "of", "on", "or",
+    "the", "to", "with", "event", "events", "www", "http", "https", "com",
+    "co", "uk", "org",
+}
+
+# A region only matches entries mentioning one of these places.
+REGION_ALIASES = {
+    "london": {
+        "london", "westminster", "camden", "hackney", "greenwich", "stratford",
+        "shoreditch", "southbank", "kensington", "olympia", "excel",
+        "wembley", "alexandra", "hyde", "battersea", "islington",
+    },
+    "kent": {
+        "kent", "bluewater", "canterbury", "maidstone", "margate", "dreamland",
+        "ashford", "folkestone", "dover", "tunbridge", "sevenoaks", "whitstable",
+        "rochester", "chatham", "detling", "ramsgate", "broadstairs",
+    },
+    "birmingham": {"birmingham", "nec", "solihull"},
+    "sussex": {"sussex", "brighton", "goodwood", "chichester", "hove", "eastbourne"},
+    "yorkshire": {"yorkshire", "harrogate", "york", "leeds", "sheffield"},
+}
+
+# Regions that do not narrow the search at all.
+ANY_REGION = {"", "uk", "united kingdom", "all", "any", "anywhere", "nationwide"}
+
+
+def _stem(token):
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text) -> set:
+    """
+    Lowercase, stopword-free, lightly stemmed token set.
+    """
+    if not text:
+        return set()
+    return {
+        _stem(t) for t in TOKEN_RE.findall(str(text).lower())
+        if t not in STOPWORDS and len(t) > 1
+    }
+
+
+def region_tokens(region: str) -> set:
+    """
+    Tokens an entry must contain (any of) to be in the given region.
+    Empty set means "no region filter".
+    """
+    norm = (region or "").strip().lower()
+    if norm in ANY_REGION:
+        return set()
+
+    tokens = tokenize(norm)
+    expanded = set(tokens)
+    for t in tokens:
+        expanded |= {_stem(a) for a in REGION_ALIASES.get(t, ())}
+    return expanded
+
+
+def source_version(rules_text, notes_text, pins, seeds) -> str:
+    """
+    Content hash of the four catalogue sources.
+    """
+    h = hashlib.sha256()
+    for part in (
+        rules_text or "",
+        notes_text or "",
+        json.dumps(pins or [], sort_keys=True),
+        json.dumps(seeds or [], sort_keys=True),
+    ):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+# ===============================================================
+#  PARSING
+# ===============================================================
+
+def _split_blocks(text):
+    """
+    Split free text into blocks: blank lines and bullets start a new
+    block, and so does a second dated line inside one block.
+    """
+    blocks = []
+
+    for para in re.split(r"\n\s*\n", text or ""):
+        current = []
+        dated = False
+
+        for line in para.splitlines():
+            if not line.strip():
+                continue
+            has_date = bool(find_date_ranges(line))
+            if current and (BULLET_RE.match(line) or (dated and has_date)):
+                blocks.append("\n".join(current))
+                current, dated = [], False
+            current.append(line.rstrip())
+            dated = dated or has_date
+
+        if current:
+            blocks.append("\n".join(current))
+
+    return blocks
+
+
+def _as_event(block):
+    """
+    A catalogue line that is itself a JSON event object.
+    """
+    s = BULLET_RE.sub("", block).strip()
+    if not (s.startswith("{") and s.endswith("}")):
+        return None
+    try:
+        ev = json.loads(s)
+    except ValueError:
+        return None
+    return ev if isinstance(ev, dict) and ev.get("title") else None
+
+
+def _event_text(ev):
+    return " ".join(
+        str(ev.get(k) or "")
+        for k in ("title", "location", "region", "category", "description", "url")
+    )
+
+
+def _entry(entry_id, source, text, event=None, date_text=None):
+    dates = parse_date_range(date_text if date_text is not None else text)
+    url = event.get("url") if event else None
+    if not url:
+        m = URL_RE.search(text)
+        url = m.group(0) if m else None
+
+    return {
+        "id": entry_id,
+        "source": source,
+        "text": text,
+        "event": event,
+        "url": url,
+        "start": dates[0].isoformat() if dates else None,
+        "end": dates[1].isoformat() if dates else None,
+        "tokens": sorted(tokenize(text)),
+    }
+
+
+def parse_sources(rules_text, notes_text, pins, seeds):
+    """
+    Turn the raw catalogue sources into a list of index entries, plus the
+    rules.txt lines that are guidance rather than events.
+    """
+    entries = []
+    guidance = []
+
+    for i, block in enumerate(_split_blocks(rules_text)):
+        ev = _as_event(block)
+        if ev:
+            entries.append(_entry(f"r{i}", "rules", _event_text(ev), ev, ev.get("date", "")))
+        elif find_date_ranges(block) or URL_RE.search(block):
+            entries.append(_entry(f"r{i}", "rules", block))
+        else:
+            guidance.append(block)
+
+    for i, block in enumerate(_split_blocks(notes_text)):
+        entries.append(_entry(f"n{i}", "notes", block))
+
+    for source, prefix, items in (("pins", "p", pins), ("seeds", "s", seeds)):
+        if not isinstance(items, list):
+            continue
+        for i, ev in enumerate(items):
+            if isinstance(ev, dict):
+                entries.append(_entry(f"{prefix}{i}", source, _event_text(ev), ev, ev.get("date", "")))
+
+    return entries, guidance
+
+
+# ===============================================================
+#  INDEX
+# ===============================================================
+
+class EventIndex:
+    """
+    Token and date index over parsed catalogue entries.
+    """
+
+    def __init__(self, version, entries, guidance):
+        self.version = version
+        self.entries = {e["id"]: e for e in entries}
+        self.guidance = guidance
+
+        self.postings = {}
+        for e in entries:
+            for t in e["tokens"]:
+                self.postings.setdefault(t, set()).add(e["id"])
+
+        dated = sorted((e["start"], e["id"]) for e in entries if e["start"])
+        self._starts = [s for s, _ in dated]
+        self._by_start = [i for _, i in dated]
+        self._undated = {e["id"] for e in entries if not e["start"]}
+
+    @classmethod
+    def build(cls, rules_text, notes_text, pins, seeds):
+        entries, guidance = parse_sources(rules_text, notes_text, pins, seeds)
+        return cls(source_version(rules_text, notes_text, pins, seeds), entries, guidance)
+
+    def to_json(self):
+        return {
+            "format": INDEX_FORMAT,
+            "version": self.version,
+            "entries": list(self.entries.values()),
+            "guidance": self.guidance,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["version"], data["entries"], data["guidance"])
+
+    # -----------------------------------------------------------
+    # lookups
+    # -----------------------------------------------------------
+
+    def by_source(self, source):
+        return [e for e in self.entries.values() if e["source"] == source]
+
+    def by_tokens(self, tokens) -> dict:
+        """
+        {entry id: number of the given tokens it contains}
+        """
+        hits = {}
+        for t in tokens:
+            for i in self.postings.get(t, ()):
+                hits[i] = hits.get(i, 0) + 1
+        return hits
+
+    def by_date(self, start=None, end=None) -> set:
+        """
+        Ids of dated entries overlapping [start, end]; undated entries are
+        always included since they may be recurring.
+        """
+        hi = len(self._starts) if end is None else bisect.bisect_right(self._starts, end.isoformat())
+        lo = start.isoformat() if start else None
+        ids = {
+            i for i in self._by_start[:hi]
+            if lo is None or self.entries[i]["end"] >= lo
+        }
+        return ids | self._undated
+
+    def lookup(self, region, keywords, start=None, end=None, sources=None):
+        """
+        Entries in the region that overlap [start, end], best keyword match
+        first. Region is a hard filter; keywords only narrow the result
+        when at least one entry matches them.
+        """
+        ids = self.by_date(start, end)
+
+        if sources:
+            ids = {i for i in ids if self.entries[i]["source"] in sources}
+
+        reg = region_tokens(region)
+        if reg:
+            ids &= set(self.by_tokens(reg))
+
+        kw = self.by_tokens(tokenize(keywords))
+        matched = {i for i in ids if i in kw}
+        if matched:
+            ids = matched
+
+        return sorted(
+            (self.entries[i] for i in ids),
+            key=lambda e: (-kw.get(e["id"], 0), e["start"] or "9999", e["id"]),
+        )
+
+
+# ===============================================================
+#  PERSISTENCE
+# ===============================================================
+
+_lock = threading.Lock()
+_current = None
+_current_sources = None
+
+
+def _load_saved(version):
+    try:
+        with open(INDEX_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != INDEX_FORMAT or data.get("version") != version:
+        return None
+    return EventIndex.from_json(data)
+
+
+def _save(index):
+    tmp = INDEX_FILE + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index.to_json(), f, separators=(",", ":"))
+        os.replace(tmp, INDEX_FILE)
+    except OSError:
+        pass
+
+
+def get_index(rules_text, notes_text, pins, seeds) -> EventIndex:
+    """
+    Index for the given sources: the in-memory one if the data is
+    unchanged, else the saved one, else a fresh build (which is saved).
+    """
+    global _current, _current_sources
+
+    sources = (rules_text, notes_text, pins, seeds)
+
+    with _lock:
+        # the remote cache hands back the very same objects while the
+        # data is unchanged, so skip even hashing them
+        if _current_sources is not None and all(a is b for a, b in zip(sources, _current_sources)):
+            return _current
+
+        version = source_version(*sources)
+        if _current is not None and _current.version == version:
+            _current_sources = sources
+            return _current
+
+        index = _load_saved(version)
+        if index is None:
+            index = EventIndex.build(rules_text, notes_text, pins, seeds)
+            _save(index)
+
+        _current = index
+        _current_sources = sources
+        return index
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import re
+
+from bs4 import BeautifulSoup, NavigableString
+
+from backend.ai.tokens import estimate_tokens, truncate_to_tokens
+
+# ===============================================================
+#  Page reducer: only event-relevant text goes to the model
+# ===============================================================
+#
+# Drops scripts, navigation, footers, cookie banners and similar
+# boilerplate, splits what is left into text blocks, drops repeated
+# blocks, and keeps the blocks that carry a title, date, venue or price
+# first until the token budget is used up. The kept blocks are returned
+# in page order.
+
+TOKEN_BUDGET = int(os.getenv("POPFINDER_EXTRACT_TOKENS", "1500"))
+
+DROP_TAGS = [
+    "script", "style", "noscript", "template", "svg", "iframe", "canvas",
+    "nav", "footer", "aside", "form", "button", "select", "input",
+]
+
+# Whole class / id / role words ("cookie-banner" -> cookie, banner).
+# Elements named with a BOILERPLATE word are always dropped; those named
+# with a LAYOUT word (and <header>) only when they carry no heading,
+# date, price or venue, since event pages put the event's own details
+# in "event-header" or "hero-banner" blocks.
+BOILERPLATE = {
+    "cookie", "cookies", "consent", "gdpr", "newsletter", "subscribe",
+    "signup", "modal", "popup", "advert", "advertisement", "ad", "ads",
+}
+LAYOUT = {
+    "banner", "navbar", "nav", "menu", "footer", "header", "breadcrumb",
+    "breadcrumbs", "share", "social", "sidebar", "promo", "related",
+}
+
+BLOCK_TAGS = {
+    "h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "td", "th", "dt", "dd",
+    "address", "time", "div", "section", "article", "main", "blockquote",
+    "figcaption", "caption", "summary", "span",
+}
+HEADINGS = {"h1", "h2", "h3", "h4"}
+
+DATE_SIGNAL = re.compile(
+    r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b|"
+    r"\b(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*day\b|"
+    r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b|\b\d{1,2}(?::\d{2})?\s?(?:am|pm)\b",
+    re.I,
+)
+PRICE_SIGNAL = re.compile(r"£\s?\d|\bfree\b|\btickets?\b|\bprice|\bentry\b|\badmission\b", re.I)
+VENUE_SIGNAL = re.compile(
+    r"\bvenue\b|\blocation\b|\baddress\b|\bhall\b|\bcentre\b|\bpark\b|\bstreet\b|"
+    r"\broad\b|\b[A-Z]{1,2}\d[A-Z\d]?\s*\d[A-Z]{2}\b",
+    re.I,
+)
+
+
+def _attr_words(el) -> set:
+    attrs = " ".join(el.get("class") or []) + " " + (el.get("id") or "") + " " + (el.get("role") or "")
+    attrs = re.sub(r"([a-z])([A-Z])", r"\1 \2", attrs)
+    return set(re.split(r"[^a-z0-9]+", attrs.lower())) - {""}
+
+
+def _has_event_details(el) -> bool:
+    if el.find(HEADINGS) is not None:
+        return True
+    text = el.get_text(" ", strip=True)
+    return bool(DATE_SIGNAL.search(text) or PRICE_SIGNAL.search(text) or VENUE_SIGNAL.search(text))
+
+
+def _is_boilerplate(el) -> bool:
+    if el.name in ("body", "html", "main", "article"):
+        return False
+    words = _attr_words(el)
+    if words & BOILERPLATE:
+        return True
+    if el.name == "header" or words & LAYOUT:
+        return not _has_event_details(el)
+    return False
+
+
+def _blocks(soup):
+    """
+    (tag name, text) for every leaf block, in page order.
+    """
+    out = []
+    for el in soup.find_all(BLOCK_TAGS):
+        if el.find(BLOCK_TAGS) is None:
+            text = el.get_text(" ", strip=True)
+        else:
+            # container: only its own loose text, children are visited separately
+            text = " ".join(
+                s.strip() for s in el.children
+                if isinstance(s, NavigableString) and s.strip()
+            )
+        if text:
+            out.append((el.name, re.sub(r"\s+", " ", text)))
+    return out
+
+
+def _score(tag, text) -> int:
+    score = 0
+    if tag in HEADINGS:
+        score += 3
+    if DATE_SIGNAL.search(text):
+        score += 3
+    if PRICE_SIGNAL.search(text):
+        score += 2
+    if VENUE_SIGNAL.search(text):
+        score += 2
+    return score
+
+
+def reduce_page(html: str, budget: int = TOKEN_BUDGET):
+    """
+    Returns (text, stats) where text fits in `budget` tokens and stats is
+    {"tokens_before", "tokens_after", "blocks", "duplicates", "kept"}.
+    html may be an already parsed BeautifulSoup; boilerplate is removed
+    from it in place.
+    """
+    soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html or "", "html.parser")
+    tokens_before = estimate_tokens(soup.get_text(" ", strip=True))
+
+    title = soup.title.get_text(" ", strip=True) if soup.title else ""
+
+    for el in soup.find_all(DROP_TAGS):
+        el.decompose()
+    for el in soup.find_all(True):
+        if not el.decomposed and _is_boilerplate(el):
+            el.decompose()
+
+    seen = set()
+    blocks = []
+    duplicates = 0
+
+    for tag, text in ([("title", title)] if title else []) + _blocks(soup):
+        key = hashlib.md5(text.lower().encode("utf-8")).digest()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        blocks.append((len(blocks), tag, text))
+
+    # best blocks first (title/headings/dates/prices/venues), then page order
+    ranked = sorted(
+        blocks,
+        key=lambda b: (b[1] != "title", -_score(b[1], b[2]), b[0]),
+    )
+
+    kept = []
+    used = 0
+    for pos, tag, text in ranked:
+        remaining = budget - used
+        if remaining <= 0:
+            break
+        cost = estimate_tokens(text) + 1
+        if cost > remaining:
+            text = truncate_to_tokens(text, remaining - 1)
+            if not text:
+                continue
+            cost = estimate_tokens(text) + 1
+        kept.append((pos, text))
+        used += cost
+
+    kept.sort()
+    text = "\n".join(t for _, t in kept)
+
+    return text, {
+        "tokens_before": tokens_before,
+        "tokens_after": estimate_tokens(text),
+        "blocks": len(blocks),
+        "duplicates": duplicates,
+        "kept": len(kept),
+    }
+
+
+def reduce_text(text: str, budget: int = TOKEN_BUDGET):
+    """
+    Plain-text fallback when no HTML is available: just the budget cut.
+    """
+    reduced = truncate_to_tokens(text or "", budget)
+    return reduced, {
+        "tokens_before": estimate_tokens(text),
+        "tokens_after": estimate_tokens(reduced),
+        "blocks": 1,
+        "duplicates": 0,
+        "kept": 1,
+    }
@@ -0,0 +1,223 @@
+import json
+import os
+import re
+
+from backend.ai.tokens import estimate_tokens, truncate_to_tokens
+from backend.metrics import PROMPT_TOKENS
+
+# ===============================================================
+#  smart_event_search prompt
+# ===============================================================
+#
+# Laid out for prompt-prefix caching: the fixed instructions and output
+# format come first, then the rules.txt guidance (same for every query
+# until rules.txt changes), then the matched catalogue entries in
+# canonical (index id) order, then notes, and only at the very end the
+# per-query fields. JSON is minified, repeated entries and notes are
+# dropped, and the whole prompt is kept within PROMPT_BUDGET estimated
+# tokens: catalogue entries are admitted in relevance order until the
+# budget is used, notes get what is left (at most NOTES_SHARE of it).
+# A catalogue too big for one prompt can instead be split into several
+# prompts (shards) along entry boundaries, each with the same prefix.
+
+PROMPT_BUDGET = int(os.getenv("POPFINDER_PROMPT_TOKENS", "6000"))
+NOTES_SHARE = 0.2
+
+CATALOGUE_TITLE = "CATALOGUE ENTRIES (EVENT LIST)"
+NOTES_TITLE = "NOTES.TXT (optional hints)"
+
+# footfall_score / vendor_fit_score are filled in locally (ranker.py)
+OUTPUT_EXAMPLE = [{
+    "title": "",
+    "date": "",
+    "location": "",
+    "description": "",
+    "url": "",
+    "category": "",
+}]
+
+# ===========================================================
+# GPT Prompt — DO NOT change unless updating system behaviour
+# ===========================================================
+INSTRUCTIONS = """You are PopFinder, the UK’s vendor event extraction AI.
+
+CRITICAL RULE:
+The catalogue entries below are the REAL event data (the entries of rules.txt matching the user query).
+You must ONLY extract events that appear inside these entries.
+You MUST NOT create or invent any new events.
+You MUST NOT guess URLs.
+You MUST NOT hallucinate.
+
+Your job:
+1. Read the catalogue entries.
+2. Extract ALL real events with:
+   - real title
+   - real date or date range
+   - real venue/location
+   - real URL from the text
+3. Filter by region + keyword (see USER QUERY at the end) if relevant.
+4. Future dates only.
+5. Remove any duplicates.
+6. Output ONLY 12–24 events MAX, sorted by relevance.
+
+---------------------------
+OUTPUT FORMAT RULES
+---------------------------
+Return ONLY a JSON array:
+""" + json.dumps(OUTPUT_EXAMPLE, separators=(",", ":")) + """
+
+NO commentary.
+NO markdown.
+NO text outside JSON.
+"""
+
+
+def minify_json(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+
+
+def _section(title, body):
+    return f"---------------------------\n{title}\n---------------------------\n{body}\n"
+
+
+def _norm(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _clean(text):
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+# the two section headers and the newlines between sections; estimates
+# of whitespace-separated parts add up to at least the whole's
+FRAME_TOKENS = estimate_tokens(_section(CATALOGUE_TITLE, "")) + estimate_tokens(_section(NOTES_TITLE, "")) + 1
+
+
+def _entry_order(entry):
+    """
+    'r12' -> ('r', 12): index ids in numeric order.
+    """
+    m = re.match(r"([a-z]+)(\d+)$", entry["id"])
+    return (m.group(1), int(m.group(2))) if m else (entry["id"], 0)
+
+
+def _entry_text(entry):
+    return minify_json(entry["event"]) if entry.get("event") else _clean(entry["text"])
+
+
+def _pack(items, capacity, max_shards):
+    """
+    Split (entry, text, cost) items, most relevant first, into at most
+    max_shards lists of total cost <= capacity. Items are never split;
+    an item that fits nowhere is dropped. Returns (shards, dropped).
+    """
+    shards = [[]]
+    used = [0]
+    dropped = 0
+    for item in items:
+        cost = item[2]
+        for i, u in enumerate(used):
+            if u + cost <= capacity:
+                shards[i].append(item)
+                used[i] += cost
+                break
+        else:
+            if cost > capacity or len(shards) >= max_shards:
+                dropped += 1
+                continue
+            shards.append([item])
+            used.append(cost)
+    return [s for s in shards if s], dropped
+
+
+def build_search_prompts(entries, guidance, hints, region, keywords, today, budget=PROMPT_BUDGET, max_shards=1):
+    """
+    entries: catalogue index entries, most relevant first.
+    guidance: rules.txt guidance lines. hints: notes texts.
+    Returns (prompts, stats): one prompt per shard of the catalogue, each
+    within budget and sharing the same prefix; at most max_shards.
+    """
+    query = _section("USER QUERY", f"Region: {region}\nKeywords: {keywords}\nToday: {today}")
+    head = INSTRUCTIONS + "\n" + _section("RULES.TXT GUIDANCE", _clean("\n".join(guidance)))
+    fixed = estimate_tokens(head) + estimate_tokens(query) + FRAME_TOKENS
+
+    # rules.txt guidance alone over budget: keep its beginning
+    if fixed > budget:
+        head = truncate_to_tokens(head, max(budget - estimate_tokens(query) - FRAME_TOKENS, 0))
+        fixed = estimate_tokens(head) + estimate_tokens(query) + FRAME_TOKENS
+
+    capacity = budget - fixed
+
+    # catalogue: most relevant first, split along entry boundaries
+    seen = set()
+    items = []
+    duplicates = 0
+    for entry in entries:
+        text = _entry_text(entry)
+        key = _norm(text)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        items.append((entry, text, estimate_tokens(text) + 1))
+
+    shards, dropped = _pack(items, capacity, max(max_shards, 1))
+    if not shards:
+        shards = [[]]
+
+    hint_texts = []
+    for hint in hints:
+        text = _clean(hint)
+        key = _norm(text)
+        if not key or key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        hint_texts.append(text)
+
+    prompts = []
+    notes_total = 0
+    for shard in shards:
+        # notes: whatever the shard leaves, capped
+        notes_budget = min(capacity - sum(cost for _, _, cost in shard), int(budget * NOTES_SHARE))
+        notes = []
+        for text in hint_texts:
+            cost = estimate_tokens(text) + 1
+            if cost > notes_budget:
+                continue
+            notes.append(text)
+            notes_budget -= cost
+        notes_total = max(notes_total, len(notes))
+
+        catalogue = "\n\n".join(text for _, text, _ in sorted(shard, key=lambda c: _entry_order(c[0])))
+        prompts.append(
+            head + "\n"
+            + _section(CATALOGUE_TITLE, catalogue) + "\n"
+            + _section(NOTES_TITLE, "\n\n".join(notes)) + "\n"
+            + query
+        )
+
+    sizes = [estimate_tokens(p) for p in prompts]
+    for size in sizes:
+        PROMPT_TOKENS.observe(size, prompt="search")
+
+    stats = {
+        "prompt_tokens": sum(sizes),
+        "prompt_chars": sum(len(p) for p in prompts),
+        "shards": len(prompts),
+        "shard_entries": [len(s) for s in shards],
+        "entries": sum(len(s) for s in shards),
+        "entries_dropped": dropped,
+        "notes": notes_total,
+        "notes_dropped": len(hint_texts) - notes_total,
+        "duplicates": duplicates,
+    }
+    return prompts, stats
+
+
+def build_search_prompt(entries, guidance, hints, region, keywords, today, budget=PROMPT_BUDGET):
+    """
+    Single-prompt form of build_search_prompts. Returns (prompt, stats).
+    """
+    prompts, stats = build_search_prompts(entries, guidance, hints, region, keywords, today, budget)
+    return prompts[0], stats
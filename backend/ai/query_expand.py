@@ -1,8 +1,15 @@
 from backend.open_client import client
-from backend.ai.json_utils import clean_json
-import json
+from backend.ai.json_utils import salvage_json_array
+from backend.metrics import MODEL_CALLS, Timings, record_salvage, record_usage
+import logging
+
+log = logging.getLogger(__name__)
+
+EXPAND_MODEL = "gpt-4.1-mini"
 
 def generate_urls(keywords: str, region: str):
+    t = Timings("expand")
+
     prompt = f"""
     Generate 5 URLs related to events matching:
     - keywords: {keywords}
@@ -11,20 +18,28 @@ def generate_urls(keywords: str, region: str):
     Return ONLY a JSON array of strings.
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[{"role": "user", "content": prompt}]
-    )
+    try:
+        with t.stage("model"):
+            response = client.chat.completions.create(
+                model=EXPAND_MODEL,
+                messages=[{"role": "user", "content": prompt}]
+            )
+    except Exception:
+        MODEL_CALLS.inc(call="expand", model=EXPAND_MODEL, outcome="error")
+        raise
+
+    tokens_in, tokens_out = record_usage("expand", EXPAND_MODEL, response.usage)
+    t.note(tokens_in=tokens_in, tokens_out=tokens_out)
 
     raw = response.choices[0].message.content
-    print("\n=== RAW GPT URL RESPONSE ===")
-    print(raw)
-    print("============================\n")
+    log.debug("expand raw model output: %s", raw)
 
-    cleaned = clean_json(raw)
+    with t.stage("parse"):
+        items, salvage = salvage_json_array(raw)
+    record_salvage("expand", salvage)
+    if salvage["salvaged"] or salvage["lost"] or salvage["truncated"]:
+        t.note(salvaged=salvage["salvaged"], lost=salvage["lost"], truncated=salvage["truncated"])
 
-    try:
-        return json.loads(cleaned)
-    except:
-        print("JSON PARSE FAILED")
-        return []
+    urls = [u for u in items if isinstance(u, str)]
+    t.done(log, keywords=keywords, region=region, urls=len(urls))
+    return urls
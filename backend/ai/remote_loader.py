@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+
+from backend.ai.single_flight import SingleFlight
+from backend.metrics import REMOTE_SECONDS
+
+# ===============================================================
+#  Async loader for the remote data files
+# ===============================================================
+#
+# One pooled AsyncClient is shared by every search, so connections to
+# the data host are kept alive and reused, and all sources of a search
+# are fetched concurrently instead of one after another.
+#
+# Responses are kept (parsed) in memory and revalidated with
+# If-None-Match / If-Modified-Since at most every REVALIDATE_AFTER
+# seconds. The raw bodies are also saved to disk so the last good copy
+# is served when the origin is down, even right after a restart.
+#
+# Saves run in worker threads and may overlap: each one writes its own
+# temp file, and a snapshot older than the one already on disk is
+# dropped instead of replacing it.
+
+TIMEOUT = 8
+MAX_CONNECTIONS = 20
+REVALIDATE_AFTER = int(os.getenv("POPFINDER_REVALIDATE_AFTER", "60"))
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), "../storage/remote_cache.json")
+
+log = logging.getLogger(__name__)
+
+_client = None
+
+# url -> {"etag", "last_modified", "body", "checked", "value"}
+_entries = None
+_stats = {"fresh": 0, "not_modified": 0, "downloaded": 0, "stale": 0, "failed": 0}
+_flight = SingleFlight()
+
+_save_lock = threading.Lock()
+_generations = itertools.count(1)
+_saved_generation = 0
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+            ),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ---------------------------------------------------------------
+# revalidating cache
+# ---------------------------------------------------------------
+
+def _load_entries():
+    global _entries
+    if _entries is None:
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                _entries = json.load(f)
+        except (OSError, ValueError):
+            _entries = {}
+        for entry in _entries.values():
+            entry["checked"] = 0
+    return _entries
+
+
+def _save_entries(snapshot, generation):
+    global _saved_generation
+    with _save_lock:
+        if generation <= _saved_generation:
+            return
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(
+                dir=os.path.dirname(CACHE_FILE),
+                prefix=os.path.basename(CACHE_FILE) + ".",
+                suffix=".tmp",
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, CACHE_FILE)
+            _saved_generation = generation
+        except OSError:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+
+def _parse(body, kind):
+    return json.loads(body) if kind == "json" else body
+
+
+def _value(entry, kind):
+    if "value" not in entry:
+        entry["value"] = _parse(entry["body"], kind)
+    return entry["value"]
+
+
+async def fetch_cached(url: str, kind: str = "text"):
+    """
+    Body of url ("text") or its parsed JSON ("json"), served from memory
+    while fresh, revalidated with a conditional GET once stale, and
+    falling back to the last good copy if the origin fails.
+    """
+    entry = _load_entries().get(url)
+
+    if entry and time.time() - entry["checked"] < REVALIDATE_AFTER:
+        _stats["fresh"] += 1
+        return _value(entry, kind)
+
+    # concurrent searches share one revalidation per url
+    return await _flight.do((url, kind), lambda: _revalidate(url, kind))
+
+
+async def _revalidate(url, kind):
+    entries = _load_entries()
+    entry = entries.get(url)
+    now = time.time()
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        r = await get_client().get(url, headers=headers)
+
+        if r.status_code == 304 and entry:
+            entry["checked"] = now
+            _stats["not_modified"] += 1
+            return _value(entry, kind)
+
+        r.raise_for_status()
+        value = _parse(r.text, kind)
+
+    except Exception as e:
+        if entry:
+            # back off: keep serving this copy until the next revalidation
+            entry["checked"] = now
+            _stats["stale"] += 1
+            log.warning("serving last good copy of %s: %s", url, e)
+            return _value(entry, kind)
+        _stats["failed"] += 1
+        return [] if kind == "json" else ""
+
+    entries[url] = {
+        "etag": r.headers.get("etag"),
+        "last_modified": r.headers.get("last-modified"),
+        "body": r.text,
+        "checked": now,
+        "value": value,
+    }
+    _stats["downloaded"] += 1
+
+    snapshot = {
+        u: {k: e[k] for k in ("etag", "last_modified", "body")}
+        for u, e in entries.items()
+    }
+    await asyncio.to_thread(_save_entries, snapshot, next(_generations))
+    return value
+
+
+def cache_stats() -> dict:
+    return dict(_stats)
+
+
+async def fetch_text(url: str) -> str:
+    return await fetch_cached(url, "text")
+
+
+async def fetch_json(url: str):
+    return await fetch_cached(url, "json")
+
+
+async def _timed(name, coro):
+    start = time.perf_counter()
+    result = await coro
+    return name, result, time.perf_counter() - start
+
+
+async def load_all(sources: dict):
+    """
+    Fetch {name: (url, "text" | "json")} concurrently.
+    Returns ({name: data}, {name: seconds}).
+    """
+    jobs = [
+        _timed(name, fetch_json(url) if kind == "json" else fetch_text(url))
+        for name, (url, kind) in sources.items()
+    ]
+
+    data = {}
+    timings = {}
+    for name, result, elapsed in await asyncio.gather(*jobs):
+        data[name] = result
+        timings[name] = elapsed
+
+    for name, elapsed in timings.items():
+        REMOTE_SECONDS.observe(elapsed, source=name)
+
+    log.info(
+        "remote sources loaded: %s",
+        " ".join(f"{n}={t * 1000:.0f}ms" for n, t in timings.items()),
+    )
+    return data, timings
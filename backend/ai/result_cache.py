@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from backend.ai.event_index import tokenize
+
+# ===============================================================
+#  /search result cache
+# ===============================================================
+#
+# Bounded LRU with a TTL. Keys combine the normalised query with the
+# content version of the loaded data, so a change to rules/notes/pins/
+# seeds simply stops old entries from being hit (they age out).
+
+MAX_SIZE = int(os.getenv("POPFINDER_RESULT_CACHE_SIZE", "256"))
+TTL = int(os.getenv("POPFINDER_RESULT_CACHE_TTL", str(60 * 10)))  # 10 minutes
+
+
+def normalize_query(text: str) -> str:
+    """
+    Order-, case- and plural-insensitive form of a query string.
+    "Christmas Markets London" == "london christmas market"
+    """
+    return " ".join(sorted(tokenize(text)))
+
+
+def make_key(region: str, keywords: str, version: str, today: str) -> tuple:
+    return (normalize_query(region), normalize_query(keywords), version, today)
+
+
+class ResultCache:
+    def __init__(self, max_size=MAX_SIZE, ttl=TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored, value = entry
+                if time.time() - stored < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+search_cache = ResultCache()
@@ -0,0 +1,131 @@
+import os
+import re
+
+from backend.ai.dates import find_date_ranges
+from backend.ai.event_index import BULLET_RE, URL_RE
+
+# ===============================================================
+#  Search routing
+# ===============================================================
+#
+# Output tokens dominate search latency, so the model is only asked for
+# as much output as the candidate set can fill:
+#
+#   index  every candidate is already a structured event: no model call
+#   local  at most LOCAL_MAX catalogue blocks, all in the usual
+#          "Title — Venue — Date" form: formatted here, no model call
+#   small  at most SMALL_MAX blocks: SMALL_MODEL, output budget sized to
+#          the blocks in each prompt, capped at SMALL_OUTPUT_MAX
+#   large  anything broader: LARGE_MODEL, capped at LARGE_OUTPUT_MAX
+
+LOCAL_MAX = int(os.getenv("POPFINDER_ROUTE_LOCAL_MAX", "8"))
+SMALL_MAX = int(os.getenv("POPFINDER_ROUTE_SMALL_MAX", "40"))
+
+LARGE_MODEL = os.getenv("POPFINDER_SEARCH_MODEL", "gpt-4.1-mini")
+SMALL_MODEL = os.getenv("POPFINDER_SEARCH_MODEL_SMALL", "gpt-4.1-nano")
+
+# one event in the output format is ~100 tokens of minified JSON; the
+# large route allows room for long descriptions, so a full MAX_EVENTS
+# answer reaches LARGE_OUTPUT_MAX
+TOKENS_PER_EVENT = {"small": 120, "large": 200}
+OUTPUT_BASE = 200
+SMALL_OUTPUT_MAX = 2000
+LARGE_OUTPUT_MAX = 5000
+
+# the model is told to return at most this many events
+MAX_EVENTS = 24
+
+SEP_RE = re.compile(r"\s+[—–|]\s+|\s+-\s+")
+MAX_TITLE = 120
+
+CATEGORIES = (
+    ("christmas market", "christmas market"),
+    ("market", "market"),
+    ("festival", "festival"),
+    ("fair", "fair"),
+    ("show", "show"),
+    ("expo", "trade show"),
+    ("exhibition", "trade show"),
+    ("carnival", "festival"),
+    ("fete", "fair"),
+)
+
+
+def choose_route(entries):
+    """
+    (route, model, events) for the unparsed catalogue matches of a
+    search; events is the locally formatted list for "index" and
+    "local", None when the model is needed.
+    """
+    if not entries:
+        return "index", None, []
+    if len(entries) <= LOCAL_MAX:
+        events = format_entries(entries)
+        if events is not None:
+            return "local", None, events
+    if len(entries) <= SMALL_MAX:
+        return "small", SMALL_MODEL, None
+    return "large", LARGE_MODEL, None
+
+
+def output_budget(route: str, entries: int) -> int:
+    """
+    max_output_tokens for one prompt holding `entries` catalogue blocks.
+    """
+    cap = LARGE_OUTPUT_MAX if route == "large" else SMALL_OUTPUT_MAX
+    return min(cap, OUTPUT_BASE + TOKENS_PER_EVENT[route] * min(entries, MAX_EVENTS))
+
+
+def _category(text):
+    text = text.lower()
+    for word, category in CATEGORIES:
+        if word in text:
+            return category
+    return ""
+
+
+def format_entry(entry):
+    """
+    Event dict for a "Title — Venue — Date / description URL" catalogue
+    block, or None when the block does not have that shape.
+    """
+    if not entry.get("start"):
+        return None
+
+    lines = [BULLET_RE.sub("", line).strip() for line in entry["text"].splitlines() if line.strip()]
+    if not lines:
+        return None
+
+    parts = [
+        p.strip() for p in SEP_RE.split(lines[0])
+        if p.strip() and not find_date_ranges(p) and not URL_RE.search(p)
+    ]
+    if not parts or len(parts[0]) > MAX_TITLE:
+        return None
+
+    title = parts[0]
+    location = parts[1] if len(parts) > 1 else ""
+    description = " ".join(filter(None, (URL_RE.sub("", line).strip() for line in lines[1:])))
+    start, end = entry["start"], entry["end"] or entry["start"]
+
+    return {
+        "title": title,
+        "date": start if start == end else f"{start} to {end}",
+        "location": location,
+        "description": description,
+        "url": entry.get("url") or "",
+        "category": _category(title) or _category(description),
+    }
+
+
+def format_entries(entries):
+    """
+    All entries formatted locally, or None if any of them needs the model.
+    """
+    events = []
+    for entry in entries:
+        ev = format_entry(entry)
+        if ev is None:
+            return None
+        events.append(ev)
+    return events
@@ -1,20 +1,10 @@
-import hashlib
+from backend.ai.ranker import score_events
 
-def score_event(event):
+
+def score_event(event, region: str = "", keywords: str = ""):
     """
-    Simple ranking heuristic.
-    Event must be a dict.
+    Ranker score for one event (see ranker.py; score a whole list with
+    ranker.score_events). Returns a scored copy; the event dict is not
+    modified.
     """
-
-    raw = event.get("raw", "") or ""
-    title = event.get("title", "") or ""
-
-    # crude scoring
-    score = len(title) + len(raw)
-
-    # fallback consistent hash if empty
-    if score == 0:
-        score = int(hashlib.md5(raw.encode()).hexdigest(), 16) % 100
-
-    event["score"] = score
-    return event
+    return score_events([event], region, keywords)[0]
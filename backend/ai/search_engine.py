@@ -1,253 +1,477 @@
-import json
-import requests
+import asyncio
 import datetime
-from openai import OpenAI
-
-client = OpenAI()
+import logging
+import os
+import time
+from openai import AsyncOpenAI
+
+from backend.ai.dedupe import Deduper, dedupe_events
+from backend.ai.event_index import get_index, region_tokens, tokenize
+from backend.ai.json_utils import JsonArrayStream, salvage_json_array
+from backend.ai.prompt_builder import build_search_prompts
+from backend.ai.ranker import rank_events, score_events
+from backend.ai.remote_loader import fetch_json, fetch_text, load_all
+from backend.ai.result_cache import make_key, normalize_query, search_cache
+from backend.ai.routing import MAX_EVENTS, choose_route, output_budget
+from backend.ai.single_flight import SingleFlight
+from backend.ai.validator import url_is_trusted, validate_events
+from backend.executor import executor
+from backend.metrics import (
+    MODEL_CALLS, SEARCH_ROUTES, STAGE_SECONDS, Timings, record_salvage, record_usage, usage_cost,
+)
+from backend.storage.notes import note_log
+from backend.storage.pins import pin_store
+
+client = AsyncOpenAI()
+
+search_flight = SingleFlight()
+
+log = logging.getLogger(__name__)
 
 # ===============================================================
 #  CONFIG — Remote data directories
 # ===============================================================
 
-BASE_URL = "https://pos.kartingcentral.co.uk/home/download/pos2/pos2/popfinder/backend/data"
+BASE_URL = os.getenv(
+    "POPFINDER_DATA_URL",
+    "https://pos.kartingcentral.co.uk/home/download/pos2/pos2/popfinder/backend/data",
+).rstrip("/")
 
 RULES_URL = f"{BASE_URL}/rules.txt"        # NOW: contains the event list
 NOTES_URL = f"{BASE_URL}/notes.txt"
 PINS_URL  = f"{BASE_URL}/pins.json"
 SEED_URL  = f"{BASE_URL}/seed_events.json"
 
+# model and output budget per search: see backend/ai/routing.py
+
+# local notes (backend/storage/notes.py) passed to the model as hints
+NOTE_HINTS = 10
+
+# Sharded extraction: catalogue matches that do not fit one prompt are
+# split into up to SEARCH_SHARDS prompts (1 = single prompt, drop what
+# does not fit), run at most SHARD_WORKERS at a time per search. The
+# merged results are ranked locally and cut to MAX_MODEL_EVENTS.
+SEARCH_SHARDS = int(os.getenv("POPFINDER_SEARCH_SHARDS", "8"))
+SHARD_WORKERS = int(os.getenv("POPFINDER_SHARD_WORKERS", "4"))
+MAX_MODEL_EVENTS = MAX_EVENTS
+
 
 # ===============================================================
 #  HELPERS
 # ===============================================================
 
-def load_remote(url: str) -> str:
-    try:
-        r = requests.get(url, timeout=8)
-        r.raise_for_status()
-        return r.text
-    except Exception:
-        return ""
+async def load_remote(url: str) -> str:
+    return await fetch_text(url)
 
 
-def load_json_remote(url: str):
-    try:
-        r = requests.get(url, timeout=8)
-        r.raise_for_status()
-        return r.json()
-    except Exception:
-        return []
+async def load_json_remote(url: str):
+    return await fetch_json(url)
 
 
-def url_seems_real(url: str) -> bool:
+async def load_sources():
     """
-    A VERY strict URL checker to prevent hallucinations.
+    Fetch rules, notes, pins and seeds concurrently.
+    Returns (rules_text, notes_text, pins_json, seeds_json, timings).
     """
-    if not isinstance(url, str) or len(url) < 10:
-        return False
+    data, timings = await load_all({
+        "rules": (RULES_URL, "text"),
+        "notes": (NOTES_URL, "text"),
+        "pins":  (PINS_URL, "json"),
+        "seeds": (SEED_URL, "json"),
+    })
+    return data["rules"], data["notes"], data["pins"], data["seeds"], timings
 
-    trusted = [
-        "excel.london", "olympia.london", "thenec.co.uk", "necgroup.co.uk",
-        "eventbrite", "ticketmaster", "see.tickets",
-        "kew.org", "goodwood.com",
-        "bluewater.co.uk", "dreamland.co.uk",
-        "alexandrapalace.com",
-        "visitlondon.com",
-        "hydeparkwinterwonderland.com",
-        "winterlandbluewater.com",
-        "lovefairs.com",
-        "kenteventcentre.co.uk",
-        "harrogateconventioncentre",
-        "brighton", "harrogate"
-    ]
 
-    low = url.lower()
-    return any(t in low for t in trusted)
+def url_seems_real(url: str) -> bool:
+    """
+    A VERY strict URL checker to prevent hallucinations.
+    """
+    return url_is_trusted(url)
 
 
 def filter_future_and_valid(events):
     """
     Final pass filtering for:
-    - future dates
+    - future dates (ranges count until their last day)
     - valid URLs (or titles indicating known market/fair types)
     - banned hallucination patterns
+    Per-rule rejection counts are in validator_stats().
     """
-    today = datetime.date.today()
-    out = []
+    kept, _ = validate_events(events)
+    return kept
 
-    for ev in events:
-        try:
-            raw = ev.get("date", "")
-            first = raw.split(" ")[0]
-            date = datetime.date.fromisoformat(first)
 
-            # Only future events
-            if date < today:
-                continue
+def order_results(pins, others, region: str, keywords: str, today_date):
+    """
+    Pins first (always kept, in their own order), then every other event
+    best first by the local ranker; near-duplicates are merged into the
+    better-placed record. Every event gets its ranker score.
+    """
+    return dedupe_events(
+        score_events(pins, region, keywords, today_date)
+        + rank_events(others, region, keywords, today_date)
+    )
 
-            title = (ev.get("title", "")).lower()
 
-            banned = [
-                "gaming expo", "tech & gaming", "retro gaming",
-                "winter tech expo", "london comics expo"
-            ]
+# ===============================================================
+#  MAIN SEARCH ENGINE
+# ===============================================================
 
-            if any(b in title for b in banned):
-                continue
+async def smart_event_search(region: str, keywords: str):
+    """
+    Main PopFinder engine:
+    - rules.txt = the definitive list of event data (user-provided / GPT-generated)
+    - pinned (remote + local pin store) and seed events also included
+    - only catalogue entries matching the query are looked at (event_index)
+    - identical queries on unchanged data are served from search_cache
+    - identical concurrent queries share one search (search_flight)
+    - NEVER hallucinate
+    """
+    today = datetime.date.today().isoformat()
+    key = (normalize_query(region), normalize_query(keywords), today)
 
-            url = ev.get("url", "")
+    return list(await search_flight.do(key, lambda: _search(region, keywords)))
 
-            if not url_seems_real(url):
-                # allow fairs/markets even if URL is not strong
-                recur = ["festival", "market", "fair", "christmas", "county show"]
-                if not any(r in title for r in recur):
-                    continue
 
-            out.append(ev)
+async def local_sources(region: str, keywords: str, today_date):
+    """
+    Upcoming pins from the local pin store, local notes matching the
+    query, and a version string covering both stores.
+    """
+    def read():
+        pinned = pin_store.list(date_from=today_date.isoformat())
+        hints = [n["text"] for n in note_log.search(f"{region} {keywords}", NOTE_HINTS)]
+        return pinned, hints, f"{pin_store.version()}:{note_log.version()}"
+    return await executor.run(read)
 
-        except Exception:
-            continue
 
-    return out
+async def _search(region: str, keywords: str):
+    t = Timings("search")
+
+    # Load all distributed data sources (concurrently)
+    with t.stage("load_sources"):
+        rules_text, notes_text, pins_json, seeds_json, _ = await load_sources()
+
+    with t.stage("index"):
+        index = await executor.run(get_index, rules_text, notes_text, pins_json, seeds_json)
+    today_date = datetime.date.today()
+    with t.stage("local_sources"):
+        pinned, hints, local_version = await local_sources(region, keywords, today_date)
+
+    key = make_key(region, keywords, f"{index.version}:{local_version}", today_date.isoformat())
+    cached = search_cache.get(key)
+    if cached is not None:
+        t.done(log, region=region, keywords=keywords, cached=True, events=len(cached))
+        return cached
+
+    events, complete = await run_search(index, region, keywords, today_date, pinned, hints, t)
+    if complete:
+        search_cache.put(key, events)
+    t.done(log, region=region, keywords=keywords, cached=False, complete=complete, events=len(events))
+    return events
+
+
+def plan_search(index, region: str, keywords: str, today_date, local_pins=(), local_hints=()):
+    """
+    Candidate set for a query from the local index (plus local_pins, the
+    pin store's upcoming pins, and local_hints, matching local notes).
+    Returns (pins, known, prompts, plan): filtered pinned events,
+    filtered structured (or locally formatted) matches, the model
+    prompts for the rest (one per shard; empty when the route needs no
+    model) and the plan: route, model, max_output_tokens per prompt and
+    the prompt_builder stats.
+    """
+    candidates = index.lookup(region, keywords, start=today_date, sources={"rules", "seeds"})
+    pinned = [e["event"] for e in index.lookup("", "", start=today_date, sources={"pins"})]
+    pinned += local_pins
+
+    known = [e["event"] for e in candidates if e["event"]]
+    unparsed = [e for e in candidates if not e["event"]]
+
+    route, model, local_events = choose_route(unparsed)
+    SEARCH_ROUTES.inc(route=route)
+    plan = {"route": route, "model": model, "candidates": len(unparsed)}
+
+    pins_out = filter_future_and_valid(pinned)
+
+    # Every match is (or could be formatted as) a structured event: no
+    # model call needed
+    if local_events is not None:
+        return pins_out, filter_future_and_valid(local_events + known), [], plan
+
+    known_out = filter_future_and_valid(known)
+
+    prompts, stats = build_prompts(index, unparsed, region, keywords, today_date, local_hints)
+    plan.update(stats)
+    plan["max_output_tokens"] = [output_budget(route, n) for n in stats["shard_entries"]]
+    return pins_out, known_out, prompts, plan
+
+
+def build_prompts(index, unparsed, region: str, keywords: str, today_date, local_hints=()):
+    """
+    Returns (prompts, stats); see prompt_builder.
+    """
+    query_tokens = tokenize(keywords) | region_tokens(region)
+    hinted = index.by_tokens(query_tokens)
+    hints = [e["text"] for e in index.by_source("notes") if e["id"] in hinted]
+    hints += list(local_hints)
+
+    return build_search_prompts(
+        unparsed, index.guidance, hints, region, keywords, today_date.isoformat(),
+        max_shards=SEARCH_SHARDS,
+    )
 
 
 # ===============================================================
-#  MAIN SEARCH ENGINE
+#  MODEL CALLS
 # ===============================================================
 
-def smart_event_search(region: str, keywords: str):
+async def extract(prompt, call: str, model: str, max_output_tokens: int):
     """
-    Main PopFinder engine:
-    - rules.txt = the definitive list of event data (user-provided / GPT-generated)
-    - pinned + seed events also included
-    - NEVER hallucinate
+    One non-streamed model call. Returns (output_text, tokens_in, tokens_out).
     """
+    start = time.perf_counter()
+    try:
+        response = await client.responses.create(
+            model=model,
+            input=prompt,
+            max_output_tokens=max_output_tokens
+        )
+    except Exception:
+        MODEL_CALLS.inc(call=call, model=model, outcome="error")
+        raise
+    STAGE_SECONDS.observe(time.perf_counter() - start, pipeline=call, stage="shard")
+    tokens_in, tokens_out = record_usage(call, model, response.usage)
+    return response.output_text, tokens_in, tokens_out
 
-    # Load all distributed data sources
-    rules_text = load_remote(RULES_URL)        # now used as the event catalogue
-    notes_text = load_remote(NOTES_URL)
-    pins_json  = load_json_remote(PINS_URL)
-    seeds_json = load_json_remote(SEED_URL)
 
-    today = datetime.date.today().isoformat()
+async def extract_shards(prompts, call: str, plan):
+    """
+    Run extract() on every prompt, SHARD_WORKERS at a time, yielding
+    each result as its shard finishes. A failed shard is logged and
+    skipped; if every shard fails the first error is raised.
+    """
+    slots = asyncio.Semaphore(SHARD_WORKERS)
 
-    # ===========================================================
-    # GPT Prompt — DO NOT change unless updating system behaviour
-    # ===========================================================
-    prompt = f"""
-You are PopFinder, the UK’s vendor event extraction AI.
-
-CRITICAL RULE:
-The file rules.txt below contains the REAL event data. 
-You must ONLY extract events that appear inside rules.txt, OR are listed in pinned events OR seed events.
-You MUST NOT create or invent any new events.
-You MUST NOT guess URLs.
-You MUST NOT hallucinate.
-
-Your job:
-1. Read rules.txt event data.
-2. Extract ALL real events with:
-   - real title
-   - real date or date range
-   - real venue/location
-   - real URL from the text
-3. Combine these with pinned events and seed events.
-4. Filter by region + keyword if relevant.
-5. Future dates only.
-6. Remove any duplicates.
-7. Output ONLY 12–24 events MAX, sorted by relevance.
-
----------------------------
-RULES.TXT CONTENT (EVENT LIST)
----------------------------
-{rules_text}
-
----------------------------
-NOTES.TXT (optional hints)
----------------------------
-{notes_text}
-
----------------------------
-PINNED EVENTS (always keep)
----------------------------
-{json.dumps(pins_json)}
-
----------------------------
-SEED EVENTS (verified)
----------------------------
-{json.dumps(seeds_json)}
-
----------------------------
-USER QUERY
----------------------------
-Region: {region}
-Keywords: {keywords}
-Today: {today}
-
----------------------------
-OUTPUT FORMAT RULES
----------------------------
-Return ONLY a JSON array:
-[
-  {{
-    "title": "",
-    "date": "",
-    "location": "",
-    "description": "",
-    "url": "",
-    "category": "",
-    "footfall_score": 0,
-    "vendor_fit_score": 0
-  }}
-]
-
-NO commentary.
-NO markdown.
-NO text outside JSON.
-"""
+    async def one(prompt, max_output_tokens):
+        async with slots:
+            return await extract(prompt, call, plan["model"], max_output_tokens)
 
-    # ===========================================================
-    # Run GPT
-    # ===========================================================
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=prompt,
-        max_output_tokens=5000
+    tasks = [asyncio.ensure_future(one(p, n)) for p, n in zip(prompts, plan["max_output_tokens"])]
+    errors = []
+    try:
+        for done in asyncio.as_completed(tasks):
+            try:
+                result = await done
+            except Exception as e:
+                log.warning("%s: shard failed (%s)", call, e)
+                errors.append(e)
+                continue
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if errors and len(errors) == len(tasks):
+        raise errors[0]
+
+
+def parse_events(text, call: str):
+    """
+    Model output -> (events, complete). Output cut off at
+    max_output_tokens or wrapped in prose still gives every complete
+    event in it; complete is False when anything was lost.
+    """
+    events, salvage = salvage_json_array(text)
+    record_salvage(call, salvage)
+    events = [ev for ev in events if isinstance(ev, dict)]
+    complete = not salvage["lost"] and not salvage["truncated"]
+    if salvage["salvaged"] or not complete:
+        log.warning(
+            "%s: malformed model output, %d events salvaged, %d lost%s", call,
+            salvage["salvaged"], salvage["lost"], " (truncated)" if salvage["truncated"] else "",
+        )
+    return events, complete
+
+
+def note_plan(t, plan):
+    """
+    Route, model and prompt figures for the request's log line.
+    """
+    t.note(route=plan["route"], candidates=plan["candidates"])
+    if plan["model"]:
+        t.note(
+            model=plan["model"],
+            prompt_tokens=plan["prompt_tokens"],
+            shards=plan["shards"],
+            entries_dropped=plan["entries_dropped"],
+            max_output_tokens=sum(plan["max_output_tokens"]),
+        )
+
+
+def note_usage(t, plan, tokens_in, tokens_out):
+    t.note(
+        tokens_in=tokens_in,
+        tokens_out=tokens_out,
+        cost_usd=round(usage_cost(plan["model"], tokens_in, tokens_out), 6),
     )
 
+
+async def run_search(index, region: str, keywords: str, today_date, local_pins=(), local_hints=(), timings=None):
+    """
+    Uncached search over an already loaded index.
+    Returns (events, complete); complete is False when any model output
+    was cut off or malformed; the events salvaged from it and the local
+    matches are still returned.
+    """
+    t = timings or Timings("search")
+
+    with t.stage("plan"):
+        pins_out, known_out, prompts, plan = plan_search(index, region, keywords, today_date, local_pins, local_hints)
+    note_plan(t, plan)
+
+    if not prompts:
+        with t.stage("rank"):
+            return order_results(pins_out, known_out, region, keywords, today_date), True
+
     # ===========================================================
-    # Parse JSON
+    # Run GPT (one call per shard, concurrently) and parse JSON
     # ===========================================================
-    try:
-        events = json.loads(response.output_text)
-        if not isinstance(events, list):
-            raise ValueError("GPT returned non-list JSON")
-    except Exception:
-        return filter_future_and_valid(seeds_json)
+    outputs = []
+    with t.stage("model"):
+        async for output in extract_shards(prompts, "search", plan):
+            outputs.append(output)
+    note_usage(t, plan, sum(o[1] for o in outputs), sum(o[2] for o in outputs))
+
+    with t.stage("parse"):
+        parsed = [parse_events(text, "search") for text, _, _ in outputs]
+    shards_ok = sum(1 for _, complete in parsed if complete)
+    if len(prompts) > 1:
+        t.note(shards_failed=len(prompts) - shards_ok)
 
     # ===========================================================
     # Final cleaning and dedupe
     # ===========================================================
-    cleaned = filter_future_and_valid(events)
-    future_seeds = filter_future_and_valid(seeds_json)
+    with t.stage("validate"):
+        cleaned = filter_future_and_valid([ev for events, _ in parsed for ev in events])
 
-    merged = cleaned + future_seeds
+    # Shards finish in any order and each returns its own best events:
+    # merge them, then keep the most relevant
+    with t.stage("rank"):
+        if len(prompts) > 1:
+            cleaned = rank_events(dedupe_events(cleaned), region, keywords, today_date)[:MAX_MODEL_EVENTS]
+        return order_results(pins_out, cleaned + known_out, region, keywords, today_date), shards_ok == len(prompts)
 
-    # dedupe
-    final = []
-    seen = set()
 
-    for ev in merged:
-        key = (
-            (ev.get("title") or "").lower().strip(),
-            (ev.get("date") or "").lower().strip(),
-            (ev.get("location") or "").lower().strip(),
-        )
+# ===============================================================
+#  STREAMING SEARCH
+# ===============================================================
+
+async def stream_event_search(region: str, keywords: str):
+    """
+    Same results as smart_event_search, yielded one event at a time:
+    pins first, then each model event as soon as its JSON object is
+    complete and passes filter_future_and_valid, then the other matches.
+    A sharded search is not streamed token by token: each shard's
+    events are sent as that shard finishes, up to MAX_MODEL_EVENTS.
+    """
+    t = Timings("stream")
+
+    with t.stage("load_sources"):
+        rules_text, notes_text, pins_json, seeds_json, _ = await load_sources()
+
+    with t.stage("index"):
+        index = await executor.run(get_index, rules_text, notes_text, pins_json, seeds_json)
+    today_date = datetime.date.today()
+    with t.stage("local_sources"):
+        pinned, hints, local_version = await local_sources(region, keywords, today_date)
+
+    key = make_key(region, keywords, f"{index.version}:{local_version}", today_date.isoformat())
+    cached = search_cache.get(key)
+    if cached is not None:
+        t.done(log, region=region, keywords=keywords, cached=True, events=len(cached))
+        for ev in cached:
+            yield ev
+        return
+
+    with t.stage("plan"):
+        pins_out, known_out, prompts, plan = plan_search(index, region, keywords, today_date, pinned, hints)
+    note_plan(t, plan)
+
+    # Events are scored by the ranker as they are sent; near-duplicates
+    # of an event already sent are not sent again. The cached copy gets
+    # the merged records (with "sources") in smart_event_search order.
+    deduper = Deduper()
 
-        if key in seen:
-            continue
+    def fresh(events):
+        return [ev for ev in score_events(events, region, keywords, today_date) if deduper.add(ev)]
 
-        seen.add(key)
-        final.append(ev)
+    for ev in fresh(pins_out):
+        yield ev
+    pinned_count = len(deduper.clusters)
 
-    return final
+    complete = True
+
+    def first_event():
+        if "first_event_ms" not in t.fields:
+            t.note(first_event_ms=round((time.perf_counter() - t.start) * 1000, 1))
+
+    if len(prompts) == 1:
+        parser = JsonArrayStream()
+
+        try:
+            stream = await client.responses.create(
+                model=plan["model"],
+                input=prompts[0],
+                max_output_tokens=plan["max_output_tokens"][0],
+                stream=True
+            )
+        except Exception:
+            MODEL_CALLS.inc(call="stream", model=plan["model"], outcome="error")
+            raise
+
+        # "model" here is time to first event plus the rest of the stream
+        # (including the time the client takes to read what was yielded)
+        model_start = time.perf_counter()
+        async for event in stream:
+            if event.type == "response.completed":
+                note_usage(t, plan, *record_usage("stream", plan["model"], event.response.usage))
+            if event.type != "response.output_text.delta":
+                continue
+            for ev in fresh(filter_future_and_valid(parser.feed(event.delta))):
+                first_event()
+                yield ev
+        t.add("model", time.perf_counter() - model_start)
+
+        complete = parser.closed and not parser.errors
+        record_salvage("stream", {"lost": parser.errors + int(parser.pending)})
+
+    elif prompts:
+        model_start = time.perf_counter()
+        shards_ok = sent = tokens_in = tokens_out = 0
+        async for text, shard_in, shard_out in extract_shards(prompts, "stream", plan):
+            tokens_in += shard_in
+            tokens_out += shard_out
+            events, ok = parse_events(text, "stream")
+            shards_ok += ok
+            for ev in score_events(filter_future_and_valid(events), region, keywords, today_date):
+                if sent >= MAX_MODEL_EVENTS:
+                    break
+                if deduper.add(ev):
+                    sent += 1
+                    first_event()
+                    yield ev
+        t.add("model", time.perf_counter() - model_start)
+        note_usage(t, plan, tokens_in, tokens_out)
+        t.note(shards_failed=len(prompts) - shards_ok)
+
+        complete = shards_ok == len(prompts)
+
+    for ev in fresh(known_out):
+        yield ev
+
+    if complete:
+        records = deduper.records()
+        ranked = sorted(records[pinned_count:], key=lambda ev: -ev["score"])
+        search_cache.put(key, records[:pinned_count] + ranked)
+    t.done(log, region=region, keywords=keywords, cached=False, complete=complete, events=len(deduper.clusters))
@@ -0,0 +1,43 @@
+import asyncio
+
+# ===============================================================
+#  Single-flight request coalescing
+# ===============================================================
+#
+# Concurrent callers asking for the same key share one in-flight
+# computation and all receive its result (or its exception). The work
+# runs as its own task, so a caller that goes away (client disconnect)
+# does not cancel it for the others.
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key, fn):
+        """
+        Await fn() for key, or join the call already running for key.
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.started += 1
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "shared": self.shared,
+            "in_flight": self.in_flight(),
+        }
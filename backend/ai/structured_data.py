@@ -0,0 +1,307 @@
+import json
+import re
+
+from bs4 import BeautifulSoup
+
+# ===============================================================
+#  Deterministic event extraction from schema.org / OpenGraph data
+# ===============================================================
+#
+# Most ticketing and venue pages (Eventbrite, ExCeL, Ticketmaster, ...)
+# already embed their events as schema.org JSON-LD or microdata. Reading
+# those is exact and free, so extract_event only asks the model about
+# pages where nothing is found here.
+
+# schema.org Event subtypes -> PopFinder category
+CATEGORIES = {
+    "festival": "festival",
+    "exhibitionevent": "exhibition",
+    "saleevent": "market",
+    "foodevent": "food & drink",
+    "musicevent": "music",
+    "childrensevent": "family",
+    "businessevent": "trade show",
+    "sportsevent": "sport",
+    "theaterevent": "theatre",
+    "comedyevent": "comedy",
+    "danceevent": "dance",
+    "literaryevent": "literary",
+    "visualartsevent": "arts",
+    "socialevent": "social",
+    "educationevent": "education",
+    "screeningevent": "screening",
+}
+
+MAX_DESCRIPTION = 500
+
+# "source" values of events produced here
+STRUCTURED_SOURCES = ("jsonld", "microdata", "opengraph")
+
+
+def _types(value):
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)] if value else []
+
+
+def _schema_name(t) -> str:
+    """
+    'https://schema.org/MusicEvent' -> 'musicevent'
+    """
+    return t.rstrip("/").split("/")[-1].lower()
+
+
+def _is_event_type(value) -> bool:
+    return any(
+        name.endswith("event") or name == "festival"
+        for name in map(_schema_name, _types(value))
+    )
+
+
+def _category(value) -> str:
+    for name in map(_schema_name, _types(value)):
+        if name in CATEGORIES:
+            return CATEGORIES[name]
+    return "event"
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(_text(v) for v in value if _text(v))
+    if isinstance(value, dict):
+        return _text(value.get("name") or value.get("@value") or "")
+    return re.sub(r"\s+", " ", str(value)).strip()
+
+
+def _plain(value) -> str:
+    """
+    Text of a value that may contain HTML markup (descriptions often do).
+    """
+    s = _text(value)
+    if "<" in s:
+        s = BeautifulSoup(s, "html.parser").get_text(" ", strip=True)
+    return s
+
+
+def _day(value) -> str:
+    """
+    '2025-12-12T10:00:00+00:00' -> '2025-12-12'
+    """
+    s = _text(value)
+    m = re.match(r"\d{4}-\d{2}-\d{2}", s)
+    return m.group(0) if m else s
+
+
+def _date(start, end) -> str:
+    start, end = _day(start), _day(end)
+    if start and end and end != start:
+        return f"{start} to {end}"
+    return start
+
+
+def _address(value) -> str:
+    if isinstance(value, dict):
+        parts = [
+            value.get("streetAddress"), value.get("addressLocality"),
+            value.get("addressRegion"), value.get("postalCode"),
+        ]
+        return ", ".join(_text(p) for p in parts if _text(p))
+    return _text(value)
+
+
+def _location(value) -> str:
+    if isinstance(value, list):
+        return "; ".join(filter(None, (_location(v) for v in value)))
+    if isinstance(value, dict):
+        if value.get("@type") == "VirtualLocation":
+            return "Online"
+        name = _text(value.get("name"))
+        address = _address(value.get("address"))
+        if name and address and name not in address:
+            return f"{name}, {address}"
+        return name or address
+    return _text(value)
+
+
+def _event(title, start, end, location, description, url, category, source):
+    return {
+        "title": title,
+        "date": _date(start, end),
+        "location": location,
+        "description": description[:MAX_DESCRIPTION],
+        "url": url,
+        "category": category,
+        "source": source,
+    }
+
+
+# ---------------------------------------------------------------
+# JSON-LD
+# ---------------------------------------------------------------
+
+def _walk_jsonld(node):
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk_jsonld(item)
+    elif isinstance(node, dict):
+        if _is_event_type(node.get("@type")):
+            yield node
+        for key in ("@graph", "itemListElement", "event", "subEvent", "item"):
+            if key in node:
+                yield from _walk_jsonld(node[key])
+
+
+def _from_jsonld(soup, url):
+    events = []
+
+    for script in soup.find_all("script", type=re.compile(r"ld\+json", re.I)):
+        raw = (script.string or script.get_text() or "").strip()
+        raw = re.sub(r"^\s*(?:<!\[CDATA\[|//\s*<!\[CDATA\[)|(?://\s*)?\]\]>\s*$", "", raw)
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+
+        for node in _walk_jsonld(data):
+            title = _text(node.get("name"))
+            if not title:
+                continue
+            events.append(_event(
+                title,
+                node.get("startDate"),
+                node.get("endDate"),
+                _location(node.get("location")),
+                _plain(node.get("description")),
+                _text(node.get("url")) or url,
+                _category(node.get("@type")),
+                "jsonld",
+            ))
+
+    return events
+
+
+# ---------------------------------------------------------------
+# Microdata
+# ---------------------------------------------------------------
+
+def _prop_value(el):
+    for attr in ("content", "datetime", "href", "src"):
+        if el.get(attr):
+            return el[attr]
+    return el.get_text(" ", strip=True)
+
+
+def _props(scope):
+    """
+    {itemprop: element} for the direct properties of an itemscope
+    (not those of nested itemscopes).
+    """
+    props = {}
+    for el in scope.find_all(attrs={"itemprop": True}):
+        parent = el.find_parent(attrs={"itemscope": True})
+        if parent is not scope:
+            continue
+        for name in el["itemprop"].split():
+            props.setdefault(name, el)
+    return props
+
+
+def _from_microdata(soup, url):
+    events = []
+
+    for scope in soup.find_all(attrs={"itemscope": True, "itemtype": True}):
+        itemtype = scope["itemtype"]
+        if "schema.org" not in itemtype or not _is_event_type(itemtype.split()):
+            continue
+
+        props = _props(scope)
+        title = _text(_prop_value(props["name"])) if "name" in props else ""
+        if not title:
+            continue
+
+        location = ""
+        loc = props.get("location")
+        if loc is not None:
+            if loc.has_attr("itemscope"):
+                lp = _props(loc)
+                name = _text(_prop_value(lp["name"])) if "name" in lp else ""
+                address = _text(_prop_value(lp["address"])) if "address" in lp else ""
+                location = ", ".join(p for p in (name, address) if p)
+            else:
+                location = _text(_prop_value(loc))
+
+        events.append(_event(
+            title,
+            _prop_value(props["startDate"]) if "startDate" in props else "",
+            _prop_value(props["endDate"]) if "endDate" in props else "",
+            location,
+            _plain(_prop_value(props["description"])) if "description" in props else "",
+            _text(_prop_value(props["url"])) if "url" in props else url,
+            _category(itemtype.split()),
+            "microdata",
+        ))
+
+    return events
+
+
+# ---------------------------------------------------------------
+# OpenGraph
+# ---------------------------------------------------------------
+
+def _from_opengraph(soup, url):
+    meta = {}
+    for tag in soup.find_all("meta"):
+        key = (tag.get("property") or tag.get("name") or "").lower()
+        if key and tag.get("content") and key not in meta:
+            meta[key] = tag["content"].strip()
+
+    og_type = meta.get("og:type", "").lower()
+    start = meta.get("event:start_time") or meta.get("og:start_time")
+    if "event" not in og_type and not start:
+        return []
+
+    title = meta.get("og:title")
+    if not title or not start:
+        return []
+
+    return [_event(
+        title,
+        start,
+        meta.get("event:end_time") or meta.get("og:end_time"),
+        meta.get("event:location") or meta.get("og:locality") or meta.get("og:site_name", ""),
+        meta.get("og:description", ""),
+        meta.get("og:url") or url,
+        "event",
+        "opengraph",
+    )]
+
+
+# ---------------------------------------------------------------
+# entry point
+# ---------------------------------------------------------------
+
+def extract_structured_events(html: str, url: str) -> list:
+    """
+    Events declared in the page's JSON-LD, microdata or OpenGraph tags,
+    in PopFinder's event shape. Empty list when the page declares none.
+    """
+    if not html:
+        return []
+
+    soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, "html.parser")
+
+    for extractor in (_from_jsonld, _from_microdata, _from_opengraph):
+        events = extractor(soup, url)
+        if events:
+            seen = set()
+            unique = []
+            for ev in events:
+                key = (ev["title"].lower(), ev["date"], ev["url"])
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(ev)
+            return unique
+
+    return []
@@ -1,24 +1,40 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import json
 import os
 
-from backend.ai.search_engine import smart_event_search
+from backend import metrics
+from backend.ai import ai_cache
+from backend.ai.remote_loader import cache_stats, close_client
+from backend.ai.result_cache import search_cache
+from backend.ai.search_engine import search_flight, smart_event_search, stream_event_search
+from backend.ai.validator import validator_stats
+from backend.collectors import cache_handler
+from backend.executor import ExecutorBusy, executor
+from backend.storage.notes import note_log
+from backend.storage.pins import pin_store
 
 # -----------------------------------------------------------
 # FILE PATHS
 # -----------------------------------------------------------
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 RULES_FILE = os.path.join(DATA_DIR, "rules.txt")
-NOTES_FILE = os.path.join(DATA_DIR, "notes.txt")
-PINS_FILE = os.path.join(DATA_DIR, "pins.json")
+NOTES_PAGE_MAX = 500
+PINS_PAGE_MAX = 500
 
 # -----------------------------------------------------------
 # FASTAPI APP
 # -----------------------------------------------------------
 app = FastAPI()
 
+metrics.register_cache("ai_cache", ai_cache.cache_stats, "content_hits", "content_misses")
+metrics.register_cache("collector_cache", cache_handler.cache_stats)
+metrics.register_cache("search_results", search_cache.stats)
+metrics.register_executor("search", executor.stats)
+metrics.configure_logging()
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +44,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_client()
+    executor.shutdown()
+
+
 # -----------------------------------------------------------
 # MODELS
 # -----------------------------------------------------------
@@ -57,12 +80,47 @@ def home():
 @app.post("/search")
 async def search(payload: SearchPayload):
     try:
-        events = smart_event_search(payload.region, payload.keywords)
+        events = await smart_event_search(payload.region, payload.keywords)
         return events
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/search/stream")
+async def search_stream(payload: SearchPayload):
+    """
+    NDJSON: one event per line as soon as it is extracted and validated.
+    A failure after the stream has started is sent as a final
+    {"error": ...} line.
+    """
+    async def lines():
+        try:
+            async for ev in stream_event_search(payload.region, payload.keywords):
+                yield json.dumps(ev) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/search/stats")
+def search_stats():
+    return {
+        "result_cache": search_cache.stats(),
+        "remote_cache": cache_stats(),
+        "coalescing": search_flight.stats(),
+        "executor": executor.stats(),
+        "validator": validator_stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/rules")
 def get_rules():
     with open(RULES_FILE, "r", encoding="utf-8") as f:
@@ -78,37 +136,63 @@ def update_rules(payload: RulesUpdatePayload):
 
 @app.post("/notes")
 def save_notes(payload: NotesPayload):
-    with open(NOTES_FILE, "a", encoding="utf-8") as f:
-        f.write(payload.text + "\n\n")
-    return {"status": "saved"}
+    note = note_log.append(payload.text)
+    return {"status": "saved", "id": note["id"]}
 
 
 @app.get("/notes")
-def read_notes():
-    with open(NOTES_FILE, "r", encoding="utf-8") as f:
-        return {"notes": f.read()}
+def read_notes(cursor: int = 0, limit: int = 50, tail: int = None, q: str = None):
+    """
+    A page of notes (oldest first, from id cursor), the last `tail`
+    notes, or the notes matching keywords q.
+    """
+    limit = max(1, min(limit, NOTES_PAGE_MAX))
+
+    if q:
+        return {"notes": note_log.search(q, limit), "next_cursor": None}
+    if tail:
+        return {"notes": note_log.tail(min(tail, NOTES_PAGE_MAX)), "next_cursor": None}
+
+    notes, next_cursor = note_log.page(cursor, limit)
+    return {"notes": notes, "next_cursor": next_cursor}
 
 
 @app.post("/pin")
 def save_pin(payload: PinPayload):
-    try:
-        with open(PINS_FILE, "r", encoding="utf-8") as f:
-            pins = json.load(f)
-    except:
-        pins = []
-
-    pins.append(payload.content)
+    pin = pin_store.add(payload.content)
+    return {"status": "pinned", "id": pin["id"]}
 
-    with open(PINS_FILE, "w", encoding="utf-8") as f:
-        json.dump(pins, f, indent=4)
 
-    return {"status": "pinned"}
+@app.delete("/pin/{pin_id}")
+def delete_pin(pin_id: str):
+    if not pin_store.delete(pin_id):
+        raise HTTPException(status_code=404, detail="Pin not found")
+    return {"status": "deleted"}
 
 
 @app.get("/pins")
-def get_pins():
+def get_pins(
+    response: Response,
+    region: str = None,
+    category: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    limit: int = None,
+    cursor: str = None,
+):
+    """
+    Pins in the order they were added. With limit, the cursor for the
+    next page is returned in the X-Next-Cursor header (none on the last
+    page).
+    """
+    if limit is not None:
+        limit = max(1, min(limit, PINS_PAGE_MAX))
+
     try:
-        with open(PINS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return []
+        pins, next_cursor = pin_store.page(region, category, date_from, date_to, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return pins
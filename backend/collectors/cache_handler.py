@@ -1,31 +1,163 @@
-import json, os, time
+import json, os, sqlite3, threading, time
 
-CACHE_FILE = os.path.join(os.path.dirname(__file__), "../storage/collector_cache.json")
+# SQLite-backed key/value cache for collector results.
+#
+# - O(1) lookups on the primary key, no whole-file reads
+# - every write is its own transaction (atomic, WAL journal)
+# - a background thread sweeps expired rows every SWEEP_INTERVAL
+# - at most MAX_ENTRIES rows; least recently read ones are evicted
+
+CACHE_DB = os.path.join(os.path.dirname(__file__), "../storage/collector_cache.db")
+LEGACY_FILE = os.path.join(os.path.dirname(__file__), "../storage/collector_cache.json")
 TTL = 60 * 60 * 6  # 6 hours
+MAX_ENTRIES = int(os.getenv("POPFINDER_COLLECTOR_CACHE_SIZE", "5000"))
+SWEEP_INTERVAL = 60 * 5
+
+_lock = threading.RLock()
+_conn = None
+_size = 0
+_stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "writes": 0}
+
+
+def _connect():
+    global _conn, _size
+    if _conn is not None:
+        return _conn
+
+    conn = sqlite3.connect(CACHE_DB, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cache ("
+        " key TEXT PRIMARY KEY,"
+        " data TEXT NOT NULL,"
+        " timestamp REAL NOT NULL,"
+        " accessed REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+    conn.execute("CREATE INDEX IF NOT EXISTS cache_timestamp ON cache(timestamp)")
+
+    _import_legacy(conn)
+
+    _size = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    _conn = conn
+
+    threading.Thread(target=_sweeper, name="collector-cache-sweeper", daemon=True).start()
+    return conn
+
+
+def _import_legacy(conn):
+    """
+    One-off import of the old collector_cache.json.
+    """
+    if not os.path.exists(LEGACY_FILE):
+        return
+    try:
+        with open(LEGACY_FILE, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    rows = [
+        (key, json.dumps(entry["data"]), entry["timestamp"], entry["timestamp"])
+        for key, entry in legacy.items()
+        if isinstance(entry, dict) and "data" in entry and "timestamp" in entry
+    ]
+    conn.execute("BEGIN")
+    conn.executemany("INSERT OR IGNORE INTO cache VALUES (?, ?, ?, ?)", rows)
+    conn.execute("COMMIT")
+    os.replace(LEGACY_FILE, LEGACY_FILE + ".imported")
+
 
-def load_cache():
-    if not os.path.exists(CACHE_FILE):
-        return {}
-    return json.load(open(CACHE_FILE))
+def _evict(conn):
+    global _size
+    excess = _size - MAX_ENTRIES
+    if excess <= 0:
+        return
+    cur = conn.execute(
+        "DELETE FROM cache WHERE key IN "
+        "(SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+        (excess,),
+    )
+    _size -= cur.rowcount
+    _stats["evicted"] += cur.rowcount
+
+
+def sweep():
+    """
+    Delete expired rows and enforce the size cap.
+    """
+    global _size
+    with _lock:
+        conn = _connect()
+        cur = conn.execute("DELETE FROM cache WHERE timestamp < ?", (time.time() - TTL,))
+        _stats["expired"] += cur.rowcount
+        _size = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        _evict(conn)
+
+
+def _sweeper():
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        try:
+            sweep()
+        except sqlite3.Error:
+            pass
 
-def save_cache(cache):
-    json.dump(cache, open(CACHE_FILE, "w"), indent=2)
 
 def get_from_cache(key):
-    cache = load_cache()
-    if key in cache:
-        entry = cache[key]
-        if time.time() - entry["timestamp"] < TTL:
-            return entry["data"]
-        else:
-            del cache[key]
-            save_cache(cache)
-    return None
+    global _size
+    with _lock:
+        conn = _connect()
+        row = conn.execute(
+            "SELECT data, timestamp FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            _stats["misses"] += 1
+            return None
+
+        data, timestamp = row
+        now = time.time()
+
+        if now - timestamp >= TTL:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            _size -= 1
+            _stats["expired"] += 1
+            _stats["misses"] += 1
+            return None
+
+        conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        _stats["hits"] += 1
+        return json.loads(data)
+
 
 def write_cache(key, data):
-    cache = load_cache()
-    cache[key] = {
-        "timestamp": time.time(),
-        "data": data
-    }
-    save_cache(cache)
+    global _size
+    now = time.time()
+    payload = json.dumps(data)
+
+    with _lock:
+        conn = _connect()
+        exists = conn.execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone()
+        conn.execute(
+            "INSERT INTO cache (key, data, timestamp, accessed) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET data = excluded.data, "
+            "timestamp = excluded.timestamp, accessed = excluded.accessed",
+            (key, payload, now, now),
+        )
+        if not exists:
+            _size += 1
+        _stats["writes"] += 1
+        _evict(conn)
+
+
+def cache_stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return dict(
+            _stats,
+            size=_size,
+            max_size=MAX_ENTRIES,
+            hit_ratio=round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        )
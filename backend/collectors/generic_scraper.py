@@ -1,10 +1,21 @@
 import requests
 from bs4 import BeautifulSoup
 
+def fetch_html(url):
+    try:
+        return requests.get(url, timeout=10).text
+    except:
+        return None
+
+def page_text(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.get_text(" ", strip=True)
+
 def fetch_page(url):
+    html = fetch_html(url)
+    if html is None:
+        return None
     try:
-        html = requests.get(url, timeout=10).text
-        soup = BeautifulSoup(html, "html.parser")
-        return soup.get_text(" ", strip=True)
+        return page_text(html)
     except:
         return None
@@ -1,34 +1,46 @@
 import requests
 from bs4 import BeautifulSoup
 
-def mall_events() -> list:
-    malls = {
-        "Bluewater": "https://bluewater.co.uk/events",
-        "Westfield London": "https://uk.westfield.com/london/events",
-        "Westfield Stratford": "https://uk.westfield.com/stratfordcity/events",
-        "Lakeside": "https://lakeside-shopping.com/events"
-    }
+MALLS = {
+    "Bluewater": "https://bluewater.co.uk/events",
+    "Westfield London": "https://uk.westfield.com/london/events",
+    "Westfield Stratford": "https://uk.westfield.com/stratfordcity/events",
+    "Lakeside": "https://lakeside-shopping.com/events"
+}
+
+
+def mall_source(name: str) -> str:
+    return name.lower().replace(" ", "")
+
+
+def mall_events_for(name: str, url: str) -> list:
+    try:
+        html = requests.get(url, timeout=10).text
+        soup = BeautifulSoup(html, "html.parser")
+    except:
+        return []
 
     results = []
+    cards = soup.select("article, .event, .card")  # generic
 
-    for name, url in malls.items():
-        try:
-            html = requests.get(url, timeout=10).text
-            soup = BeautifulSoup(html, "html.parser")
-        except:
+    for c in cards:
+        title = c.get_text(strip=True)
+        if len(title) < 4:
             continue
+        results.append({
+            "title": f"{name}: {title}",
+            "url": url,
+            "description": title,
+            "source": mall_source(name)
+        })
+
+    return results
+
+
+def mall_events() -> list:
+    results = []
 
-        cards = soup.select("article, .event, .card")  # generic
-
-        for c in cards:
-            title = c.get_text(strip=True)
-            if len(title) < 4:
-                continue
-            results.append({
-                "title": f"{name}: {title}",
-                "url": url,
-                "description": title,
-                "source": name.lower().replace(" ", "")
-            })
+    for name, url in MALLS.items():
+        results.extend(mall_events_for(name, url))
 
     return results
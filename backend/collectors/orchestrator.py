@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from backend.collectors.eventbrite import eventbrite_search
+from backend.collectors.excel import excel_events
+from backend.collectors.malls import MALLS, mall_events_for, mall_source
+from backend.collectors.visitkent import visit_kent_events
+from backend.collectors.visitlondon import visit_london_events
+from backend.metrics import COLLECTOR_SECONDS
+
+# ===============================================================
+#  Collector fan-out
+# ===============================================================
+#
+# Every collector (and every mall separately) runs at the same time in
+# a small thread pool, since they are all blocking requests+bs4
+# scrapers. collect_all() waits at most `deadline` seconds and returns
+# whatever has arrived by then, so a slow site costs its own results,
+# not everyone's latency.
+
+DEADLINE = float(os.getenv("POPFINDER_COLLECT_DEADLINE", "8"))
+WORKERS = int(os.getenv("POPFINDER_COLLECT_WORKERS", "16"))
+
+log = logging.getLogger(__name__)
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="collector")
+_lock = threading.Lock()
+_stats = {}
+
+
+def default_sources(query: str, region: str) -> dict:
+    """
+    {source name: zero-argument collector} for one search.
+    """
+    sources = {
+        "eventbrite": partial(eventbrite_search, query, region),
+        "excel": excel_events,
+        "visitkent": partial(visit_kent_events, region),
+        "visitlondon": visit_london_events,
+    }
+    for name, url in MALLS.items():
+        sources[mall_source(name)] = partial(mall_events_for, name, url)
+    return sources
+
+
+def _record(name, status, seconds):
+    COLLECTOR_SECONDS.observe(seconds, source=name, status=status)
+    with _lock:
+        s = _stats.setdefault(name, {
+            "calls": 0, "ok": 0, "empty": 0, "failures": 0, "timeouts": 0,
+            "total_seconds": 0.0, "last_seconds": 0.0,
+        })
+        s["calls"] += 1
+        s[status] += 1
+        if status != "timeouts":
+            s["total_seconds"] += seconds
+            s["last_seconds"] = seconds
+
+
+def _run(name, fn):
+    """
+    Returns (events or None on failure, seconds).
+    """
+    start = time.perf_counter()
+    try:
+        events = fn() or []
+    except Exception as e:
+        log.warning("collector %s failed: %s", name, e)
+        return None, time.perf_counter() - start
+    return events, time.perf_counter() - start
+
+
+async def collect_all(query: str, region: str, deadline: float = DEADLINE, sources=None):
+    """
+    Run all collectors concurrently under one overall deadline.
+    Returns (events, report) where report is
+    {source: {"status": ok|empty|error|timeout, "count": n, "seconds": t}}.
+    """
+    sources = sources if sources is not None else default_sources(query, region)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+
+    futures = {
+        loop.run_in_executor(_pool, _run, name, fn): name
+        for name, fn in sources.items()
+    }
+
+    done, pending = await asyncio.wait(futures, timeout=deadline) if futures else (set(), set())
+
+    events = []
+    report = {}
+
+    for fut in done:
+        name = futures[fut]
+        result, seconds = fut.result()
+        if result is None:
+            _record(name, "failures", seconds)
+            status, count = "error", 0
+        else:
+            _record(name, "ok" if result else "empty", seconds)
+            status, count = ("ok" if result else "empty"), len(result)
+            events.extend(result)
+        report[name] = {"status": status, "count": count, "seconds": round(seconds, 3)}
+
+    for fut in pending:
+        name = futures[fut]
+        # the thread keeps running; its result is simply dropped
+        _record(name, "timeouts", deadline)
+        report[name] = {"status": "timeout", "count": 0, "seconds": deadline}
+
+    log.info(
+        "collectors: %d events from %d/%d sources in %.2fs",
+        len(events), len(done), len(futures), time.perf_counter() - start,
+    )
+    return events, report
+
+
+def collector_stats() -> dict:
+    """
+    Lifetime per-source counters plus mean latency.
+    """
+    with _lock:
+        out = {}
+        for name, s in _stats.items():
+            timed = s["calls"] - s["timeouts"]
+            out[name] = dict(s, mean_seconds=round(s["total_seconds"] / timed, 4) if timed else 0.0)
+        return out
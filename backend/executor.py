@@ -0,0 +1,100 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ===============================================================
+#  Bounded executor for blocking work called from async routes
+# ===============================================================
+#
+# Anything that cannot be made async (CPU-bound parsing, file I/O,
+# blocking client libraries) runs here instead of on the event loop.
+# Concurrency is capped by POPFINDER_WORKERS and the number of waiting
+# jobs by POPFINDER_MAX_QUEUE; beyond that callers get ExecutorBusy
+# straight away rather than piling up behind a slow job.
+
+MAX_WORKERS = int(os.getenv("POPFINDER_WORKERS", "4"))
+MAX_QUEUE = int(os.getenv("POPFINDER_MAX_QUEUE", "32"))
+
+
+class ExecutorBusy(RuntimeError):
+    pass
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers=MAX_WORKERS, max_queue=MAX_QUEUE, name="popfinder"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) in a worker thread and await its result.
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusy(f"{self.queued} jobs already waiting")
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        # the queue slot is given back exactly once: by the job when it
+        # starts, or by release() when the job is cancelled (caller gone,
+        # shutdown) before a worker picked it up
+        dequeued = False
+
+        def dequeue():
+            nonlocal dequeued
+            if not dequeued:
+                dequeued = True
+                self.queued -= 1
+
+        def release(future):
+            with self._lock:
+                dequeue()
+
+        def call():
+            with self._lock:
+                dequeue()
+                self.active += 1
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    if not ok:
+                        self.failed += 1
+
+        future = self._pool.submit(call)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = BoundedExecutor()
@@ -0,0 +1,295 @@
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# ===============================================================
+#  Prometheus metrics
+# ===============================================================
+#
+# Small in-process registry rendered in the Prometheus text format by
+# render() (served on /metrics). Histograms and counters are updated as
+# requests run; cache and executor figures are read from their own
+# stats() at scrape time through register_cache() / register_executor().
+#
+# The per-request timing lines are logged at INFO under the "backend"
+# logger, which configure_logging() sends to stderr (POPFINDER_LOG_LEVEL).
+
+# USD per 1M (input, output) tokens, for the spend estimate
+MODEL_PRICES = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_metrics = []
+_caches = {}
+_executors = {}
+
+LOG_LEVEL = os.getenv("POPFINDER_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# BoundedExecutor.stats() keys exported as gauges and as counters
+EXECUTOR_GAUGES = ("max_workers", "max_queue", "active", "queued", "peak_queued")
+EXECUTOR_COUNTERS = ("completed", "failed", "rejected")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+
+def _num(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.values = {}
+        _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(key)} {_num(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.values = {}    # labels -> [bucket counts..., sum, count]
+        _metrics.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            v = self.values.get(key)
+            if v is None:
+                v = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    v[i] += 1
+            v[-2] += value
+            v[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, v in sorted(self.values.items()):
+            for bound, count in zip(self.buckets + (float("inf"),), v[:len(self.buckets)] + [v[-1]]):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', _num(bound)),))} {count}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_num(v[-2])}")
+            lines.append(f"{self.name}_count{_labels(key)} {v[-1]}")
+        return lines
+
+
+# ---------------------------------------------------------------
+# metrics
+# ---------------------------------------------------------------
+
+STAGE_SECONDS = Histogram("popfinder_stage_seconds", "Latency of each pipeline stage.")
+REMOTE_SECONDS = Histogram("popfinder_remote_load_seconds", "Latency of each remote data source load.")
+COLLECTOR_SECONDS = Histogram("popfinder_collector_seconds", "Latency of each collector run, by source and status.")
+MODEL_TOKENS = Counter("popfinder_openai_tokens_total", "OpenAI tokens used, by call site and direction.")
+MODEL_CALLS = Counter("popfinder_openai_requests_total", "OpenAI API calls, by call site and outcome.")
+MODEL_COST = Counter("popfinder_openai_cost_usd_total", "Estimated OpenAI spend in USD, by call site and model.")
+SEARCH_ROUTES = Counter("popfinder_search_routes_total", "Searches by route (index, local, small, large).")
+MODEL_SALVAGE = Counter(
+    "popfinder_model_output_items_total",
+    "Items recovered from model output that was not valid JSON, and items lost, by call site.",
+)
+PROMPT_TOKENS = Histogram(
+    "popfinder_prompt_tokens", "Estimated size of each model prompt in tokens.",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000),
+)
+
+
+def record_usage(call, model, usage):
+    """
+    Count the tokens of one OpenAI response (Responses or Chat
+    Completions usage object). Returns (input_tokens, output_tokens).
+    """
+    MODEL_CALLS.inc(call=call, model=model, outcome="ok")
+    if usage is None:
+        return 0, 0
+    tokens_in = getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", 0) or 0
+    tokens_out = getattr(usage, "output_tokens", None) or getattr(usage, "completion_tokens", 0) or 0
+    MODEL_TOKENS.inc(tokens_in, call=call, model=model, direction="input")
+    MODEL_TOKENS.inc(tokens_out, call=call, model=model, direction="output")
+    MODEL_COST.inc(usage_cost(model, tokens_in, tokens_out), call=call, model=model)
+    return tokens_in, tokens_out
+
+
+def usage_cost(model, tokens_in, tokens_out) -> float:
+    """
+    Estimated USD cost of a call (0 for models not in MODEL_PRICES).
+    """
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+
+
+def record_salvage(call, stats):
+    """
+    Count the salvaged / lost items of one json_utils.salvage_json_array
+    result.
+    """
+    for outcome in ("salvaged", "lost"):
+        if stats.get(outcome):
+            MODEL_SALVAGE.inc(stats[outcome], call=call, outcome=outcome)
+
+
+def register_cache(name, stats, hits="hits", misses="misses"):
+    """
+    Expose a cache's hit/miss counters and hit ratio; stats() is called
+    on every scrape.
+    """
+    _caches[name] = (stats, hits, misses)
+
+
+def _cache_lines():
+    rows = []
+    for name, (stats, hits_key, misses_key) in sorted(_caches.items()):
+        try:
+            s = stats()
+        except Exception:
+            continue
+        hits, misses = s.get(hits_key, 0), s.get(misses_key, 0)
+        ratio = hits / (hits + misses) if hits + misses else 0.0
+        rows.append((name, hits, misses, ratio))
+
+    lines = []
+    for metric, kind, help, col in (
+        ("popfinder_cache_hits_total", "counter", "Cache hits.", 1),
+        ("popfinder_cache_misses_total", "counter", "Cache misses.", 2),
+        ("popfinder_cache_hit_ratio", "gauge", "Cache hit ratio since start.", 3),
+    ):
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+        lines += [f"{metric}{_labels((('cache', r[0]),))} {_num(r[col])}" for r in rows]
+    return lines
+
+
+def register_executor(name, stats):
+    """
+    Expose an executor's queue depth, running jobs and rejections;
+    stats() is called on every scrape.
+    """
+    _executors[name] = stats
+
+
+def _executor_lines():
+    rows = []
+    for name, stats in sorted(_executors.items()):
+        try:
+            rows.append((name, stats()))
+        except Exception:
+            continue
+
+    lines = []
+    for keys, kind, suffix in ((EXECUTOR_GAUGES, "gauge", ""), (EXECUTOR_COUNTERS, "counter", "_total")):
+        for key in keys:
+            metric = f"popfinder_executor_{key}{suffix}"
+            lines += [f"# HELP {metric} Executor {key.replace('_', ' ')}.", f"# TYPE {metric} {kind}"]
+            lines += [f"{metric}{_labels((('executor', name),))} {_num(s.get(key, 0))}" for name, s in rows]
+    return lines
+
+
+def render() -> str:
+    lines = []
+    with _lock:
+        for metric in _metrics:
+            lines += metric.render()
+    lines += _cache_lines()
+    lines += _executor_lines()
+    return "\n".join(lines) + "\n"
+
+
+def configure_logging(level=LOG_LEVEL):
+    """
+    Send the "backend" loggers to stderr at level. Without this the
+    timing lines are dropped: uvicorn only sets up its own loggers. If
+    the root logger already has handlers, the lines go there instead.
+    """
+    logger = logging.getLogger("backend")
+    logger.setLevel(level)
+    if logging.getLogger().handlers or logger.handlers:
+        return logger
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    return logger
+
+
+# ---------------------------------------------------------------
+# per-request timings
+# ---------------------------------------------------------------
+
+class Timings:
+    """
+    Stage timings of one request through a pipeline ("search",
+    "extract", ...): each stage() goes into STAGE_SECONDS and into the
+    single log line written by done().
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.fields = {}
+
+    def note(self, **fields):
+        """
+        Extra key=value pairs for the log line.
+        """
+        self.fields.update(fields)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, pipeline=self.pipeline, stage=name)
+
+    def done(self, logger, **fields):
+        fields = dict(fields, **self.fields)
+        total = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(total, pipeline=self.pipeline, stage="total")
+        logger.info(
+            "%s %s total_ms=%.1f %s", self.pipeline,
+            " ".join(f"{k}={v!r}" for k, v in fields.items()),
+            total * 1000,
+            " ".join(f"{k}_ms={v * 1000:.1f}" for k, v in self.stages.items()),
+        )
+        return total
+
@@ -1,15 +1,213 @@
-import os, json
+import os, json, re, struct, threading, time
+
+from backend.ai.event_index import tokenize
+
+# Notes as an append-only log.
+#
+#   notes.log  one JSON record per line: {"id", "created_at", "text"}
+#   notes.idx  fixed-width byte offsets into notes.log, one per record,
+#              so note n starts at offset idx[n * 8]
+#
+# Adding a note appends one line and one offset; reading a page seeks
+# straight to its first record. Keyword lookups use an inverted index
+# built on first use and kept up to date by append().
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+LOG_FILE = os.path.join(DATA_DIR, "notes.log")
+INDEX_FILE = os.path.join(DATA_DIR, "notes.idx")
+LEGACY_FILES = (os.path.join(DATA_DIR, "notes.json"), os.path.join(DATA_DIR, "notes.txt"))
+
+OFFSET = struct.Struct(">Q")
+
+
+def _legacy_notes(path):
+    """
+    Note texts from the old notes.json ({"notes": [...]}) or notes.txt
+    (blank-line separated) files.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+    except OSError:
+        return []
+
+    if path.endswith(".json"):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return []
+        notes = data.get("notes", []) if isinstance(data, dict) else data
+        return [n.get("text", "") if isinstance(n, dict) else str(n) for n in notes]
+
+    return [block.strip() for block in re.split(r"\n\s*\n", raw) if block.strip()]
+
+
+class NoteLog:
+    def __init__(self, log_file=LOG_FILE, index_file=INDEX_FILE, legacy_files=LEGACY_FILES):
+        self.log_file = log_file
+        self.index_file = index_file
+        self.legacy_files = legacy_files
+        self._lock = threading.RLock()
+        self._count = None
+        self._postings = None
+
+    def _open(self):
+        """
+        Create the log on first use (importing legacy notes) and make
+        sure the offset index covers every complete record.
+        """
+        if self._count is not None:
+            return
+
+        if not os.path.exists(self.log_file):
+            open(self.log_file, "ab").close()
+            open(self.index_file, "wb").close()
+            self._count = 0
+            for path in self.legacy_files:
+                for text in _legacy_notes(path):
+                    self.append(text)
+            return
+
+        log_size = os.path.getsize(self.log_file)
+        idx_size = os.path.getsize(self.index_file) if os.path.exists(self.index_file) else -1
+        count = idx_size // OFFSET.size
+
+        # The index is written after the log, so after a crash it can only
+        # be short; recompute it from the log when it does not match.
+        if idx_size % OFFSET.size or not self._index_matches(count, log_size):
+            count = self._rebuild_index()
+        self._count = count
+
+    def _index_matches(self, count, log_size):
+        if count == 0:
+            return log_size == 0
+        with open(self.index_file, "rb") as f:
+            f.seek((count - 1) * OFFSET.size)
+            last = OFFSET.unpack(f.read(OFFSET.size))[0]
+        with open(self.log_file, "rb") as f:
+            f.seek(last)
+            line = f.readline()
+        return line.endswith(b"\n") and last + len(line) == log_size
+
+    def _rebuild_index(self):
+        offsets = []
+        good = 0
+        with open(self.log_file, "rb") as f:
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break  # torn final write
+                offsets.append(good)
+                good += len(line)
+        with open(self.log_file, "r+b") as f:
+            f.truncate(good)
+        with open(self.index_file, "wb") as f:
+            f.write(b"".join(OFFSET.pack(o) for o in offsets))
+        return len(offsets)
+
+    def _read(self, start, stop):
+        """
+        Records start..stop-1 (ids are positions in the log).
+        """
+        if start >= stop:
+            return []
+        with open(self.index_file, "rb") as f:
+            f.seek(start * OFFSET.size)
+            offset = OFFSET.unpack(f.read(OFFSET.size))[0]
+        with open(self.log_file, "rb") as f:
+            f.seek(offset)
+            return [json.loads(f.readline()) for _ in range(stop - start)]
+
+    def _index_note(self, note):
+        for token in tokenize(note["text"]):
+            self._postings.setdefault(token, []).append(note["id"])
+
+    # -----------------------------------------------------------
+    # public API
+    # -----------------------------------------------------------
+
+    def append(self, text: str) -> dict:
+        with self._lock:
+            self._open()
+            note = {
+                "id": self._count,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "text": text,
+            }
+            line = (json.dumps(note) + "\n").encode("utf-8")
+
+            with open(self.log_file, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.index_file, "ab") as f:
+                f.write(OFFSET.pack(offset))
+
+            self._count += 1
+            if self._postings is not None:
+                self._index_note(note)
+            return note
+
+    def page(self, cursor=0, limit=50):
+        """
+        Up to limit notes from id cursor on, oldest first.
+        Returns (notes, next_cursor); next_cursor is None at the end.
+        """
+        with self._lock:
+            self._open()
+            start = max(int(cursor or 0), 0)
+            stop = min(start + limit, self._count)
+            notes = self._read(start, stop)
+            return notes, (stop if stop < self._count else None)
+
+    def tail(self, n=20):
+        """
+        The last n notes, oldest first.
+        """
+        with self._lock:
+            self._open()
+            return self._read(max(self._count - n, 0), self._count)
+
+    def get(self, note_id: int):
+        with self._lock:
+            self._open()
+            if not 0 <= note_id < self._count:
+                return None
+            return self._read(note_id, note_id + 1)[0]
+
+    def search(self, text: str, limit=20) -> list:
+        """
+        Notes sharing tokens with text, most shared tokens first, then
+        newest first.
+        """
+        with self._lock:
+            self._open()
+            if self._postings is None:
+                self._postings = {}
+                for start in range(0, self._count, 500):
+                    for note in self._read(start, min(start + 500, self._count)):
+                        self._index_note(note)
+
+            hits = {}
+            for token in tokenize(text):
+                for note_id in self._postings.get(token, ()):
+                    hits[note_id] = hits.get(note_id, 0) + 1
+
+            best = sorted(hits, key=lambda i: (-hits[i], -i))[:limit]
+            return [self.get(i) for i in best]
+
+    def version(self) -> int:
+        with self._lock:
+            self._open()
+            return self._count
+
+
+note_log = NoteLog()
 
-NOTES_PATH = "backend/data/notes.json"
 
 def load_notes():
-    if not os.path.exists(NOTES_PATH):
-        return {"notes": []}
-    with open(NOTES_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    notes, _ = note_log.page(0, note_log.version())
+    return {"notes": [n["text"] for n in notes]}
 
 def add_note(text):
-    data = load_notes()
-    data["notes"].append(text)
-    with open(NOTES_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    return note_log.append(text)
@@ -1,21 +1,240 @@
-import os, json
+import base64, os, json, sqlite3, threading, time, uuid
+
+from backend.ai.dates import parse_date_range
+from backend.ai.event_index import region_tokens, tokenize
+
+# Pinned events in SQLite.
+#
+# Every pin gets a stable id. Inserts and deletes are single indexed
+# transactions (no whole-file rewrite), and pins are indexed by region
+# token, category and start date so they can be filtered and paged
+# without loading them all. Page cursors encode the position of the
+# last pin sent, so they stay valid when that pin is deleted.
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+PINS_DB = os.path.join(DATA_DIR, "pins.db")
+LEGACY_FILE = os.path.join(DATA_DIR, "pins.json")
+
+
+class PinStore:
+    def __init__(self, path=PINS_DB, legacy_file=LEGACY_FILE):
+        self.path = path
+        self.legacy_file = legacy_file
+        self._lock = threading.RLock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pins (
+                seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+                id       TEXT NOT NULL UNIQUE,
+                created  REAL NOT NULL,
+                category TEXT,
+                start    TEXT,
+                end      TEXT,
+                content  TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pin_regions (
+                seq   INTEGER NOT NULL REFERENCES pins(seq) ON DELETE CASCADE,
+                token TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE INDEX IF NOT EXISTS pins_category ON pins(category);
+            CREATE INDEX IF NOT EXISTS pins_start ON pins(start);
+            CREATE INDEX IF NOT EXISTS pin_regions_token ON pin_regions(token, seq);
+            CREATE INDEX IF NOT EXISTS pin_regions_seq ON pin_regions(seq);
+        """)
+        conn.execute("PRAGMA foreign_keys=ON")
+        self._conn = conn
+        self._import_legacy()
+        return conn
+
+    def _import_legacy(self):
+        """
+        One-off import of the old pins.json list.
+        """
+        conn = self._conn
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            legacy = []
+
+        conn.execute("BEGIN")
+        for event in legacy if isinstance(legacy, list) else []:
+            if isinstance(event, dict):
+                self._insert(event)
+        conn.execute("INSERT INTO meta VALUES ('legacy_imported', '1')")
+        conn.execute("COMMIT")
+
+    def _bump(self):
+        self._conn.execute(
+            "INSERT INTO meta VALUES ('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def _insert(self, event):
+        # ids are always ours: an incoming "id" (a pin copied back from
+        # search results, a legacy record) would collide or not be a string
+        pin = dict(event)
+        pin["id"] = uuid.uuid4().hex
+
+        dates = parse_date_range(str(pin.get("date") or ""))
+        category = (pin.get("category") or "").strip().lower() or None
+        place = " ".join(str(pin.get(k) or "") for k in ("region", "location", "title"))
+
+        cur = self._conn.execute(
+            "INSERT INTO pins (id, created, category, start, end, content) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                pin["id"], time.time(), category,
+                dates[0].isoformat() if dates else None,
+                dates[1].isoformat() if dates else None,
+                json.dumps(pin),
+            ),
+        )
+        self._conn.executemany(
+            "INSERT INTO pin_regions (seq, token) VALUES (?, ?)",
+            [(cur.lastrowid, t) for t in tokenize(place)],
+        )
+        self._bump()
+        return pin
+
+    # -----------------------------------------------------------
+    # public API
+    # -----------------------------------------------------------
+
+    def add(self, event: dict) -> dict:
+        """
+        Store a pin; returns it with its id.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pin = self._insert(event)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return pin
+
+    def delete(self, pin_id: str) -> bool:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute("DELETE FROM pins WHERE id = ?", (pin_id,))
+            if cur.rowcount:
+                self._bump()
+            conn.execute("COMMIT")
+            return bool(cur.rowcount)
+
+    def get(self, pin_id: str):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT content FROM pins WHERE id = ?", (pin_id,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+
+    def _select(self, region, category, date_from, date_to, after=0, limit=None):
+        """
+        (seq, pin) rows in insertion order, filtered; see list().
+        """
+        where = []
+        args = []
+
+        tokens = region_tokens(region) if region else set()
+        if tokens:
+            marks = ",".join("?" * len(tokens))
+            where.append(f"seq IN (SELECT seq FROM pin_regions WHERE token IN ({marks}))")
+            args.extend(sorted(tokens))
+        if category:
+            where.append("category = ?")
+            args.append(category.strip().lower())
+        if date_from:
+            where.append("(end IS NULL OR end >= ?)")
+            args.append(str(date_from))
+        if date_to:
+            where.append("(start IS NULL OR start <= ?)")
+            args.append(str(date_to))
+        if after:
+            where.append("seq > ?")
+            args.append(after)
+
+        sql = "SELECT seq, content FROM pins"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY seq"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+
+        with self._lock:
+            rows = self._connect().execute(sql, args).fetchall()
+        return [(seq, json.loads(content)) for seq, content in rows]
+
+    def list(self, region=None, category=None, date_from=None, date_to=None, limit=None) -> list:
+        """
+        Pins in insertion order, optionally filtered. Dates are
+        datetime.date or ISO strings; a pin matches when its date range
+        overlaps [date_from, date_to] (undated pins always match).
+        """
+        return [pin for _, pin in self._select(region, category, date_from, date_to, limit=limit)]
+
+    def page(self, region=None, category=None, date_from=None, date_to=None,
+             limit=None, cursor=None):
+        """
+        Up to limit pins (all when None) after cursor, filtered as in
+        list(). Returns (pins, next_cursor); next_cursor is None on the
+        last page. Raises ValueError for a cursor this store never gave.
+        """
+        after = _decode_cursor(cursor) if cursor else 0
+        rows = self._select(region, category, date_from, date_to, after, limit + 1 if limit else None)
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            return [pin for _, pin in rows], _encode_cursor(rows[-1][0])
+        return [pin for _, pin in rows], None
+
+    def version(self) -> str:
+        """
+        Changes on every add/delete; part of search cache keys.
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            return row[0] if row else "0"
+
+
+def _encode_cursor(seq):
+    return base64.urlsafe_b64encode(f"pin:{seq}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"invalid cursor {cursor!r}")
+    kind, _, seq = raw.partition(":")
+    if kind != "pin" or not seq.isdigit():
+        raise ValueError(f"invalid cursor {cursor!r}")
+    return int(seq)
+
+
+pin_store = PinStore()
 
-PIN_PATH = "backend/data/pinned.json"
 
 def load_pins():
-    if not os.path.exists(PIN_PATH):
-        return []
-    with open(PIN_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return pin_store.list()
 
 def save_pin(event):
-    pins = load_pins()
-    pins.append(event)
-    with open(PIN_PATH, "w", encoding="utf-8") as f:
-        json.dump(pins, f, indent=2)
+    return pin_store.add(event)
 
 def delete_pin(event):
-    pins = load_pins()
-    pins = [p for p in pins if p != event]
-    with open(PIN_PATH, "w", encoding="utf-8") as f:
-        json.dump(pins, f, indent=2)
+    pin_id = event.get("id") if isinstance(event, dict) else event
+    return pin_store.delete(pin_id) if pin_id else False
@@ -0,0 +1,123 @@
+import datetime
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# ===============================================================
+#  Fixture server: remote data files + recorded collector pages
+# ===============================================================
+#
+#   /data/<file>          bench/data/ (stands in for POPFINDER_DATA_URL)
+#   /sites/<host>/<path>  bench/fixtures/sites/<host>.html, any path
+#   /pages/<file>         bench/fixtures/pages/ (crawl pipeline pages)
+#
+# Files are rendered on the way out: {BASE} becomes the server URL and
+# {YEAR} next year, so recorded dates stay in the future. Data files
+# carry an ETag and honour If-None-Match, like the real host.
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# hosts the collectors scrape, and the pages bench/record.py saves for them
+SITES = {
+    "www.eventbrite.co.uk": "https://www.eventbrite.co.uk/d/uk--london/christmas-market/",
+    "www.excel.london": "https://www.excel.london/whats-on",
+    "www.visitkent.co.uk": "https://www.visitkent.co.uk/whats-on/",
+    "www.visitlondon.com": "https://www.visitlondon.com/things-to-do/whats-on/event/",
+    "bluewater.co.uk": "https://bluewater.co.uk/events",
+    "uk.westfield.com": "https://uk.westfield.com/london/events",
+    "lakeside-shopping.com": "https://lakeside-shopping.com/events",
+}
+
+CONTENT_TYPES = {".json": "application/json", ".txt": "text/plain", ".html": "text/html"}
+
+
+def render(relpath, base_url):
+    with open(os.path.join(BENCH_DIR, relpath), "r", encoding="utf-8") as f:
+        text = f.read()
+    year = datetime.date.today().year + 1
+    return text.replace("{BASE}", base_url).replace("{YEAR}", str(year))
+
+
+class FixtureServer:
+    def __init__(self, port=0):
+        self.requests = 0
+        self.not_modified = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="fixtures", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def _resolve(self, path):
+        parts = [p for p in urlsplit(path).path.split("/") if p]
+        if len(parts) == 2 and parts[0] in ("data", "pages"):
+            base = "data" if parts[0] == "data" else "fixtures/pages"
+            return f"{base}/{os.path.basename(parts[1])}"
+        if len(parts) >= 2 and parts[0] == "sites" and parts[1] in SITES:
+            return f"fixtures/sites/{parts[1]}.html"
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                relpath = server._resolve(self.path)
+                if relpath is None or not os.path.exists(os.path.join(BENCH_DIR, relpath)):
+                    self.send_error(404)
+                    return
+
+                body = render(relpath, server.url).encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+
+                if self.headers.get("If-None-Match") == etag:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                ext = os.path.splitext(relpath)[1]
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPES.get(ext, "application/octet-stream") + "; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def route_requests(fixture_url):
+    """
+    Send `requests` calls for the collector hosts to the fixture server
+    instead (this process only).
+    """
+    import requests
+
+    original = requests.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        if parts.hostname in SITES:
+            url = f"{fixture_url}/sites/{parts.hostname}{parts.path or '/'}"
+        return original(self, method, url, *args, **kwargs)
+
+    requests.Session.request = request
@@ -0,0 +1,37 @@
+"""
+Re-record the collector fixtures from the live sites:
+
+    python -m bench.record [host ...]
+
+Saves each page in fixtures.SITES to bench/fixtures/sites/<host>.html.
+"""
+import os
+import sys
+
+import requests
+
+from bench.fixtures import BENCH_DIR, SITES
+
+
+def record(hosts):
+    for host in hosts:
+        url = SITES[host]
+        try:
+            r = requests.get(url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
+            r.raise_for_status()
+        except requests.RequestException as e:
+            print(f"{host}: FAILED ({e})")
+            continue
+
+        path = os.path.join(BENCH_DIR, "fixtures", "sites", f"{host}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(r.text)
+        print(f"{host}: {len(r.text)} bytes")
+
+
+if __name__ == "__main__":
+    hosts = sys.argv[1:] or list(SITES)
+    unknown = [h for h in hosts if h not in SITES]
+    if unknown:
+        sys.exit(f"unknown host(s): {', '.join(unknown)}; known: {', '.join(SITES)}")
+    record(hosts)
@@ -0,0 +1,129 @@
+"""
+Offline PopFinder benchmarks.
+
+    python -m bench.run [search] [collectors] [crawl]
+        [-n ITERATIONS] [-c CONCURRENCY] [--cold]
+        [--latency S] [--jitter S] [--chunk-delay S] [--json FILE] [--verbose]
+
+Starts the fixture server (remote data files, recorded collector and
+event pages) and the stub OpenAI server, then runs each scenario in its
+own process against them and prints per-stage latency percentiles and
+throughput. No network access or API key is needed.
+
+  search      backend smart_event_search (remote data, index, model, filters)
+  collectors  backend/collectors/orchestrator.collect_all over the recorded sites
+  crawl       popfinder/backend/app.py /search (expand, fetch, extract, score)
+
+--cold clears the search result cache / extraction cache before every
+iteration and revalidates the remote data on every request, so each
+iteration pays for its model calls.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench.fixtures import FixtureServer
+from bench.stats import format_table
+from bench.stub_openai import StubOpenAI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# scenario -> tree whose `backend` package it imports
+TREES = {
+    "search": ROOT,
+    "collectors": ROOT,
+    "crawl": os.path.join(ROOT, "popfinder"),
+}
+
+
+def run_scenario(name, args, fixtures, stub):
+    tree = TREES[name]
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(dict.fromkeys([tree, ROOT])),
+        OPENAI_BASE_URL=stub.url,
+        OPENAI_API_KEY="bench",
+        POPFINDER_DATA_URL=f"{fixtures.url}/data",
+        BENCH_FIXTURE_URL=fixtures.url,
+    )
+    if args.cold:
+        env["POPFINDER_REVALIDATE_AFTER"] = "0"
+
+    calls_before = dict(stub.calls)
+
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+        out_path = out.name
+    try:
+        cmd = [
+            sys.executable, "-m", "bench.scenarios", name,
+            "--out", out_path,
+            "--iterations", str(args.iterations),
+            "--concurrency", str(args.concurrency),
+        ] + (["--cold"] if args.cold else [])
+
+        proc = subprocess.run(
+            cmd, cwd=tree, env=env,
+            stdout=None if args.verbose else subprocess.DEVNULL,
+            stderr=None if args.verbose else subprocess.PIPE,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{name} failed:\n{proc.stderr or ''}")
+
+        with open(out_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    finally:
+        os.unlink(out_path)
+
+    result["throughput"] = round(args.iterations / result["wall"], 2) if result["wall"] else 0.0
+    result["model_calls"] = {k: stub.calls[k] - calls_before[k] for k in stub.calls}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline PopFinder benchmarks")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario", help="search, collectors, crawl (default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=30)
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub model latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="+/- latency jitter (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="delay between streamed chunks (s)")
+    parser.add_argument("--json", help="also write the results here")
+    parser.add_argument("--verbose", action="store_true", help="show scenario output")
+    args = parser.parse_args()
+
+    unknown = [s for s in args.scenarios if s not in TREES]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    fixtures = FixtureServer().start()
+    stub = StubOpenAI(fixtures.url, args.latency, args.jitter, args.chunk_delay).start()
+
+    results = {}
+    try:
+        for name in args.scenarios or ["search", "collectors", "crawl"]:
+            result = run_scenario(name, args, fixtures, stub)
+            results[name] = result
+
+            mode = "cold" if args.cold else "warm"
+            print(
+                f"\n{name}: {args.iterations} iterations, concurrency {args.concurrency}, {mode} | "
+                f"{result['throughput']}/s | errors {result['errors']} | "
+                f"model calls {result['model_calls']}"
+            )
+            print(format_table(result["stages"]))
+    finally:
+        stub.stop()
+        fixtures.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
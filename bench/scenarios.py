@@ -0,0 +1,205 @@
+"""
+Benchmark scenarios. bench.run starts each one in its own process,
+because the crawl scenario imports popfinder/backend while the others
+import backend/ (both are the `backend` package):
+
+    python -m bench.scenarios <search|collectors|crawl> --out FILE
+        [--iterations N] [--concurrency C] [--cold]
+
+Writes {"wall", "errors", "stages": {stage: summary}} to FILE.
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import os
+import tempfile
+import time
+
+from bench.stats import summarize
+
+# (region, keywords) cycled through by the iterations
+QUERIES = [
+    ("London", "christmas market"),
+    ("Kent", "food festival"),
+    ("London", "craft fair"),
+    ("UK", "vintage market"),
+    ("Kent", "christmas"),
+    ("Birmingham", "trade show"),
+]
+
+_samples = {}
+
+
+def record(stage, seconds):
+    _samples.setdefault(stage, []).append(seconds)
+
+
+def timed(stage, fn):
+    """
+    Wrap fn (sync, or returning an awaitable) to record its duration.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        if inspect.isawaitable(result):
+            async def finish():
+                try:
+                    return await result
+                finally:
+                    record(stage, time.perf_counter() - start)
+            return finish()
+        record(stage, time.perf_counter() - start)
+        return result
+    return wrapper
+
+
+def instrument(module, stages):
+    for attr, stage in stages.items():
+        setattr(module, attr, timed(stage, getattr(module, attr)))
+
+
+async def drive(one, iterations, concurrency, before=None):
+    """
+    Run one(i) for every iteration, at most `concurrency` at a time.
+    Returns (wall seconds, errors).
+    """
+    slots = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def run(i):
+        nonlocal errors
+        async with slots:
+            if before:
+                before()
+            start = time.perf_counter()
+            try:
+                await one(i)
+            except Exception:
+                errors += 1
+            finally:
+                record("total", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(i) for i in range(iterations)))
+    return time.perf_counter() - start, errors
+
+
+# ---------------------------------------------------------------
+# smart_event_search (backend/)
+# ---------------------------------------------------------------
+
+async def search(args, tmp):
+    from backend.ai import event_index, remote_loader, search_engine
+    from backend.ai.result_cache import search_cache
+    from backend.executor import executor
+    from backend.storage.notes import NoteLog
+    from backend.storage.pins import PinStore
+
+    # keep the bench's caches and stores out of backend/storage and backend/data
+    remote_loader.CACHE_FILE = os.path.join(tmp, "remote_cache.json")
+    event_index.INDEX_FILE = os.path.join(tmp, "event_index.json")
+    search_engine.pin_store = PinStore(os.path.join(tmp, "pins.db"), os.path.join(tmp, "pins.json"))
+    search_engine.note_log = NoteLog(os.path.join(tmp, "notes.log"), os.path.join(tmp, "notes.idx"), ())
+
+    instrument(search_engine, {
+        "load_sources": "load_sources",
+        "get_index": "index",
+        "local_sources": "local_sources",
+        "plan_search": "plan",
+        "filter_future_and_valid": "validate",
+        "dedupe_events": "dedupe",
+    })
+    responses = search_engine.client.responses
+    responses.create = timed("model", responses.create)
+
+    async def one(i):
+        region, keywords = QUERIES[i % len(QUERIES)]
+        await search_engine.smart_event_search(region, keywords)
+
+    try:
+        return await drive(one, args.iterations, args.concurrency,
+                           before=search_cache.clear if args.cold else None)
+    finally:
+        await remote_loader.close_client()
+        executor.shutdown()
+
+
+# ---------------------------------------------------------------
+# collectors (backend/collectors/orchestrator.py)
+# ---------------------------------------------------------------
+
+async def collectors(args, tmp):
+    from bench.fixtures import route_requests
+    route_requests(os.environ["BENCH_FIXTURE_URL"])
+
+    from backend.collectors.orchestrator import collect_all
+
+    async def one(i):
+        region, keywords = QUERIES[i % len(QUERIES)]
+        _, report = await collect_all(keywords, region)
+        for name, r in report.items():
+            record(f"collector:{name}", r["seconds"])
+
+    return await drive(one, args.iterations, args.concurrency)
+
+
+# ---------------------------------------------------------------
+# crawl pipeline (popfinder/backend/app.py)
+# ---------------------------------------------------------------
+
+async def crawl(args, tmp):
+    import httpx
+    from backend.ai import ai_cache
+
+    ai_cache.CACHE_FILE = os.path.join(tmp, "ai_cache.json")
+
+    import backend.app as crawl_app
+    instrument(crawl_app, {
+        "generate_urls": "expand",
+        "fetch_html": "fetch",
+        "extract_event": "extract",
+        "rank_events": "score",
+    })
+
+    def forget():
+        with ai_cache._lock:
+            ai_cache._pages = None
+
+    transport = httpx.ASGITransport(app=crawl_app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        async def one(i):
+            region, keywords = QUERIES[i % len(QUERIES)]
+            r = await http.post("/search", json={"keywords": keywords, "region": region})
+            r.raise_for_status()
+
+        return await drive(one, args.iterations, args.concurrency, before=forget if args.cold else None)
+
+
+SCENARIOS = {"search": search, "collectors": collectors, "crawl": crawl}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cold", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="popfinder-bench-") as tmp:
+        wall, errors = asyncio.run(SCENARIOS[args.scenario](args, tmp))
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({
+            "wall": wall,
+            "errors": errors,
+            "stages": {stage: summarize(s) for stage, s in _samples.items()},
+        }, f)
+
+
+if __name__ == "__main__":
+    main()
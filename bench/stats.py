@@ -0,0 +1,39 @@
+import math
+
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples):
+    """
+    Latency summary in milliseconds for a list of durations in seconds.
+    """
+    values = sorted(samples)
+    ms = lambda s: round(s * 1000, 2)
+    return {
+        "n": len(values),
+        "mean": ms(sum(values) / len(values)) if values else 0.0,
+        "p50": ms(percentile(values, 50)),
+        "p90": ms(percentile(values, 90)),
+        "p99": ms(percentile(values, 99)),
+        "max": ms(values[-1]) if values else 0.0,
+    }
+
+
+def format_table(stages):
+    """
+    {stage: summary} as an aligned text table.
+    """
+    cols = ("n", "mean", "p50", "p90", "p99", "max")
+    width = max([len(s) for s in stages] + [5])
+    lines = ["  " + "stage".ljust(width) + "".join(c.rjust(10) for c in cols) + "   (ms)"]
+    for stage, summary in stages.items():
+        lines.append("  " + stage.ljust(width) + "".join(str(summary[c]).rjust(10) for c in cols))
+    return "\n".join(lines)
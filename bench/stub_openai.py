@@ -0,0 +1,182 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.fixtures import render
+
+# ===============================================================
+#  Local stand-in for the OpenAI Responses / Chat Completions APIs
+# ===============================================================
+#
+# Point the SDK at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+# Every request sleeps `latency` +/- `jitter` seconds, then answers with
+# the canned output whose marker appears in the prompt. Streamed
+# responses are sent in CHUNK-sized deltas, `chunk_delay` apart.
+
+# (endpoint, marker in prompt, file in bench/canned)
+CANNED = [
+    ("responses", "CATALOGUE ENTRIES", "search_events.json"),
+    ("chat", "PAGE CONTENT", "extract_event.json"),
+    ("chat", "Generate 5 URLs", "urls.json"),
+]
+
+CHUNK = 40
+
+
+class StubOpenAI:
+    def __init__(self, fixture_url, latency=0.5, jitter=0.2, chunk_delay=0.01, port=0):
+        self.fixture_url = fixture_url
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.calls = {"responses": 0, "chat": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="stub-openai", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def output_for(self, endpoint, prompt):
+        for kind, marker, name in CANNED:
+            if kind == endpoint and marker in prompt:
+                return render(f"canned/{name}", self.fixture_url)
+        return "[]"
+
+    def delay(self):
+        time.sleep(max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+                if self.path.endswith("/responses"):
+                    endpoint = "responses"
+                    prompt = body.get("input")
+                    prompt = prompt if isinstance(prompt, str) else json.dumps(prompt)
+                elif self.path.endswith("/chat/completions"):
+                    endpoint = "chat"
+                    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+                else:
+                    self.send_error(404)
+                    return
+
+                with stub._lock:
+                    stub.calls[endpoint] += 1
+
+                text = stub.output_for(endpoint, prompt)
+                stub.delay()
+
+                if endpoint == "responses" and body.get("stream"):
+                    self._stream(body, text)
+                elif endpoint == "responses":
+                    self._json(_response(body, text))
+                else:
+                    self._json(_chat_completion(body, text))
+
+            def _json(self, obj):
+                data = json.dumps(obj).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, body, text):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                item_id = "msg_" + uuid.uuid4().hex
+                for seq, i in enumerate(range(0, len(text), CHUNK)):
+                    self._event({
+                        "type": "response.output_text.delta",
+                        "item_id": item_id,
+                        "output_index": 0,
+                        "content_index": 0,
+                        "delta": text[i:i + CHUNK],
+                        "sequence_number": seq,
+                    })
+                    time.sleep(stub.chunk_delay)
+                self._event({"type": "response.completed", "response": _response(body, text)})
+
+            def _event(self, obj):
+                self.wfile.write(f"event: {obj['type']}\ndata: {json.dumps(obj)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
+
+
+def _usage(prompt_text, output_text):
+    return len(prompt_text) // 4, len(output_text) // 4
+
+
+def _response(body, text):
+    prompt = body.get("input") if isinstance(body.get("input"), str) else json.dumps(body.get("input"))
+    input_tokens, output_tokens = _usage(prompt, text)
+    return {
+        "id": "resp_" + uuid.uuid4().hex,
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": body.get("model", "stub"),
+        "status": "completed",
+        "output": [{
+            "type": "message",
+            "id": "msg_" + uuid.uuid4().hex,
+            "status": "completed",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        },
+    }
+
+
+def _chat_completion(body, text):
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    prompt_tokens, completion_tokens = _usage(prompt, text)
+    return {
+        "id": "chatcmpl-" + uuid.uuid4().hex,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
@@ -1,31 +1,187 @@
-import json, os, time
+import atexit, copy, hashlib, json, logging, os, re, threading, time
+from collections import OrderedDict
+
+# Extracted events, keyed on the content of the page they came from.
+#
+#   pages: content hash -> {"timestamp", "events"}   (LRU, MAX_ENTRIES)
+#   urls:  url -> {"hash", "timestamp"}
+#
+# A refetched page whose (normalised) content hashes the same as before
+# reuses the stored events, however old they are, so the model is only
+# called for new or changed pages. URL-only lookups keep the 48h TTL.
+#
+# Everything lives in memory; changes are written back to CACHE_FILE in
+# one batch at most every FLUSH_INTERVAL seconds, and at exit. A failed
+# write leaves the changes pending and is retried on the next interval.
 
 CACHE_FILE = os.path.join(os.path.dirname(__file__), "../storage/ai_cache.json")
 TTL = 60 * 60 * 48  # 48 hours
+MAX_ENTRIES = int(os.getenv("POPFINDER_AI_CACHE_SIZE", "2000"))
+FLUSH_INTERVAL = int(os.getenv("POPFINDER_AI_CACHE_FLUSH", "30"))
+
+_lock = threading.RLock()
+_write_lock = threading.Lock()
+_pages = None
+_urls = None
+_dirty = False
+_changes = 0
+_timer = None
+_stats = {"hits": 0, "misses": 0, "content_hits": 0, "content_misses": 0,
+          "extractions_avoided": 0, "extractions": 0, "flushes": 0, "flush_errors": 0}
+
+log = logging.getLogger(__name__)
+
+
+def content_hash(text):
+    """
+    Hash of page text with case and whitespace normalised away.
+    """
+    norm = re.sub(r"\s+", " ", (text or "").lower()).strip()
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
 
 def load_ai_cache():
     if not os.path.exists(CACHE_FILE):
         return {}
-    return json.load(open(CACHE_FILE))
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}
 
 def save_ai_cache(cache):
-    json.dump(cache, open(CACHE_FILE, "w"), indent=2)
+    tmp = CACHE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, CACHE_FILE)
+
+def _memory():
+    global _pages, _urls
+    if _pages is None:
+        data = load_ai_cache()
+        # files from the URL-keyed format have no "pages"; start afresh
+        pages = data.get("pages", {}) if isinstance(data.get("pages"), dict) else {}
+        live = sorted(pages.items(), key=lambda item: item[1]["timestamp"])
+        _pages = OrderedDict(live[-MAX_ENTRIES:])
+        _urls = {
+            url: entry for url, entry in (data.get("urls") or {}).items()
+            if entry.get("hash") in _pages
+        }
+    return _pages, _urls
+
+def _mark_dirty():
+    global _dirty, _changes, _timer
+    _dirty = True
+    _changes += 1
+    if _timer is None:
+        _timer = threading.Timer(FLUSH_INTERVAL, _timed_flush)
+        _timer.daemon = True
+        _timer.start()
+
+def _timed_flush():
+    global _timer
+    with _lock:
+        _timer = None
+    flush()
+
+def flush():
+    """
+    Write pending changes to disk (no-op when nothing changed).
+    """
+    global _dirty
+    with _write_lock:
+        with _lock:
+            if not _dirty:
+                return
+            pages, urls = _memory()
+            snapshot = {"pages": dict(pages), "urls": dict(urls)}
+            changes = _changes
+        try:
+            save_ai_cache(snapshot)
+        except OSError as e:
+            log.warning("ai_cache flush failed, retrying in %ss: %s", FLUSH_INTERVAL, e)
+            with _lock:
+                _stats["flush_errors"] += 1
+                _mark_dirty()
+            return
+        with _lock:
+            # changes made during the write are still pending
+            if _changes == changes:
+                _dirty = False
+            _stats["flushes"] += 1
+
+atexit.register(flush)
+
+# ---------------------------------------------------------------
+# content-keyed
+# ---------------------------------------------------------------
+
+def get_events_for_content(url, digest):
+    """
+    Events previously extracted from identical content, or None.
+    """
+    with _lock:
+        pages, urls = _memory()
+        entry = pages.get(digest)
+        if entry is None:
+            _stats["content_misses"] += 1
+            return None
+        pages.move_to_end(digest)
+        if urls.get(url, {}).get("hash") != digest:
+            urls[url] = {"hash": digest, "timestamp": time.time()}
+            _mark_dirty()
+        _stats["content_hits"] += 1
+        _stats["extractions_avoided"] += 1
+        return copy.deepcopy(entry["events"])
+
+def write_events_for_content(url, digest, events):
+    with _lock:
+        pages, urls = _memory()
+        now = time.time()
+        pages[digest] = {"timestamp": now, "events": copy.deepcopy(events)}
+        pages.move_to_end(digest)
+        urls[url] = {"hash": digest, "timestamp": now}
+        while len(pages) > MAX_ENTRIES:
+            evicted, _ = pages.popitem(last=False)
+            for u in [u for u, e in urls.items() if e["hash"] == evicted]:
+                del urls[u]
+        _stats["extractions"] += 1
+        _mark_dirty()
+
+# ---------------------------------------------------------------
+# url-keyed (TTL)
+# ---------------------------------------------------------------
 
 def get_event_from_cache(url):
-    cache = load_ai_cache()
-    if url in cache:
-        entry = cache[url]
-        if time.time() - entry["timestamp"] < TTL:
-            return entry["event"]
-        else:
-            del cache[url]
-            save_ai_cache(cache)
+    with _lock:
+        pages, urls = _memory()
+        if url in urls:
+            entry = urls[url]
+            page = pages.get(entry["hash"])
+            if page is not None and time.time() - entry["timestamp"] < TTL:
+                pages.move_to_end(entry["hash"])
+                _stats["hits"] += 1
+                return copy.deepcopy(page["events"])
+            else:
+                del urls[url]
+                _mark_dirty()
+        _stats["misses"] += 1
     return None
 
-def write_event_cache(url, event_obj):
-    cache = load_ai_cache()
-    cache[url] = {
-        "timestamp": time.time(),
-        "event": event_obj
-    }
-    save_ai_cache(cache)
+def write_event_cache(url, event_obj, text=None):
+    """
+    Store events for url; keyed on the page text when given, otherwise
+    on the URL itself.
+    """
+    write_events_for_content(url, content_hash(text if text is not None else url), event_obj)
+
+def cache_stats():
+    with _lock:
+        pages, urls = _memory()
+        lookups = _stats["content_hits"] + _stats["content_misses"]
+        return dict(
+            _stats,
+            pages=len(pages),
+            urls=len(urls),
+            pending=_dirty,
+            content_hit_ratio=round(_stats["content_hits"] / lookups, 4) if lookups else 0.0,
+        )
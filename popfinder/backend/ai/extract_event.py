@@ -1,8 +1,52 @@
 from backend.open_client import client
-from backend.ai.json_utils import clean_json
-import json
+from backend.ai.ai_cache import content_hash, get_events_for_content, write_events_for_content
+from backend.ai.json_utils import salvage_json_array
+from backend.ai.page_reducer import reduce_page, reduce_text
+from backend.ai.structured_data import extract_structured_events
+from backend.metrics import MODEL_CALLS, Timings, record_salvage, record_usage
+from bs4 import BeautifulSoup
+import logging
+
+log = logging.getLogger(__name__)
+
+EXTRACT_MODEL = "gpt-4.1-mini"
+
+def extract_event(page_text: str, url: str, html: str = None):
+    t = Timings("extract")
+
+    # The page is parsed once; reduce_page below edits the same soup
+    soup = None
+    if html:
+        with t.stage("parse_html"):
+            soup = BeautifulSoup(html, "html.parser")
+
+    # Fast path: events the page declares itself (JSON-LD, microdata, OpenGraph)
+    if soup is not None:
+        with t.stage("structured"):
+            structured = extract_structured_events(soup, url)
+        if structured:
+            t.done(log, url=url, route="structured", events=len(structured))
+            return structured
+
+    # Only event-relevant text, within the token budget
+    with t.stage("reduce"):
+        if soup is not None:
+            content, stats = reduce_page(soup)
+        else:
+            content, stats = reduce_text(page_text)
+    t.note(page_tokens=stats["tokens_before"], reduced_tokens=stats["tokens_after"])
+
+    if not content.strip():
+        t.done(log, url=url, route="empty", events=0)
+        return []
+
+    # Same content as an earlier fetch: reuse that extraction
+    digest = content_hash(content)
+    cached = get_events_for_content(url, digest)
+    if cached is not None:
+        t.done(log, url=url, route="cached", events=len(cached))
+        return cached
 
-def extract_event(page_text: str, url: str):
     prompt = f"""
     Extract ALL event information from this webpage content.
 
@@ -11,34 +55,40 @@ def extract_event(page_text: str, url: str):
     {{
         "events": [ ... ]
     }}
+
+    URL: {url}
+
+    PAGE CONTENT:
+    {content}
     """
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        ai_text = response.choices[0].message.content
-        print("\n=== RAW GPT EVENT EXTRACT ===")
-        print(ai_text)
-        print("====================================\n")
-
-        cleaned = clean_json(ai_text)
-
-        # Parse JSON
-        data = json.loads(cleaned)
-
-        # Normalize to list
-        if isinstance(data, dict) and "events" in data:
-            return data["events"]
-        elif isinstance(data, dict):
-            return [data]
-        elif isinstance(data, list):
-            return data
-        else:
-            return []
-
+        with t.stage("model"):
+            response = client.chat.completions.create(
+                model=EXTRACT_MODEL,
+                messages=[{"role": "user", "content": prompt}]
+            )
     except Exception as e:
-        print("EXTRACT FAILED:", e)
+        MODEL_CALLS.inc(call="extract", model=EXTRACT_MODEL, outcome="error")
+        t.done(log, url=url, route="model", events=0, error=str(e))
         return []
+
+    tokens_in, tokens_out = record_usage("extract", EXTRACT_MODEL, response.usage)
+    t.note(tokens_in=tokens_in, tokens_out=tokens_out)
+
+    ai_text = response.choices[0].message.content
+    log.debug("extract %s raw model output: %s", url, ai_text)
+
+    # Tolerant parse: a cut-off or prose-wrapped reply still gives
+    # every complete event in it
+    with t.stage("parse"):
+        events, salvage = salvage_json_array(ai_text)
+    record_salvage("extract", salvage)
+    if salvage["salvaged"] or salvage["lost"] or salvage["truncated"]:
+        t.note(salvaged=salvage["salvaged"], lost=salvage["lost"], truncated=salvage["truncated"])
+
+    # Only a complete extraction is reused for the same content
+    if not salvage["lost"] and not salvage["truncated"]:
+        write_events_for_content(url, digest, events)
+    t.done(log, url=url, route="model", events=len(events))
+    return events
@@ -1,5 +1,10 @@
+import json
 import re
 
+# ",}" / ",]" — the most common way model JSON is malformed
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+EVENTS_WRAPPER_RE = re.compile(r'\{\s*"events"\s*:\s*')
+
 def clean_json(text: str) -> str:
     """
     Remove markdown ```json fences and return pure JSON.
@@ -17,4 +22,185 @@ def clean_json(text: str) -> str:
     if text.endswith("```"):
         text = text[:text.rfind("```")]
 
-    return text.strip()
\ No newline at end of file
+    return text.strip()
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a JSON array of objects that arrives in chunks
+    (e.g. a streamed model response). feed() returns the objects completed
+    by that chunk; anything before the opening '[' (prose, code fences)
+    is ignored.
+    """
+
+    def __init__(self):
+        self._buf = []
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._started = False
+        self.closed = False
+        self.parsed = 0
+        self.errors = 0
+
+    @property
+    def pending(self) -> bool:
+        """True while an object has been opened but not yet closed."""
+        return self._depth > 0
+
+    def feed(self, chunk: str) -> list:
+        out = []
+
+        for ch in chunk or "":
+            if not self._started:
+                self._started = ch == "["
+                continue
+
+            if self._depth == 0:
+                # between elements: skip commas and whitespace
+                if ch == "{":
+                    self._depth = 1
+                    self._buf = ["{"]
+                elif ch == "]":
+                    self.closed = True
+                continue
+
+            self._buf.append(ch)
+
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+
+            if ch == '"':
+                self._in_str = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    text = "".join(self._buf)
+                    self._buf = []
+                    try:
+                        obj = json.loads(text)
+                    except ValueError:
+                        try:
+                            obj = json.loads(TRAILING_COMMA_RE.sub(r"\1", text))
+                        except ValueError:
+                            self.errors += 1
+                            continue
+                    if isinstance(obj, dict):
+                        self.parsed += 1
+                        out.append(obj)
+
+        return out
+
+
+def _as_items(data) -> list:
+    if isinstance(data, dict) and isinstance(data.get("events"), list):
+        return data["events"]
+    if isinstance(data, dict):
+        return [data]
+    if isinstance(data, list):
+        return data
+    return []
+
+
+def _last_item_boundary(body):
+    """
+    Index of the last comma between items of the array opened by
+    body[0], or -1 (also when the array is closed).
+    """
+    depth = 0
+    in_str = esc = False
+    last = -1
+    for i, ch in enumerate(body):
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return -1
+        elif ch == "," and depth == 1:
+            last = i
+    return last
+
+
+def _prefix_items(body):
+    """
+    (items, lost) for a cut-off array of strings or numbers, which
+    JsonArrayStream does not collect: the items before the last comma,
+    and whether anything was cut off after it.
+    """
+    cut = _last_item_boundary(body)
+    if cut < 0:
+        return [], False
+    try:
+        items = json.loads(body[:cut] + "]")
+    except ValueError:
+        return [], False
+    return [x for x in items if not isinstance(x, (dict, list))], bool(body[cut + 1:].strip())
+
+
+def salvage_json_array(text: str):
+    """
+    Items of the JSON array in a model reply that may be wrapped in prose
+    or code fences, cut off (max_output_tokens) or have malformed items.
+    {"events": [...]} gives the events, a single object gives [object].
+
+    Returns (items, stats). stats: "salvaged" = items recovered from a
+    reply that was not valid JSON as a whole (0 if it was), "lost" =
+    objects started but not recoverable, "truncated" = no closing ']'.
+    """
+    stats = {"salvaged": 0, "lost": 0, "truncated": False}
+    cleaned = clean_json(text or "")
+
+    try:
+        return _as_items(json.loads(cleaned)), stats
+    except ValueError:
+        pass
+
+    starts = [i for i in (cleaned.find("["), cleaned.find("{")) if i >= 0]
+    body = cleaned[min(starts):] if starts else ""
+
+    # complete JSON with prose around it
+    try:
+        data, _ = json.JSONDecoder().raw_decode(body)
+    except ValueError:
+        data = None
+    items = _as_items(data)
+    if items and all(isinstance(x, (dict, str)) for x in items):
+        stats["salvaged"] = len(items)
+        return items, stats
+
+    # cut off or malformed: every complete object
+    wrapper = EVENTS_WRAPPER_RE.match(body)
+    if wrapper:
+        body = body[wrapper.end():]
+    elif body.startswith("{"):
+        body = "[" + body
+    parser = JsonArrayStream()
+    items = parser.feed(body)
+    stats["salvaged"] = len(items)
+    stats["lost"] = parser.errors + int(parser.pending)
+    stats["truncated"] = not parser.closed
+
+    if not items and stats["truncated"] and body.startswith("["):
+        items, lost = _prefix_items(body)
+        if items:
+            stats["salvaged"] = len(items)
+            stats["lost"] = int(lost)
+    return items, stats
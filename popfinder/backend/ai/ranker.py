@@ -0,0 +1,207 @@
+import datetime
+import os
+
+from backend.ai.dates import parse_date_range
+from backend.ai.event_index import region_tokens, tokenize
+from backend.ai.validator import url_is_trusted
+
+# ===============================================================
+#  Local relevance ranker
+# ===============================================================
+#
+# Scores a batch of events against a query without a model call. Each
+# feature is computed for the whole batch as one column of values in
+# [0, 1]; the score is the weighted sum of the columns, scaled to 0-100.
+#
+#   keyword   share of the query keywords in the event text
+#   region    1 in the query region, NEARBY_SHARE in a neighbouring
+#             one, 0 elsewhere (and 1 for "UK"-wide queries)
+#   date      1 for events on now, falling to 0 at DATE_HORIZON days
+#   category  CATEGORY_PRIORS for the event's category
+#   trust     trusted URL > other URL > none, plus corroborating sources
+#
+# Weights come from POPFINDER_RANK_WEIGHTS ("keyword=0.4,date=0.1").
+
+FEATURES = ("keyword", "region", "date", "category", "trust")
+
+DEFAULT_WEIGHTS = {
+    "keyword": 0.35,
+    "region": 0.25,
+    "date": 0.15,
+    "category": 0.15,
+    "trust": 0.10,
+}
+
+DATE_HORIZON = 180
+NEARBY_SHARE = 0.5
+
+NEARBY_REGIONS = {
+    "london": {"kent", "sussex"},
+    "kent": {"london", "sussex"},
+    "sussex": {"kent", "london"},
+    "birmingham": {"yorkshire"},
+    "yorkshire": {"birmingham"},
+}
+
+CATEGORY_PRIORS = {
+    "christmas market": 1.0,
+    "market": 0.9,
+    "festival": 0.85,
+    "fair": 0.8,
+    "show": 0.7,
+    "trade show": 0.6,
+}
+CATEGORY_DEFAULT = 0.4
+
+
+def _parse_weights(spec):
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in (spec or "").split(","):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name in weights:
+            try:
+                weights[name] = float(value)
+            except ValueError:
+                pass
+    return weights
+
+
+WEIGHTS = _parse_weights(os.getenv("POPFINDER_RANK_WEIGHTS"))
+
+
+# ---------------------------------------------------------------
+# feature columns
+# ---------------------------------------------------------------
+
+def _text(ev, fields):
+    return " ".join(str(ev.get(f) or "") for f in fields)
+
+
+def keyword_column(events, keywords):
+    query = tokenize(keywords)
+    if not query:
+        return [1.0] * len(events)
+    return [
+        len(query & tokenize(_text(ev, ("title", "description", "category", "location")))) / len(query)
+        for ev in events
+    ]
+
+
+def region_column(events, region):
+    home = region_tokens(region)
+    if not home:
+        return [1.0] * len(events)
+
+    nearby = set()
+    for name in tokenize(region):
+        for other in NEARBY_REGIONS.get(name, ()):
+            nearby |= region_tokens(other)
+    nearby -= home
+
+    column = []
+    for ev in events:
+        tokens = tokenize(_text(ev, ("location", "title", "region")))
+        if tokens & home:
+            column.append(1.0)
+        elif tokens & nearby:
+            column.append(NEARBY_SHARE)
+        else:
+            column.append(0.0)
+    return column
+
+
+def date_column(events, today):
+    column = []
+    for ev in events:
+        dates = parse_date_range(str(ev.get("date") or ""))
+        if dates is None:
+            column.append(0.0)
+            continue
+        days = (dates[0] - today).days
+        column.append(1.0 if days <= 0 else max(0.0, 1.0 - days / DATE_HORIZON))
+    return column
+
+
+def category_column(events):
+    return [
+        CATEGORY_PRIORS.get(str(ev.get("category") or "").strip().lower(), CATEGORY_DEFAULT)
+        for ev in events
+    ]
+
+
+def trust_column(events):
+    column = []
+    for ev in events:
+        url = ev.get("url")
+        base = 1.0 if url_is_trusted(url) else 0.5 if url else 0.2
+        extra = max(len(ev.get("sources") or ()) - 1, 0)
+        column.append(min(1.0, base + 0.1 * extra))
+    return column
+
+
+def feature_columns(events, region="", keywords="", today=None):
+    """
+    {feature: [value per event]}, each value in [0, 1].
+    """
+    today = today or datetime.date.today()
+    return {
+        "keyword": keyword_column(events, keywords),
+        "region": region_column(events, region),
+        "date": date_column(events, today),
+        "category": category_column(events),
+        "trust": trust_column(events),
+    }
+
+
+# ---------------------------------------------------------------
+# scoring
+# ---------------------------------------------------------------
+
+def _weigh(columns, count, weights):
+    weights = weights or WEIGHTS
+    total = sum(weights.get(f, 0.0) for f in FEATURES) or 1.0
+    contributions = {
+        f: [100.0 * weights.get(f, 0.0) / total * v for v in columns[f]]
+        for f in FEATURES
+    }
+    scores = [round(sum(row), 2) for row in zip(*contributions.values())] if count else []
+    return scores, contributions
+
+
+def score_batch(events, region="", keywords="", today=None, weights=None):
+    """
+    Returns (scores, contributions): the 0-100 score of each event and,
+    per feature, each event's weighted share of that score.
+    """
+    events = list(events)
+    return _weigh(feature_columns(events, region, keywords, today), len(events), weights)
+
+
+def score_events(events, region="", keywords="", today=None, weights=None):
+    """
+    Copies of the events with "score", "score_features" (per-feature
+    contributions) and local 0-10 "footfall_score" / "vendor_fit_score".
+    Input order is kept; see rank_events for sorting.
+    """
+    events = list(events)
+    columns = feature_columns(events, region, keywords, today)
+    scores, contributions = _weigh(columns, len(events), weights)
+
+    out = []
+    for i, ev in enumerate(events):
+        scored = dict(ev)
+        scored["score"] = scores[i]
+        scored["score_features"] = {f: round(contributions[f][i], 2) for f in FEATURES}
+        scored["footfall_score"] = round(10 * (0.6 * columns["category"][i] + 0.4 * columns["trust"][i]))
+        scored["vendor_fit_score"] = round(10 * (0.5 * columns["keyword"][i] + 0.5 * columns["category"][i]))
+        out.append(scored)
+    return out
+
+
+def rank_events(events, region="", keywords="", today=None, weights=None):
+    """
+    score_events(), best first. Ties keep their input order.
+    """
+    scored = score_events(events, region, keywords, today, weights)
+    return sorted(scored, key=lambda ev: -ev["score"])
@@ -0,0 +1,26 @@
+import re
+
+# Cheap token estimate for budgeting prompts without a tokenizer
+# dependency: ~4 characters per token for English text, never fewer
+# tokens than words.
+
+_WORD = re.compile(r"\S+")
+
+
+def estimate_tokens(text) -> int:
+    if not text:
+        return 0
+    return max((len(text) + 3) // 4, len(_WORD.findall(text)))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """
+    Cut text so that estimate_tokens(result) <= budget, on a word boundary.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    cut = text[: max(budget, 0) * 4]
+    while cut and estimate_tokens(cut) > budget:
+        cut = cut[: int(len(cut) * 0.9)]
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
@@ -0,0 +1,133 @@
+import datetime
+import logging
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from backend.ai.dates import parse_date_range
+
+# ===============================================================
+#  Final event validation
+# ===============================================================
+#
+# Everything is compiled once at import: the trusted sites are a set of
+# registered domains (looked up by walking up the URL's hostname) plus
+# one regex for brand names that appear under several domains, and the
+# banned / recurring title terms are one alternation regex each. Dates
+# go through dates.parse_date_range, so ranges like "12–14 Dec 2025"
+# are understood; an event is kept until its last day has passed.
+
+log = logging.getLogger(__name__)
+
+TRUSTED_DOMAINS = {
+    "excel.london", "olympia.london", "thenec.co.uk", "necgroup.co.uk",
+    "see.tickets",
+    "kew.org", "goodwood.com",
+    "bluewater.co.uk", "dreamland.co.uk",
+    "alexandrapalace.com",
+    "visitlondon.com",
+    "hydeparkwinterwonderland.com",
+    "winterlandbluewater.com",
+    "lovefairs.com",
+    "kenteventcentre.co.uk",
+}
+
+# matched anywhere in the hostname (eventbrite.co.uk, visitbrighton.com, ...)
+TRUSTED_BRANDS = ["eventbrite", "ticketmaster", "harrogateconventioncentre", "brighton", "harrogate"]
+
+BANNED_TERMS = [
+    "gaming expo", "tech & gaming", "retro gaming",
+    "winter tech expo", "london comics expo",
+]
+
+# titles allowed through without a trusted URL
+RECURRING_TERMS = ["festival", "market", "fair", "christmas", "county show"]
+
+# rejection reasons, in the order the checks run
+RULES = ("invalid", "no_date", "past", "banned", "untrusted_url")
+
+
+def _alternation(terms):
+    return re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)))
+
+
+BRAND_RE = _alternation(TRUSTED_BRANDS)
+BANNED_RE = _alternation(BANNED_TERMS)
+RECURRING_RE = _alternation(RECURRING_TERMS)
+
+_lock = threading.Lock()
+_totals = Counter()
+
+
+def url_is_trusted(url) -> bool:
+    if not isinstance(url, str) or len(url) < 10:
+        return False
+    try:
+        host = (urlsplit(url if "://" in url else "http://" + url).hostname or "").lower()
+    except ValueError:
+        return False
+    if not host:
+        return False
+
+    if BRAND_RE.search(host):
+        return True
+
+    # www.tickets.excel.london -> tickets.excel.london -> excel.london -> london
+    labels = host.split(".")
+    return any(".".join(labels[i:]) in TRUSTED_DOMAINS for i in range(len(labels) - 1))
+
+
+def check_event(ev, today) -> str | None:
+    """
+    The first rule the event fails, or None when it passes.
+    """
+    if not isinstance(ev, dict):
+        return "invalid"
+
+    dates = parse_date_range(str(ev.get("date") or ""))
+    if dates is None:
+        return "no_date"
+    if dates[1] < today:
+        return "past"
+
+    title = str(ev.get("title") or "").lower()
+    if BANNED_RE.search(title):
+        return "banned"
+
+    if not url_is_trusted(ev.get("url")) and not RECURRING_RE.search(title):
+        return "untrusted_url"
+
+    return None
+
+
+def validate_events(events, today=None):
+    """
+    Returns (kept, rejected) where rejected counts dropped events by rule.
+    """
+    today = today or datetime.date.today()
+    kept = []
+    rejected = Counter()
+
+    for ev in events:
+        reason = check_event(ev, today)
+        if reason is None:
+            kept.append(ev)
+        else:
+            rejected[reason] += 1
+
+    checked = len(kept) + sum(rejected.values())
+    if rejected:
+        log.debug("validator dropped %s of %s events: %s", checked - len(kept), checked, dict(rejected))
+
+    with _lock:
+        _totals["checked"] += checked
+        _totals["kept"] += len(kept)
+        _totals.update(rejected)
+
+    return kept, rejected
+
+
+def validator_stats():
+    with _lock:
+        return {k: _totals[k] for k in ("checked", "kept") + RULES}
@@ -1,10 +1,39 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
+from backend import metrics
+from backend.ai import ai_cache
 from backend.ai.query_expand import generate_urls
-from backend.collectors.generic_scraper import fetch_page
+from backend.collectors.generic_scraper import fetch_html
 from backend.ai.extract_event import extract_event
-from backend.ai.score_event import score_event
+from backend.ai.structured_data import STRUCTURED_SOURCES
+from backend.ai.ranker import rank_events
+
+
+# Per-stage worker limits (shared by all requests) and the overall
+# per-request deadline for the crawl pipeline.
+FETCH_WORKERS = int(os.getenv("POPFINDER_FETCH_WORKERS", "8"))
+EXTRACT_WORKERS = int(os.getenv("POPFINDER_EXTRACT_WORKERS", "4"))
+SEARCH_DEADLINE = float(os.getenv("POPFINDER_SEARCH_DEADLINE", "20"))
+
+log = logging.getLogger(__name__)
+
+# Each stage has its own threads, and a slot is held until the thread's
+# work is done, even when the request gave up on it at the deadline: a
+# fetch or model call that is already running cannot be stopped, so it
+# keeps counting against the limit and later requests wait for a slot
+# instead of starting more work alongside it.
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="crawl-fetch")
+extract_pool = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="crawl-extract")
+fetch_slots = asyncio.Semaphore(FETCH_WORKERS)
+extract_slots = asyncio.Semaphore(EXTRACT_WORKERS)
 
 
 class SearchPayload(BaseModel):
@@ -14,29 +43,95 @@ class SearchPayload(BaseModel):
 
 app = FastAPI()
 
+metrics.register_cache("ai_cache", ai_cache.cache_stats, "content_hits", "content_misses")
+metrics.configure_logging()
+
+
+async def run_in_stage(slots, pool, fn, *args):
+    """
+    fn(*args) in pool, once one of slots is free. The slot is given back
+    when fn returns, not when the caller stops waiting for it.
+    """
+    await slots.acquire()
+    try:
+        future = asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+
+    def finished(f):
+        slots.release()
+        if not f.cancelled():
+            f.exception()  # retrieved, so an abandoned failure is not logged
+
+    future.add_done_callback(finished)
+    return await asyncio.shield(future)
+
+
+async def process_url(url: str):
+    """
+    fetch -> extract for one URL. The blocking stages run in their own
+    thread pools, so other URLs' fetches overlap this one's extraction.
+    """
+    html = await run_in_stage(fetch_slots, fetch_pool, fetch_html, url)
+    if not html:
+        return []
+
+    # extract_event parses the HTML once for structured data and the
+    # reduced page text
+    extracted_events = await run_in_stage(extract_slots, extract_pool, extract_event, None, url, html)
+    if not extracted_events:
+        return []
+
+    results = []
+    for ev in extracted_events:
+        if not isinstance(ev, dict):
+            continue
+        # structured-data events carry their own (real) URL
+        if ev.get("source") not in STRUCTURED_SOURCES or not ev.get("url"):
+            ev["url"] = url
+        results.append(ev)
+    return results
+
 
 @app.post("/search")
 async def search(payload: SearchPayload):
     keywords = payload.keywords
     region = payload.region
 
-    urls = generate_urls(keywords, region)
+    deadline = time.monotonic() + SEARCH_DEADLINE
+    t = metrics.Timings("crawl")
+
+    with t.stage("expand"):
+        urls = await asyncio.to_thread(generate_urls, keywords, region)
+    urls = list(dict.fromkeys(u for u in urls if isinstance(u, str)))
+
+    tasks = [asyncio.ensure_future(process_url(url)) for url in urls]
     results = []
+    pending = ()
 
-    for url in urls:
-        text = fetch_page(url)
-        if not text:
-            continue
+    if tasks:
+        with t.stage("pages"):
+            done, pending = await asyncio.wait(
+                tasks, timeout=max(deadline - time.monotonic(), 0)
+            )
 
-        extracted_events = extract_event(text, url)
-        if not extracted_events:
-            continue
+        # Out of time: keep what finished, drop the rest
+        for task in pending:
+            task.cancel()
 
-        for ev in extracted_events:
-            ev["url"] = url
-            results.append(score_event(ev))
+        for task in done:
+            if task.exception() is None:
+                results.extend(task.result())
 
-    # Sort by score
-    results.sort(key=lambda x: x.get("score", 0), reverse=True)
+    # Score the whole batch once against the query, best first
+    with t.stage("rank"):
+        results = rank_events(results, region, keywords)
 
+    t.done(log, keywords=keywords, region=region, urls=len(urls), timed_out=len(pending), events=len(results))
     return results
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,28 @@
+import asyncio
+import os
+import sys
+
+import httpx
+
+# popfinder/backend is also imported as `backend`, so it has to come
+# before the repository root on sys.path
+TREE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TREE)
+
+# backend/open_client.py refuses to import without a key; the tests
+# never reach the real API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+def request(method, path, **kwargs):
+    """
+    One request to the crawl app, in process.
+    """
+    from backend.app import app
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.request(method, path, **kwargs)
+
+    return asyncio.run(send())
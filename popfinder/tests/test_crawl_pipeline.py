@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import request
+
+from backend import app as crawl_app
+
+
+class Stage:
+    """
+    Blocking stand-in for a pipeline stage that records how many calls
+    were running at once and when each one started.
+    """
+
+    def __init__(self, seconds, result):
+        self.seconds = seconds
+        self.result = result
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.started = []
+
+    def __call__(self, *args):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.started.append(time.monotonic())
+        try:
+            time.sleep(self.seconds)
+            return self.result(*args) if callable(self.result) else self.result
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """
+    The crawl app with 2 fetch and 1 extract workers and fake stages.
+    """
+    fetch = Stage(0.05, "<html>page</html>")
+    extract = Stage(0.05, lambda _, url, html: [{"title": f"Market at {url}", "date": "2099-01-01"}])
+    pools = [ThreadPoolExecutor(max_workers=2), ThreadPoolExecutor(max_workers=1)]
+
+    monkeypatch.setattr(crawl_app, "fetch_pool", pools[0])
+    monkeypatch.setattr(crawl_app, "extract_pool", pools[1])
+    monkeypatch.setattr(crawl_app, "fetch_slots", asyncio.Semaphore(2))
+    monkeypatch.setattr(crawl_app, "extract_slots", asyncio.Semaphore(1))
+    monkeypatch.setattr(crawl_app, "fetch_html", fetch)
+    monkeypatch.setattr(crawl_app, "extract_event", extract)
+    monkeypatch.setattr(crawl_app, "generate_urls", lambda keywords, region: [f"http://site/{i}" for i in range(8)])
+    yield fetch, extract
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+def search(**payload):
+    return request("POST", "/search", json={"keywords": "market", "region": "Kent", **payload})
+
+
+def test_every_url_is_fetched_and_extracted(pipeline):
+    fetch, extract = pipeline
+    r = search()
+
+    assert r.status_code == 200
+    assert sorted(e["url"] for e in r.json()) == [f"http://site/{i}" for i in range(8)]
+    assert len(fetch.started) == len(extract.started) == 8
+
+
+def test_stages_never_exceed_their_worker_limits(pipeline):
+    fetch, extract = pipeline
+    search()
+    assert fetch.peak == 2
+    assert extract.peak == 1
+
+
+def test_work_abandoned_at_the_deadline_keeps_its_slot(pipeline, monkeypatch):
+    fetch, extract = pipeline
+    extract.seconds = 0.3
+    monkeypatch.setattr(crawl_app, "SEARCH_DEADLINE", 0.1)
+
+    async def two_requests():
+        first = await crawl_app.search(crawl_app.SearchPayload(keywords="market", region="Kent"))
+        # the first request's extraction is still running
+        assert extract.running == 1
+        second = await crawl_app.search(crawl_app.SearchPayload(keywords="market", region="Kent"))
+        await asyncio.sleep(0.4)
+        return first, second
+
+    first, second = asyncio.run(two_requests())
+
+    assert first == [] and second == []
+    # no model call was started past a deadline, and never two at once
+    assert len(extract.started) == 1
+    assert extract.peak == 1
+    assert fetch.peak <= 2
+
+
+def test_failed_url_does_not_fail_the_search(pipeline, monkeypatch):
+    def fetch(url):
+        if url.endswith("/3"):
+            raise OSError("connection reset")
+        return "<html>page</html>"
+
+    monkeypatch.setattr(crawl_app, "fetch_html", fetch)
+    r = search()
+    assert r.status_code == 200
+    assert len(r.json()) == 7
+
+
+def test_results_are_ranked(pipeline, monkeypatch):
+    pages = {
+        "http://site/0": [{"title": "Leeds Antiques Fair", "location": "Leeds", "date": "2099-01-01"}],
+        "http://site/1": [{"title": "Canterbury Christmas Market", "location": "Canterbury, Kent",
+                           "date": "2099-01-01", "category": "christmas market"}],
+    }
+    monkeypatch.setattr(crawl_app, "generate_urls", lambda keywords, region: list(pages))
+    monkeypatch.setattr(crawl_app, "extract_event", lambda _, url, html: [dict(e) for e in pages[url]])
+
+    events = search(keywords="christmas market").json()
+    assert [e["title"] for e in events] == ["Canterbury Christmas Market", "Leeds Antiques Fair"]
+    assert events[0]["score"] > events[1]["score"]
+
+
+def test_structured_events_keep_their_own_url(pipeline, monkeypatch):
+    def extract(_, url, html):
+        return [
+            {"title": "Ticketed Market", "date": "2099-01-01", "url": "https://tickets.example/1", "source": "jsonld"},
+            {"title": "Model Market", "date": "2099-01-01", "url": "https://made-up.example"},
+        ]
+
+    monkeypatch.setattr(crawl_app, "generate_urls", lambda keywords, region: ["http://site/0"])
+    monkeypatch.setattr(crawl_app, "extract_event", extract)
+
+    urls = {e["title"]: e["url"] for e in search().json()}
+    assert urls == {"Ticketed Market": "https://tickets.example/1", "Model Market": "http://site/0"}
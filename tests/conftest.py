@@ -0,0 +1,176 @@
+import asyncio
+import datetime
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+# backend/config.py and backend/open_client.py refuse to import without a
+# key; the tests never reach the real API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def future(days, fmt="%Y-%m-%d"):
+    """
+    A date `days` from today, formatted (ISO by default).
+    """
+    return (datetime.date.today() + datetime.timedelta(days=days)).strftime(fmt)
+
+
+class FakeResponses:
+    """
+    Stand-in for client.responses: every call answers `output` (a string,
+    or a function of the prompt), after `delay` seconds. Streamed
+    answers come in `chunk`-sized deltas.
+    """
+
+    def __init__(self):
+        self.output = "[]"
+        self.delay = 0.0
+        self.chunk = 16
+        self.calls = []
+
+    async def create(self, model, input, max_output_tokens, stream=False):
+        self.calls.append({"model": model, "input": input, "max_output_tokens": max_output_tokens})
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        text = self.output(input) if callable(self.output) else self.output
+        usage = SimpleNamespace(input_tokens=len(input) // 4, output_tokens=len(text) // 4)
+        if stream:
+            return self._stream(text, usage)
+        return SimpleNamespace(output_text=text, usage=usage)
+
+    async def _stream(self, text, usage):
+        for i in range(0, len(text), self.chunk):
+            yield SimpleNamespace(type="response.output_text.delta", delta=text[i:i + self.chunk])
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(usage=usage))
+
+
+class FakeChat:
+    """
+    Stand-in for the sync client's chat.completions: every call answers
+    `output` (a string, or a function of the prompt) or raises `error`.
+    """
+
+    def __init__(self):
+        self.output = "[]"
+        self.error = None
+        self.calls = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, messages):
+        prompt = "\n".join(m["content"] for m in messages)
+        self.calls.append({"model": model, "prompt": prompt})
+        if self.error:
+            raise self.error
+        text = self.output(prompt) if callable(self.output) else self.output
+        usage = SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=usage)
+
+
+class SearchEnv:
+    """
+    The remote data files a search loads, plus the fake model.
+    """
+
+    def __init__(self):
+        self.rules = ""
+        self.notes = ""
+        self.pins = []
+        self.seeds = []
+        self.loads = 0
+        self.model = FakeResponses()
+
+    def answer(self, events):
+        self.model.output = json.dumps(events)
+
+
+@pytest.fixture
+def search_env(tmp_path, monkeypatch):
+    """
+    smart_event_search / stream_event_search over SearchEnv data, with
+    empty local pin and note stores and a cold index and result cache.
+    """
+    from backend import app
+    from backend.ai import event_index, search_engine
+    from backend.ai.result_cache import search_cache
+    from backend.storage.notes import NoteLog
+    from backend.storage.pins import PinStore
+
+    env = SearchEnv()
+
+    async def load_sources():
+        env.loads += 1
+        return env.rules, env.notes, env.pins, env.seeds, {}
+
+    pins = PinStore(str(tmp_path / "pins.db"), str(tmp_path / "pins.json"))
+    notes = NoteLog(
+        str(tmp_path / "notes.log"), str(tmp_path / "notes.idx"), (str(tmp_path / "notes.txt"),)
+    )
+
+    monkeypatch.setattr(search_engine, "load_sources", load_sources)
+    monkeypatch.setattr(search_engine, "client", SimpleNamespace(responses=env.model))
+    for module in (search_engine, app):
+        monkeypatch.setattr(module, "pin_store", pins)
+        monkeypatch.setattr(module, "note_log", notes)
+    monkeypatch.setattr(event_index, "INDEX_FILE", str(tmp_path / "event_index.json"))
+    monkeypatch.setattr(event_index, "_current", None)
+    monkeypatch.setattr(event_index, "_current_sources", None)
+    search_cache.clear()
+    yield env
+    search_cache.clear()
+
+
+def request(method, path, **kwargs):
+    """
+    One request to the backend app, in process (no lifespan events, so
+    the shared executor is not shut down).
+    """
+    from backend.app import app
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.request(method, path, **kwargs)
+
+    return asyncio.run(send())
+
+
+@pytest.fixture
+def fresh_ai_cache(tmp_path, monkeypatch):
+    """
+    backend.ai.ai_cache, empty and saving to tmp_path.
+    """
+    from backend.ai import ai_cache
+
+    monkeypatch.setattr(ai_cache, "CACHE_FILE", str(tmp_path / "ai_cache.json"))
+    monkeypatch.setattr(ai_cache, "FLUSH_INTERVAL", 3600)
+    monkeypatch.setattr(ai_cache, "_pages", None)
+    monkeypatch.setattr(ai_cache, "_urls", None)
+    monkeypatch.setattr(ai_cache, "_dirty", False)
+    monkeypatch.setattr(ai_cache, "_timer", None)
+    monkeypatch.setattr(ai_cache, "_stats", dict.fromkeys(ai_cache._stats, 0))
+    yield ai_cache
+    if ai_cache._timer is not None:
+        ai_cache._timer.cancel()
+
+
+@pytest.fixture
+def fake_chat(monkeypatch):
+    """
+    FakeChat in place of the model client of extract_event and
+    query_expand.
+    """
+    from backend.ai import extract_event, query_expand
+
+    chat = FakeChat()
+    monkeypatch.setattr(extract_event, "client", chat)
+    monkeypatch.setattr(query_expand, "client", chat)
+    return chat
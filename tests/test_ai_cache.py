@@ -0,0 +1,132 @@
+import json
+import os
+
+import pytest
+
+from backend.ai import ai_cache
+
+
+@pytest.fixture
+def cache(fresh_ai_cache):
+    return fresh_ai_cache
+
+
+def restart(monkeypatch):
+    monkeypatch.setattr(ai_cache, "_pages", None)
+    monkeypatch.setattr(ai_cache, "_urls", None)
+
+
+def saved(cache):
+    with open(cache.CACHE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_writes_stay_in_memory_until_flushed(cache):
+    cache.write_event_cache("http://a", [{"title": "A"}], "page a")
+    assert not os.path.exists(cache.CACHE_FILE)
+    assert cache.cache_stats()["pending"]
+
+    cache.flush()
+    assert cache.get_event_from_cache("http://a") == [{"title": "A"}]
+    assert list(saved(cache)["urls"]) == ["http://a"]
+    assert not cache.cache_stats()["pending"]
+
+
+def test_changes_are_batched_into_one_timed_flush(cache):
+    for i in range(5):
+        cache.write_event_cache(f"http://{i}", [{"title": str(i)}], f"page {i}")
+
+    timer = cache._timer
+    assert timer is not None
+    timer.cancel()
+    cache._timed_flush()
+
+    assert len(saved(cache)["pages"]) == 5
+    assert cache.cache_stats()["flushes"] == 1
+    assert cache._timer is None
+
+
+def test_flush_without_changes_does_not_write(cache):
+    cache.flush()
+    assert not os.path.exists(cache.CACHE_FILE)
+    assert cache.cache_stats()["flushes"] == 0
+
+
+def test_cache_is_reloaded_after_a_restart(cache, monkeypatch):
+    cache.write_event_cache("http://a", [{"title": "A"}], "page a")
+    cache.flush()
+    restart(monkeypatch)
+    assert cache.get_event_from_cache("http://a") == [{"title": "A"}]
+
+
+def test_lru_keeps_at_most_max_entries(cache, monkeypatch):
+    monkeypatch.setattr(ai_cache, "MAX_ENTRIES", 2)
+    cache.write_event_cache("http://a", ["a"], "page a")
+    cache.write_event_cache("http://b", ["b"], "page b")
+    assert cache.get_event_from_cache("http://a") == ["a"]
+    cache.write_event_cache("http://c", ["c"], "page c")
+
+    assert cache.get_event_from_cache("http://b") is None
+    assert cache.cache_stats()["pages"] == 2
+
+
+def test_returned_events_are_copies(cache):
+    cache.write_event_cache("http://a", [{"title": "A"}], "page a")
+    cache.get_event_from_cache("http://a")[0]["title"] = "changed"
+    assert cache.get_event_from_cache("http://a") == [{"title": "A"}]
+
+
+def test_failed_flush_keeps_changes_pending(cache, monkeypatch):
+    cache.write_event_cache("http://a", [{"title": "A"}], "page a")
+    cache._timer.cancel()
+    monkeypatch.setattr(ai_cache, "_timer", None)
+
+    save = ai_cache.save_ai_cache
+
+    def disk_full(snapshot):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(ai_cache, "save_ai_cache", disk_full)
+    cache.flush()
+
+    stats = cache.cache_stats()
+    assert stats["pending"] and stats["flush_errors"] == 1 and stats["flushes"] == 0
+    # a retry is scheduled
+    assert cache._timer is not None
+
+    monkeypatch.setattr(ai_cache, "save_ai_cache", save)
+    cache.flush()
+    assert list(saved(cache)["urls"]) == ["http://a"]
+    assert not cache.cache_stats()["pending"]
+
+
+def test_changes_made_during_a_flush_stay_pending(cache, monkeypatch):
+    cache.write_event_cache("http://a", ["a"], "page a")
+    save = ai_cache.save_ai_cache
+
+    def slow_save(snapshot):
+        # another request writes while the snapshot is on its way to disk
+        cache.write_event_cache("http://b", ["b"], "page b")
+        save(snapshot)
+
+    monkeypatch.setattr(ai_cache, "save_ai_cache", slow_save)
+    cache.flush()
+    assert cache.cache_stats()["pending"]
+
+    monkeypatch.setattr(ai_cache, "save_ai_cache", save)
+    cache.flush()
+    assert set(saved(cache)["urls"]) == {"http://a", "http://b"}
+
+
+def test_url_lookups_expire_but_content_lookups_do_not(cache, monkeypatch):
+    digest = cache.content_hash("Page  TEXT")
+    assert digest == cache.content_hash("page text")
+    cache.write_events_for_content("http://a", digest, ["a"])
+
+    later = cache.time.time() + cache.TTL + 1
+    monkeypatch.setattr(cache.time, "time", lambda: later)
+
+    assert cache.get_event_from_cache("http://a") is None
+    assert cache.get_events_for_content("http://b", digest) == ["a"]
+    # and the content lookup points the new URL at that page
+    assert cache.get_event_from_cache("http://b") == ["a"]
@@ -0,0 +1,73 @@
+import json
+
+import httpx
+import pytest
+from openai import OpenAI
+
+from bench.fixtures import FixtureServer, SITES
+from bench.stats import format_table, percentile, summarize
+from bench.stub_openai import StubOpenAI
+
+
+@pytest.fixture(scope="module")
+def servers():
+    fixtures = FixtureServer().start()
+    stub = StubOpenAI(fixtures.url, latency=0, jitter=0, chunk_delay=0).start()
+    yield fixtures, stub
+    stub.stop()
+    fixtures.stop()
+
+
+def test_percentiles_and_summary():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    assert percentile([], 50) == 0.0
+
+    summary = summarize(values)
+    assert summary == {"n": 100, "mean": 50.5, "p50": 50.0, "p90": 90.0, "p99": 99.0, "max": 100.0}
+    assert summarize([])["n"] == 0
+
+    table = format_table({"model": summary})
+    assert table.splitlines()[1].split()[:3] == ["model", "100", "50.5"]
+
+
+def test_fixture_server_serves_data_and_recorded_sites(servers):
+    fixtures, _ = servers
+
+    r = httpx.get(f"{fixtures.url}/data/seed_events.json")
+    assert r.status_code == 200 and isinstance(r.json(), list)
+
+    again = httpx.get(f"{fixtures.url}/data/seed_events.json", headers={"If-None-Match": r.headers["etag"]})
+    assert again.status_code == 304
+
+    for host in SITES:
+        r = httpx.get(f"{fixtures.url}/sites/{host}/any/path")
+        assert r.status_code == 200 and "{BASE}" not in r.text
+
+    assert httpx.get(f"{fixtures.url}/data/../app.py").status_code == 404
+
+
+def test_stub_answers_responses_and_chat(servers):
+    fixtures, stub = servers
+    client = OpenAI(base_url=stub.url, api_key="bench")
+    before = dict(stub.calls)
+
+    r = client.responses.create(model="m", input="CATALOGUE ENTRIES:\n- Winter Fair")
+    assert isinstance(json.loads(r.output_text), (list, dict))
+    assert r.usage.output_tokens > 0
+
+    streamed = "".join(
+        e.delta for e in client.responses.create(model="m", input="CATALOGUE ENTRIES", stream=True)
+        if e.type == "response.output_text.delta"
+    )
+    assert streamed == r.output_text
+
+    chat = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "Generate 5 URLs"}])
+    assert chat.choices[0].message.content.strip().startswith("[")
+
+    other = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hello"}])
+    assert other.choices[0].message.content == "[]"
+
+    assert stub.calls["responses"] - before["responses"] == 2
+    assert stub.calls["chat"] - before["chat"] == 2
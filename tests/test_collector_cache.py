@@ -0,0 +1,114 @@
+import json
+import threading
+
+import pytest
+
+from backend.collectors import cache_handler
+from backend.collectors.cache_handler import cache_stats, get_from_cache, sweep, write_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_handler, "CACHE_DB", str(tmp_path / "collector_cache.db"))
+    monkeypatch.setattr(cache_handler, "LEGACY_FILE", str(tmp_path / "collector_cache.json"))
+    monkeypatch.setattr(cache_handler, "_conn", None)
+    monkeypatch.setattr(cache_handler, "_size", 0)
+    monkeypatch.setattr(cache_handler, "_stats", dict.fromkeys(cache_handler._stats, 0))
+    monkeypatch.setattr(cache_handler.time, "time", clock)
+    yield clock
+    if cache_handler._conn is not None:
+        cache_handler._conn.close()
+
+
+def reopen(monkeypatch):
+    cache_handler._conn.close()
+    monkeypatch.setattr(cache_handler, "_conn", None)
+
+
+def test_round_trip_and_overwrite(clock):
+    assert get_from_cache("k") is None
+    write_cache("k", [{"title": "A"}])
+    assert get_from_cache("k") == [{"title": "A"}]
+
+    write_cache("k", [{"title": "B"}])
+    assert get_from_cache("k") == [{"title": "B"}]
+    stats = cache_stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["writes"]) == (1, 2, 1, 2)
+
+
+def test_entries_expire_after_ttl(clock):
+    write_cache("k", [1])
+    clock.now += cache_handler.TTL
+    assert get_from_cache("k") is None
+    assert cache_stats()["expired"] == 1
+    assert cache_stats()["size"] == 0
+
+
+def test_sweep_deletes_expired_rows(clock):
+    write_cache("old", [1])
+    clock.now += cache_handler.TTL / 2
+    write_cache("new", [2])
+    clock.now += cache_handler.TTL / 2 + 1
+
+    sweep()
+    assert cache_stats()["size"] == 1
+    assert get_from_cache("new") == [2]
+
+
+def test_least_recently_read_entries_are_evicted(clock, monkeypatch):
+    monkeypatch.setattr(cache_handler, "MAX_ENTRIES", 2)
+    write_cache("a", 1)
+    clock.now += 1
+    write_cache("b", 2)
+    clock.now += 1
+    get_from_cache("a")
+    clock.now += 1
+    write_cache("c", 3)
+
+    assert get_from_cache("b") is None
+    assert (get_from_cache("a"), get_from_cache("c")) == (1, 3)
+    assert cache_stats()["evicted"] == 1
+
+
+def test_cache_survives_a_restart(clock, monkeypatch):
+    write_cache("k", {"events": 3})
+    reopen(monkeypatch)
+    assert get_from_cache("k") == {"events": 3}
+    assert cache_stats()["size"] == 1
+
+
+def test_legacy_json_is_imported_once(clock, tmp_path):
+    legacy = tmp_path / "collector_cache.json"
+    legacy.write_text(json.dumps({
+        "fresh": {"data": ["x"], "timestamp": clock.now},
+        "bad": "not an entry",
+    }))
+
+    assert get_from_cache("fresh") == ["x"]
+    assert get_from_cache("bad") is None
+    assert not legacy.exists()
+    assert (tmp_path / "collector_cache.json.imported").exists()
+
+
+def test_concurrent_writers(clock):
+    def writer(n):
+        for i in range(50):
+            write_cache(f"{n}:{i}", [n, i])
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert cache_stats()["size"] == 400
+    assert all(get_from_cache(f"{n}:49") == [n, 49] for n in range(8))
@@ -0,0 +1,67 @@
+import datetime
+
+from backend.ai.dates import find_date_ranges, parse_date_range
+
+D = datetime.date
+
+
+def test_iso_date_and_range():
+    assert parse_date_range("2025-12-12") == (D(2025, 12, 12), D(2025, 12, 12))
+    assert parse_date_range("2025-12-12 to 2025-12-14") == (D(2025, 12, 12), D(2025, 12, 14))
+
+
+def test_iso_datetime_keeps_the_date():
+    assert parse_date_range("2025-12-12T10:00:00Z") == (D(2025, 12, 12), D(2025, 12, 12))
+
+
+def test_day_month_year_forms():
+    expected = (D(2025, 12, 12), D(2025, 12, 12))
+    assert parse_date_range("12 Dec 2025") == expected
+    assert parse_date_range("12th December 2025") == expected
+    assert parse_date_range("Dec 12, 2025") == expected
+    assert parse_date_range("12/12/2025") == expected
+
+
+def test_day_ranges():
+    assert parse_date_range("12–14 Dec 2025") == (D(2025, 12, 12), D(2025, 12, 14))
+    assert parse_date_range("Dec 12 - 14, 2025") == (D(2025, 12, 12), D(2025, 12, 14))
+
+
+def test_range_across_new_year():
+    assert parse_date_range("28 Dec – 3 Jan 2026") == (D(2025, 12, 28), D(2026, 1, 3))
+
+
+def test_whole_month():
+    assert parse_date_range("February 2028") == (D(2028, 2, 1), D(2028, 2, 29))
+    assert parse_date_range("December 2025") == (D(2025, 12, 1), D(2025, 12, 31))
+
+
+def test_month_to_month_range():
+    assert parse_date_range("Nov – Dec 2026") == (D(2026, 11, 1), D(2026, 12, 31))
+    assert parse_date_range("December 2025 to February 2026") == (D(2025, 12, 1), D(2026, 2, 28))
+
+
+def test_month_range_across_new_year():
+    assert parse_date_range("Dec 2025 - Jan 2026") == (D(2025, 12, 1), D(2026, 1, 31))
+    assert parse_date_range("Dec - Jan 2026") == (D(2025, 12, 1), D(2026, 1, 31))
+
+
+def test_range_wins_over_the_dates_inside_it():
+    assert find_date_ranges("Market 12 Dec – 3 Jan 2026, Canterbury") == [
+        (D(2025, 12, 12), D(2026, 1, 3)),
+    ]
+
+
+def test_every_range_in_reading_order():
+    text = "First 1 Mar 2026, then 2026-05-01 and finally June 2026"
+    assert find_date_ranges(text) == [
+        (D(2026, 3, 1), D(2026, 3, 1)),
+        (D(2026, 5, 1), D(2026, 5, 1)),
+        (D(2026, 6, 1), D(2026, 6, 30)),
+    ]
+
+
+def test_no_date():
+    assert parse_date_range("every Saturday") is None
+    assert parse_date_range("") is None
+    assert parse_date_range(None) is None
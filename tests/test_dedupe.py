@@ -0,0 +1,73 @@
+from backend.ai import dedupe
+from backend.ai.dedupe import Deduper, dedupe_events, merge_events
+
+
+def titles(events):
+    return [ev["title"] for ev in events]
+
+
+def test_winter_wonderland_variants_merge():
+    events = dedupe_events([
+        {"title": "Winter Wonderland", "location": "Hyde Park", "date": "20 Nov 2026 - 4 Jan 2027", "url": "https://a"},
+        {"title": "Hyde Park Winter Wonderland 2026", "location": "London", "date": "", "url": "https://b",
+         "description": "Rides and a market"},
+        {"title": "WINTER WONDERLAND", "location": "Hyde Park", "date": "20 Nov 2026 - 4 Jan 2027", "url": "https://c"},
+    ])
+
+    assert len(events) == 1
+    assert events[0]["title"] == "Winter Wonderland"
+    assert events[0]["description"] == "Rides and a market"
+    assert events[0]["sources"] == ["https://a", "https://b", "https://c"]
+
+
+def test_market_and_fair_at_the_same_park_are_kept_apart():
+    events = dedupe_events([
+        {"title": "Christmas Market", "location": "Greenwich Park", "date": "5 Dec 2026"},
+        {"title": "Christmas Fair", "location": "Greenwich Park", "date": "5 Dec 2026"},
+    ])
+    assert titles(events) == ["Christmas Market", "Christmas Fair"]
+
+
+def test_same_event_name_at_different_parks_is_kept_apart():
+    events = dedupe_events([
+        {"title": "Christmas Market", "location": "Greenwich Park", "date": "5 Dec 2026"},
+        {"title": "Christmas Market", "location": "Hyde Park", "date": "5 Dec 2026"},
+    ])
+    assert [ev["location"] for ev in events] == ["Greenwich Park", "Hyde Park"]
+
+
+def test_towns_in_the_same_county_are_kept_apart():
+    events = dedupe_events([
+        {"title": "Canterbury Christmas Market", "location": "Canterbury, Kent", "date": "Dec 2026"},
+        {"title": "Rochester Christmas Market", "location": "Rochester, Kent", "date": "Dec 2026"},
+    ])
+    assert len(events) == 2
+
+
+def test_different_dates_are_kept_apart_but_undated_events_match():
+    events = dedupe_events([
+        {"title": "Vintage Fair", "location": "Brighton Dome", "date": "1 Mar 2026", "url": "https://a"},
+        {"title": "Vintage Fair", "location": "Brighton Dome", "date": "1 Sep 2026", "url": "https://b"},
+        {"title": "Vintage Fair", "location": "Brighton Dome", "url": "https://c"},
+    ])
+    assert [ev["date"] for ev in events] == ["1 Mar 2026", "1 Sep 2026"]
+    assert events[0]["sources"] == ["https://a", "https://c"]
+
+
+def test_merge_leaves_members_untouched():
+    a = {"title": "Food Festival", "url": "https://a"}
+    b = {"title": "Food Festival", "location": "Bath", "url": "https://b"}
+    merged = merge_events([a, b])
+
+    assert merged["location"] == "Bath"
+    assert "sources" not in a and "location" not in a
+
+
+def test_same_event_merges_when_its_buckets_are_full(monkeypatch):
+    monkeypatch.setattr(dedupe, "MAX_BUCKET", 0)
+    deduper = Deduper()
+
+    assert deduper.add({"title": "Craft Fair", "location": "York", "date": "1 Dec 2026"})
+    # in no bucket, but it normalises like the first event
+    assert not deduper.add({"title": "craft fair 2026", "location": "York.", "date": "1 Dec 2026"})
+    assert len(deduper.records()) == 1
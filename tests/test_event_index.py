@@ -0,0 +1,124 @@
+import datetime
+
+import pytest
+
+from backend.ai import event_index
+from backend.ai.event_index import EventIndex, get_index, parse_sources, region_tokens, tokenize
+
+D = datetime.date
+
+RULES = """\
+Only list real events.
+
+- Canterbury Christmas Market — Canterbury — 28 Nov – 23 Dec 2026
+- Hyde Park Winter Wonderland — Hyde Park, London — 20 Nov 2026 to 4 Jan 2027
+- Brighton Vintage Fair — Brighton — 5 Sep 2026 https://example.org/vintage
+- {"title": "Maidstone Food Festival", "location": "Maidstone", "date": "2026-07-18"}
+"""
+
+NOTES = "Margate craft market every Sunday, Dreamland car park\n"
+
+PINS = [{"title": "Bluewater Pop-up", "location": "Bluewater, Kent", "date": "2026-12-05"}]
+SEEDS = [{"title": "NEC Spring Fair", "location": "NEC Birmingham", "date": "2026-02-01"}]
+
+
+@pytest.fixture
+def index():
+    return EventIndex.build(RULES, NOTES, PINS, SEEDS)
+
+
+def titles(entries):
+    return [e["text"].split(" — ")[0].lstrip("- ") for e in entries]
+
+
+def test_tokenize_drops_stopwords_and_stems():
+    assert tokenize("The Christmas Markets of London") == {"christma", "market", "london"}
+    assert tokenize("") == set()
+
+
+def test_region_tokens_expand_aliases():
+    kent = region_tokens("Kent")
+    assert {"kent", "canterbury", "bluewater", "margate"} <= kent
+    assert region_tokens("UK") == set()
+    assert region_tokens("") == set()
+
+
+def test_parse_sources_splits_guidance_from_events():
+    entries, guidance = parse_sources(RULES, NOTES, PINS, SEEDS)
+    assert guidance == ["Only list real events."]
+    assert [e["source"] for e in entries] == ["rules"] * 4 + ["notes", "pins", "seeds"]
+
+
+def test_entries_carry_dates_and_urls(index):
+    entries, _ = parse_sources(RULES, NOTES, PINS, SEEDS)
+    by_id = {e["id"]: e for e in entries}
+
+    canterbury = next(e for e in entries if "Canterbury" in e["text"])
+    assert (canterbury["start"], canterbury["end"]) == ("2026-11-28", "2026-12-23")
+
+    vintage = next(e for e in entries if "Vintage" in e["text"])
+    assert vintage["url"] == "https://example.org/vintage"
+
+    food = next(e for e in entries if e["event"] and e["source"] == "rules")
+    assert food["event"]["title"] == "Maidstone Food Festival"
+    assert food["start"] == "2026-07-18"
+
+    notes = [e for e in by_id.values() if e["source"] == "notes"]
+    assert notes[0]["start"] is None
+
+
+def test_lookup_filters_by_region(index):
+    found = index.lookup("Kent", "")
+    texts = " ".join(e["text"] for e in found)
+    assert "Canterbury" in texts and "Maidstone" in texts and "Bluewater" in texts
+    assert "Hyde Park" not in texts and "Brighton" not in texts
+
+
+def test_lookup_prefers_keyword_matches(index):
+    found = index.lookup("Kent", "christmas market")
+    assert "Canterbury Christmas Market" in found[0]["text"]
+    # keywords narrow the region's entries to the ones that match
+    assert all({"christma", "market"} & set(e["tokens"]) for e in found)
+
+
+def test_lookup_without_keyword_match_keeps_the_region(index):
+    found = index.lookup("Kent", "zeppelin")
+    assert len(found) == len(index.lookup("Kent", ""))
+
+
+def test_lookup_by_date_keeps_undated_entries(index):
+    found = index.lookup("", "", start=D(2026, 12, 1), end=D(2026, 12, 31))
+    texts = " ".join(e["text"] for e in found)
+    assert "Canterbury" in texts and "Winter Wonderland" in texts and "Bluewater" in texts
+    assert "Margate craft market" in texts
+    assert "Maidstone" not in texts and "NEC" not in texts
+
+
+def test_lookup_by_source(index):
+    found = index.lookup("", "", sources={"pins", "seeds"})
+    assert {e["source"] for e in found} == {"pins", "seeds"}
+
+
+def test_json_round_trip(index):
+    copy = EventIndex.from_json(index.to_json())
+    assert copy.version == index.version
+    assert copy.lookup("Kent", "market") == index.lookup("Kent", "market")
+
+
+def test_get_index_is_persisted_and_keyed_on_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_index, "INDEX_FILE", str(tmp_path / "event_index.json"))
+    monkeypatch.setattr(event_index, "_current", None)
+    monkeypatch.setattr(event_index, "_current_sources", None)
+
+    first = get_index(RULES, NOTES, PINS, SEEDS)
+    assert (tmp_path / "event_index.json").exists()
+    assert get_index(RULES, NOTES, PINS, SEEDS) is first
+
+    changed = get_index(RULES + "\n- Dover Fete — Dover — 1 Aug 2026\n", NOTES, PINS, SEEDS)
+    assert changed.version != first.version
+
+    # a restart loads the saved index instead of parsing again
+    event_index._current = None
+    event_index._current_sources = None
+    monkeypatch.setattr(EventIndex, "build", classmethod(lambda *a: pytest.fail("rebuilt")))
+    assert get_index(RULES + "\n- Dover Fete — Dover — 1 Aug 2026\n", NOTES, PINS, SEEDS).version == changed.version
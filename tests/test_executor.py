@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pytest
+
+from conftest import request
+
+from backend.ai import search_engine
+from backend.executor import BoundedExecutor, ExecutorBusy
+
+
+def test_runs_off_the_event_loop_thread():
+    executor = BoundedExecutor(max_workers=2, max_queue=2, name="test")
+    loop_thread = threading.get_ident()
+    worker_thread = asyncio.run(executor.run(threading.get_ident))
+    assert worker_thread != loop_thread
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+def test_errors_are_raised_to_the_caller_and_counted():
+    executor = BoundedExecutor(max_workers=1, max_queue=2, name="test")
+
+    def fail():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(fail))
+    assert executor.stats()["failed"] == 1
+    executor.shutdown()
+
+
+def test_full_queue_rejects_straight_away():
+    executor = BoundedExecutor(max_workers=1, max_queue=2, name="test")
+    gate = threading.Event()
+
+    async def main():
+        # one running, two waiting
+        jobs = [asyncio.ensure_future(executor.run(gate.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(ExecutorBusy):
+                await executor.run(gate.wait)
+        finally:
+            gate.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(main())
+    stats = executor.stats()
+    assert (stats["rejected"], stats["completed"], stats["queued"]) == (1, 3, 0)
+    executor.shutdown()
+
+
+def test_cancelled_queued_job_gives_its_slot_back():
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test")
+    gate = threading.Event()
+    ran = []
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(gate.wait))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(executor.run(ran.append, "queued"))
+        await asyncio.sleep(0.01)
+        assert executor.stats()["queued"] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        await asyncio.sleep(0.01)
+        assert executor.stats()["queued"] == 0
+
+        # the slot is free again while the worker is still busy
+        after = asyncio.ensure_future(executor.run(ran.append, "next"))
+        await asyncio.sleep(0.01)
+        assert executor.stats()["rejected"] == 0
+        gate.set()
+        await asyncio.gather(running, after)
+
+    try:
+        asyncio.run(main())
+    finally:
+        gate.set()
+    assert ran == ["next"]
+    executor.shutdown()
+
+
+def test_search_answers_503_when_the_executor_is_busy(search_env, monkeypatch):
+    async def busy(*args):
+        raise ExecutorBusy("32 jobs already waiting")
+
+    monkeypatch.setattr(search_engine.executor, "run", busy)
+    r = request("POST", "/search", json={"region": "Kent", "keywords": ""})
+    assert r.status_code == 503
+    assert r.json()["detail"] == "32 jobs already waiting"
@@ -0,0 +1,113 @@
+import json
+
+import bs4
+
+from backend.ai import extract_event as extract_module
+from backend.ai import structured_data
+from backend.ai.extract_event import extract_event
+
+URL = "https://example.org/whats-on"
+
+EVENT_PAGE = """
+<html><head><title>What's on</title></head><body>
+  <nav><a href="/">Home</a> <a href="/shop">Shop</a></nav>
+  <main>
+    <h1>Canterbury Christmas Market</h1>
+    <p>Sat 12 Dec 2026, Cathedral Precincts, Canterbury. Entry free.</p>
+  </main>
+  <footer>© Canterbury City Council</footer>
+</body></html>
+"""
+
+JSONLD_PAGE = """
+<html><head><script type="application/ld+json">
+{"@type": "Event", "name": "Dover Fete", "startDate": "2026-08-01"}
+</script></head><body><p>Dover Fete, 1 Aug 2026</p></body></html>
+"""
+
+
+def test_structured_data_skips_the_model(fresh_ai_cache, fake_chat):
+    events = extract_event(None, URL, JSONLD_PAGE)
+    assert [(e["title"], e["source"]) for e in events] == [("Dover Fete", "jsonld")]
+    assert fake_chat.calls == []
+
+
+def test_html_is_parsed_once(fresh_ai_cache, fake_chat, monkeypatch):
+    parses = []
+
+    class CountingSoup(bs4.BeautifulSoup):
+        def __init__(self, *args, **kwargs):
+            parses.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(extract_module, "BeautifulSoup", CountingSoup)
+    monkeypatch.setattr(structured_data, "BeautifulSoup", CountingSoup)
+    fake_chat.output = json.dumps([{"title": "Canterbury Christmas Market", "date": "2026-12-12"}])
+
+    extract_event(None, URL, EVENT_PAGE)
+    assert len(parses) == 1
+
+
+def test_other_pages_go_to_the_model_with_the_reduced_text(fresh_ai_cache, fake_chat):
+    fake_chat.output = json.dumps({"events": [{"title": "Canterbury Christmas Market", "date": "2026-12-12"}]})
+
+    events = extract_event(None, URL, EVENT_PAGE)
+
+    assert events == [{"title": "Canterbury Christmas Market", "date": "2026-12-12"}]
+    prompt = fake_chat.calls[0]["prompt"]
+    assert "Cathedral Precincts" in prompt
+    assert "Shop" not in prompt and "City Council" not in prompt
+
+
+def test_page_text_without_html(fresh_ai_cache, fake_chat):
+    fake_chat.output = "[]"
+    assert extract_event("Craft fair on 5 May 2026 at Ashford", URL) == []
+    assert "Craft fair on 5 May 2026" in fake_chat.calls[0]["prompt"]
+
+
+def test_empty_page_skips_the_model(fresh_ai_cache, fake_chat):
+    assert extract_event(None, URL, "<html><body><nav>Home</nav></body></html>") == []
+    assert fake_chat.calls == []
+
+
+def test_model_failure_gives_no_events(fresh_ai_cache, fake_chat):
+    fake_chat.error = RuntimeError("rate limited")
+    assert extract_event(None, URL, EVENT_PAGE) == []
+
+
+def test_unchanged_content_reuses_the_extraction(fresh_ai_cache, fake_chat):
+    fake_chat.output = json.dumps([{"title": "Canterbury Christmas Market", "date": "2026-12-12"}])
+    first = extract_event(None, URL, EVENT_PAGE)
+
+    # same event text, different markup, whitespace, navigation and URL
+    refetched = EVENT_PAGE.replace("<nav>", "<nav><a>Gifts</a>").replace("Entry free.", "Entry   free.\n")
+    again = extract_event(None, URL + "?utm=1", refetched)
+
+    assert again == first
+    assert len(fake_chat.calls) == 1
+    assert fresh_ai_cache.cache_stats()["extractions_avoided"] == 1
+
+
+def test_changed_content_is_extracted_again(fresh_ai_cache, fake_chat):
+    fake_chat.output = "[]"
+    extract_event(None, URL, EVENT_PAGE)
+    extract_event(None, URL, EVENT_PAGE.replace("12 Dec", "13 Dec"))
+    assert len(fake_chat.calls) == 2
+
+
+def test_incomplete_extraction_is_not_reused(fresh_ai_cache, fake_chat):
+    fake_chat.output = '[{"title": "Canterbury Christmas Market", "date": "2026-12-12"}, {"title": "Cut'
+    assert [e["title"] for e in extract_event(None, URL, EVENT_PAGE)] == ["Canterbury Christmas Market"]
+    extract_event(None, URL, EVENT_PAGE)
+    assert len(fake_chat.calls) == 2
+
+
+def test_content_cache_survives_a_restart(fresh_ai_cache, fake_chat, monkeypatch):
+    fake_chat.output = "[]"
+    extract_event(None, URL, EVENT_PAGE)
+    fresh_ai_cache.flush()
+    monkeypatch.setattr(fresh_ai_cache, "_pages", None)
+    monkeypatch.setattr(fresh_ai_cache, "_urls", None)
+
+    extract_event(None, URL, EVENT_PAGE)
+    assert len(fake_chat.calls) == 1
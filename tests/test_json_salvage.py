@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from backend.ai.json_utils import clean_json, salvage_json_array
+from backend.ai.query_expand import generate_urls
+
+EVENTS = [{"title": "Winter Fair", "tags": ["a", "]"]}, {"title": "Spring Fair"}, {"title": "Summer Fair"}]
+
+
+def test_clean_json_strips_fences():
+    assert clean_json('```json\n[1, 2]\n```') == "[1, 2]"
+    assert clean_json("```\n[]```") == "[]"
+    assert clean_json("") == ""
+
+
+def test_valid_json_is_not_counted_as_salvaged():
+    assert salvage_json_array(json.dumps(EVENTS)) == (EVENTS, {"salvaged": 0, "lost": 0, "truncated": False})
+    assert salvage_json_array("```json\n" + json.dumps(EVENTS) + "\n```")[0] == EVENTS
+
+
+def test_events_wrapper_and_single_object():
+    assert salvage_json_array(json.dumps({"events": EVENTS}))[0] == EVENTS
+    assert salvage_json_array('{"title": "Only"}')[0] == [{"title": "Only"}]
+
+
+def test_prose_around_the_array():
+    items, stats = salvage_json_array("Sure! Here are the events:\n" + json.dumps(EVENTS) + "\nHope that helps.")
+    assert items == EVENTS
+    assert stats == {"salvaged": 3, "lost": 0, "truncated": False}
+
+
+@pytest.mark.parametrize("cut", [10, 40, 60, -1])
+def test_truncated_output_keeps_every_complete_object(cut):
+    text = json.dumps(EVENTS)[:cut]
+    items, stats = salvage_json_array(text)
+
+    complete = [ev for ev in EVENTS if json.dumps(ev) in text]
+    assert items == complete
+    assert stats["salvaged"] == len(complete)
+    # the object being written when the output was cut off
+    assert stats["lost"] == (len(complete) < len(EVENTS))
+    assert stats["truncated"]
+
+
+def test_truncated_events_wrapper():
+    text = json.dumps({"events": EVENTS})[:-20]
+    items, stats = salvage_json_array(text)
+    assert items == EVENTS[:2]
+    assert stats["lost"] == 1 and stats["truncated"]
+
+
+def test_trailing_commas_and_malformed_items():
+    items, stats = salvage_json_array('[{"title": "A",}, {"title": oops}, {"title": "C"},]')
+    assert items == [{"title": "A"}, {"title": "C"}]
+    assert stats == {"salvaged": 2, "lost": 1, "truncated": False}
+
+
+def test_nothing_to_salvage():
+    assert salvage_json_array("I could not find any events.") == ([], {"salvaged": 0, "lost": 0, "truncated": True})
+    assert salvage_json_array(None)[0] == []
+
+
+def test_query_expansion_salvages_urls(fake_chat):
+    fake_chat.output = 'Here you go:\n```json\n["https://a.example/events", "https://b.example/whats-on"]\n```'
+    assert generate_urls("christmas market", "Kent") == [
+        "https://a.example/events", "https://b.example/whats-on",
+    ]
+
+    # cut off mid-URL
+    fake_chat.output = '["https://a.example/events", "https://b.example/whats-on", "https://c.exa'
+    assert generate_urls("christmas market", "Kent") == [
+        "https://a.example/events", "https://b.example/whats-on",
+    ]
+
+
+def test_truncated_array_of_strings():
+    assert salvage_json_array('["a", "b, c", "d') == (["a", "b, c"], {"salvaged": 2, "lost": 1, "truncated": True})
+    assert salvage_json_array('["a", "b",') == (["a", "b"], {"salvaged": 2, "lost": 0, "truncated": True})
+    assert salvage_json_array('["a') == ([], {"salvaged": 0, "lost": 0, "truncated": True})
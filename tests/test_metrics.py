@@ -0,0 +1,104 @@
+import logging
+import types
+
+import pytest
+
+from conftest import request
+
+from backend import metrics
+from backend.executor import BoundedExecutor
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """
+    An empty metrics registry for the test.
+    """
+    monkeypatch.setattr(metrics, "_metrics", [])
+    monkeypatch.setattr(metrics, "_caches", {})
+    monkeypatch.setattr(metrics, "_executors", {})
+
+
+def test_histogram_and_counter_render(registry):
+    h = metrics.Histogram("t_seconds", "Test.", buckets=(0.1, 1.0))
+    h.observe(0.05, stage="a")
+    h.observe(0.5, stage="a")
+    c = metrics.Counter("t_total", "Test.")
+    c.inc(2, call='say "hi"')
+
+    lines = metrics.render().splitlines()
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 2' in lines
+    assert 't_seconds_count{stage="a"} 2' in lines
+    assert 't_total{call="say \\"hi\\""} 2' in lines
+
+
+def test_cache_hit_ratio(registry):
+    metrics.register_cache("pages", lambda: {"content_hits": 3, "content_misses": 1}, "content_hits", "content_misses")
+    metrics.register_cache("broken", lambda: 1 / 0)
+
+    lines = metrics.render().splitlines()
+    assert 'popfinder_cache_hit_ratio{cache="pages"} 0.75' in lines
+    assert not any('cache="broken"' in line for line in lines)
+
+
+def test_executor_gauges(registry):
+    executor = BoundedExecutor(max_workers=2, max_queue=3, name="test")
+    executor.rejected = 4
+    metrics.register_executor("search", executor.stats)
+
+    lines = metrics.render().splitlines()
+    assert "# TYPE popfinder_executor_queued gauge" in lines
+    assert 'popfinder_executor_queued{executor="search"} 0' in lines
+    assert 'popfinder_executor_max_queue{executor="search"} 3' in lines
+    assert 'popfinder_executor_rejected_total{executor="search"} 4' in lines
+    executor.shutdown()
+
+
+def test_usage_and_cost():
+    usage = types.SimpleNamespace(input_tokens=1000, output_tokens=500)
+    assert metrics.record_usage("test", "gpt-4.1-mini", usage) == (1000, 500)
+    assert metrics.usage_cost("gpt-4.1-mini", 1_000_000, 1_000_000) == pytest.approx(2.0)
+    assert metrics.usage_cost("unknown", 1000, 1000) == 0.0
+
+
+def test_metrics_endpoint_exports_the_search_executor():
+    body = request("GET", "/metrics").text
+    assert 'popfinder_executor_active{executor="search"}' in body
+    assert 'popfinder_executor_rejected_total{executor="search"}' in body
+    assert 'popfinder_cache_hit_ratio{cache="search_results"}' in body
+
+
+@pytest.fixture
+def bare_logging(monkeypatch):
+    """
+    No handlers on "backend"; tests clear the root handlers themselves
+    (pytest adds its own once the test starts).
+    """
+    backend = logging.getLogger("backend")
+    monkeypatch.setattr(backend, "handlers", [])
+    monkeypatch.setattr(backend, "level", backend.level)
+    return backend
+
+
+def test_timing_lines_are_logged_once_configured(bare_logging, monkeypatch, capsys):
+    # as under uvicorn, which only sets up its own loggers
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    metrics.configure_logging("INFO")
+    metrics.configure_logging("INFO")
+    assert len(bare_logging.handlers) == 1
+
+    t = metrics.Timings("search")
+    t.add("model", 0.25)
+    t.done(logging.getLogger("backend.ai.search_engine"), region="Kent")
+
+    err = capsys.readouterr().err
+    assert err.count("backend.ai.search_engine: search region='Kent'") == 1
+    assert "model_ms=250.0" in err
+
+
+def test_root_handlers_are_used_when_present(bare_logging, monkeypatch):
+    monkeypatch.setattr(logging.getLogger(), "handlers", [logging.NullHandler()])
+    metrics.configure_logging("DEBUG")
+    assert bare_logging.handlers == [] and bare_logging.level == logging.DEBUG
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from conftest import request
+
+from backend.storage.notes import NoteLog
+
+
+def open_log(tmp_path, legacy=()):
+    return NoteLog(str(tmp_path / "notes.log"), str(tmp_path / "notes.idx"), tuple(str(p) for p in legacy))
+
+
+@pytest.fixture
+def notes(tmp_path):
+    return open_log(tmp_path)
+
+
+def test_append_and_page(notes):
+    for i in range(5):
+        assert notes.append(f"note {i}")["id"] == i
+
+    page, cursor = notes.page(0, 2)
+    assert [n["text"] for n in page] == ["note 0", "note 1"] and cursor == 2
+    page, cursor = notes.page(cursor, 2)
+    assert [n["text"] for n in page] == ["note 2", "note 3"] and cursor == 4
+    page, cursor = notes.page(cursor, 2)
+    assert [n["text"] for n in page] == ["note 4"] and cursor is None
+
+
+def test_tail_and_get(notes):
+    for i in range(5):
+        notes.append(f"note {i}")
+    assert [n["text"] for n in notes.tail(2)] == ["note 3", "note 4"]
+    assert notes.get(1)["text"] == "note 1"
+    assert notes.get(5) is None and notes.get(-1) is None
+
+
+def test_search_ranks_by_shared_words_then_newest(notes):
+    notes.append("Christmas market in Canterbury")
+    notes.append("Canterbury parking is expensive")
+    notes.append("Another Christmas market, Canterbury cathedral")
+    notes.append("Brighton pier")
+
+    found = [n["id"] for n in notes.search("canterbury christmas markets")]
+    assert found == [2, 0, 1]
+
+    # notes added later are searchable too
+    notes.append("Christmas markets Canterbury 2026")
+    assert notes.search("canterbury christmas market", 1)[0]["id"] == 4
+
+
+def test_log_is_reopened_without_rereading(tmp_path):
+    first = open_log(tmp_path)
+    for i in range(3):
+        first.append(f"note {i}")
+
+    again = open_log(tmp_path)
+    assert again.version() == 3
+    assert [n["text"] for n in again.tail(3)] == ["note 0", "note 1", "note 2"]
+
+
+def test_torn_write_is_recovered(tmp_path):
+    first = open_log(tmp_path)
+    first.append("kept")
+    first.append("also kept")
+    with open(tmp_path / "notes.log", "ab") as f:
+        f.write(b'{"id": 2, "text": "cut o')
+
+    again = open_log(tmp_path)
+    assert again.version() == 2
+    assert again.append("next")["id"] == 2
+    assert [n["text"] for n in again.tail(3)] == ["kept", "also kept", "next"]
+
+
+def test_missing_index_is_rebuilt(tmp_path):
+    first = open_log(tmp_path)
+    for i in range(3):
+        first.append(f"note {i}")
+    (tmp_path / "notes.idx").write_bytes(b"")
+
+    assert open_log(tmp_path).get(2)["text"] == "note 2"
+
+
+def test_legacy_notes_are_imported(tmp_path):
+    (tmp_path / "notes.json").write_text(json.dumps({"notes": [{"text": "from json"}, "plain"]}))
+    (tmp_path / "notes.txt").write_text("first block\n\nsecond\nblock\n")
+
+    notes = open_log(tmp_path, [tmp_path / "notes.json", tmp_path / "notes.txt"])
+    assert [n["text"] for n in notes.tail(10)] == ["from json", "plain", "first block", "second\nblock"]
+
+
+def test_notes_endpoints(search_env):
+    for i in range(3):
+        assert request("POST", "/notes", json={"text": f"market note {i}"}).json()["id"] == i
+
+    assert request("GET", "/notes", params={"limit": 2}).json()["next_cursor"] == 2
+    assert [n["id"] for n in request("GET", "/notes", params={"cursor": 2}).json()["notes"]] == [2]
+    assert [n["id"] for n in request("GET", "/notes", params={"tail": 1}).json()["notes"]] == [2]
+    assert len(request("GET", "/notes", params={"q": "market"}).json()["notes"]) == 3
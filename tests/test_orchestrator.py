@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from backend.collectors import orchestrator
+from backend.collectors.malls import MALLS, mall_source
+from backend.collectors.orchestrator import collect_all, collector_stats, default_sources
+
+
+def slow(seconds, events):
+    def collector():
+        time.sleep(seconds)
+        return events
+    return collector
+
+
+def broken():
+    raise RuntimeError("site changed")
+
+
+def test_collectors_run_concurrently():
+    sources = {f"site{i}": slow(0.2, [{"title": f"Event {i}"}]) for i in range(5)}
+
+    start = time.perf_counter()
+    events, report = asyncio.run(collect_all("market", "kent", deadline=5, sources=sources))
+
+    assert time.perf_counter() - start < 0.8
+    assert sorted(e["title"] for e in events) == [f"Event {i}" for i in range(5)]
+    assert all(r["status"] == "ok" and r["count"] == 1 for r in report.values())
+
+
+def test_deadline_keeps_what_arrived_in_time():
+    sources = {
+        "fast": slow(0, [{"title": "Fast"}]),
+        "stuck": slow(1.0, [{"title": "Late"}]),
+        "nothing": slow(0, []),
+        "broken": broken,
+    }
+
+    start = time.perf_counter()
+    events, report = asyncio.run(collect_all("market", "kent", deadline=0.2, sources=sources))
+
+    assert time.perf_counter() - start < 0.6
+    assert events == [{"title": "Fast"}]
+    assert {name: r["status"] for name, r in report.items()} == {
+        "fast": "ok", "stuck": "timeout", "nothing": "empty", "broken": "error",
+    }
+
+
+def test_no_sources():
+    assert asyncio.run(collect_all("market", "kent", sources={})) == ([], {})
+
+
+def test_stats_are_kept_per_source(monkeypatch):
+    monkeypatch.setattr(orchestrator, "_stats", {})
+    asyncio.run(collect_all("", "", deadline=1, sources={"a": slow(0, [{"title": "A"}]), "b": broken}))
+    asyncio.run(collect_all("", "", deadline=1, sources={"a": slow(0, [])}))
+
+    stats = collector_stats()
+    assert (stats["a"]["calls"], stats["a"]["ok"], stats["a"]["empty"]) == (2, 1, 1)
+    assert (stats["b"]["calls"], stats["b"]["failures"]) == (1, 1)
+
+
+def test_every_mall_is_its_own_source():
+    sources = default_sources("market", "london")
+    assert {"eventbrite", "excel", "visitkent", "visitlondon"} <= set(sources)
+    assert {mall_source(name) for name in MALLS} <= set(sources)
@@ -0,0 +1,103 @@
+from backend.ai.page_reducer import reduce_page, reduce_text
+from backend.ai.tokens import estimate_tokens, truncate_to_tokens
+
+
+def lines(html, budget=1500):
+    text, _ = reduce_page(html, budget)
+    return text.splitlines()
+
+
+def test_tokens_estimate_and_truncate():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a b c d e") == 5
+    assert estimate_tokens("x" * 40) == 10
+
+    text = "word " * 100
+    cut = truncate_to_tokens(text, 20)
+    assert estimate_tokens(cut) <= 20 and text.startswith(cut) and not cut.endswith(" wor")
+    assert truncate_to_tokens("short", 20) == "short"
+
+
+def test_drops_scripts_navigation_and_footers():
+    html = """
+      <html><head><title>Riverside Market</title><script>track()</script></head><body>
+        <nav><a>Home</a><a>Shop</a></nav>
+        <main><h1>Riverside Market</h1><p>Sun 7 Jun 2026, Riverside Park, Maidstone</p></main>
+        <aside>Related links</aside>
+        <footer>Copyright 2026</footer>
+      </body></html>
+    """
+    assert lines(html) == ["Riverside Market", "Sun 7 Jun 2026, Riverside Park, Maidstone"]
+
+
+def test_boilerplate_words_always_drop_the_element():
+    html = """
+      <body>
+        <div class="cookie-banner"><p>We use cookies. Accept all 12 Dec 2026</p></div>
+        <div id="newsletterSignup"><h2>Subscribe</h2></div>
+        <div class="ad-slot"><p>Tickets £5 elsewhere</p></div>
+        <p>Craft Fair, 5 May 2026</p>
+      </body>
+    """
+    assert lines(html) == ["Craft Fair, 5 May 2026"]
+
+
+def test_whole_words_only():
+    # "header" inside "subheader", "ad" inside "address" or "shadow"
+    html = """
+      <body>
+        <div class="subheader"><p>Opening times</p></div>
+        <div class="shadow-box"><p>Shadow puppets</p></div>
+        <address>1 High Street, Canterbury</address>
+      </body>
+    """
+    assert lines(html) == ["Opening times", "Shadow puppets", "1 High Street, Canterbury"]
+
+
+def test_event_header_and_banner_blocks_are_kept():
+    html = """
+      <body>
+        <header class="site-header"><a>Home</a><a>About</a></header>
+        <header class="event-header">
+          <h1>Hyde Park Winter Wonderland</h1>
+          <p>Sat 12 Dec 2026, Hyde Park</p>
+        </header>
+        <div class="hero-banner"><p>Entry £5</p></div>
+        <div class="promo-banner"><p>Shop our gifts</p></div>
+      </body>
+    """
+    assert lines(html) == ["Hyde Park Winter Wonderland", "Sat 12 Dec 2026, Hyde Park", "Entry £5"]
+
+
+def test_repeated_blocks_are_sent_once():
+    html = "<body>" + "<p>Book now</p>" * 5 + "<p>Food Festival 1 Jul 2026</p></body>"
+    text, stats = reduce_page(html)
+    assert text.splitlines() == ["Book now", "Food Festival 1 Jul 2026"]
+    assert stats["duplicates"] == 4
+
+
+def test_budget_keeps_event_details_first_in_page_order():
+    filler = "".join(f"<p>Story number {i} about the history of the town and its people.</p>" for i in range(50))
+    html = f"""
+      <html><head><title>Dover Fete</title></head><body>
+        {filler}
+        <h2>Dover Fete</h2>
+        <p>Sat 1 Aug 2026, Dover Castle. Entry £3.</p>
+        {filler}
+      </body></html>
+    """
+    text, stats = reduce_page(html, budget=40)
+
+    kept = text.splitlines()
+    assert stats["tokens_after"] <= 40 < stats["tokens_before"]
+    # the title and the event's details win the budget; what is left of
+    # it goes to the first other blocks, and everything is in page order
+    assert kept[0] == "Dover Fete"
+    assert kept[-1] == "Sat 1 Aug 2026, Dover Castle. Entry £3."
+    assert all(line.startswith("Stor") for line in kept[1:-1])
+
+
+def test_plain_text_fallback_is_a_budget_cut():
+    text, stats = reduce_text("word " * 1000, budget=50)
+    assert estimate_tokens(text) <= 50
+    assert stats["tokens_before"] == 1250
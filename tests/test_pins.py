@@ -0,0 +1,152 @@
+import base64
+import json
+import threading
+
+import pytest
+
+from conftest import future, request
+
+from backend.storage.pins import PinStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PinStore(str(tmp_path / "pins.db"), str(tmp_path / "pins.json"))
+
+
+def add_many(store, n):
+    return [store.add({"title": f"Pin {i}", "location": "Canterbury, Kent"}) for i in range(n)]
+
+
+def test_pins_get_their_own_ids(store):
+    first = store.add({"title": "Market", "id": "from-search-results"})
+    second = store.add({"title": "Market", "id": {"not": "a string"}})
+
+    assert first["id"] != "from-search-results"
+    assert first["id"] != second["id"]
+    assert store.get(first["id"]) == first
+
+
+def test_delete(store):
+    pin = store.add({"title": "Market"})
+    version = store.version()
+    assert store.delete(pin["id"])
+    assert not store.delete(pin["id"])
+    assert store.get(pin["id"]) is None
+    assert store.version() != version
+
+
+def test_filters(store):
+    store.add({"title": "Canterbury Market", "location": "Canterbury", "category": "Market", "date": "2026-12-01"})
+    store.add({"title": "Hyde Park Fair", "location": "Hyde Park, London", "category": "fair", "date": "1 - 3 Jan 2027"})
+    store.add({"title": "Old Fete", "location": "Dover", "category": "fair", "date": "2020-06-01"})
+    store.add({"title": "Pop-up", "location": "Margate"})
+
+    titles = lambda pins: [p["title"] for p in pins]
+    assert titles(store.list(region="Kent")) == ["Canterbury Market", "Old Fete", "Pop-up"]
+    assert titles(store.list(category="FAIR")) == ["Hyde Park Fair", "Old Fete"]
+    assert titles(store.list(date_from="2026-01-01")) == ["Canterbury Market", "Hyde Park Fair", "Pop-up"]
+    assert titles(store.list(date_from="2027-01-02", date_to="2027-02-01")) == ["Hyde Park Fair", "Pop-up"]
+
+
+def test_pages_follow_insertion_order(store):
+    pins = add_many(store, 5)
+
+    page, cursor = store.page(limit=2)
+    seen = list(page)
+    while cursor:
+        page, cursor = store.page(limit=2, cursor=cursor)
+        seen += page
+
+    assert seen == pins
+
+
+def test_full_last_page_has_no_cursor(store):
+    add_many(store, 4)
+    _, cursor = store.page(limit=2)
+    page, cursor = store.page(limit=2, cursor=cursor)
+    assert len(page) == 2 and cursor is None
+
+
+def test_cursor_survives_deleting_its_pin(store):
+    pins = add_many(store, 6)
+    page, cursor = store.page(limit=2)
+    store.delete(page[-1]["id"])
+
+    page, _ = store.page(limit=2, cursor=cursor)
+    assert page == pins[2:4]
+
+
+def test_unknown_cursor_is_rejected(store):
+    add_many(store, 2)
+    for raw in (b"pin:x", b"note:1", b"\xff"):
+        cursor = base64.urlsafe_b64encode(raw).decode()
+        with pytest.raises(ValueError):
+            store.page(limit=1, cursor=cursor)
+    with pytest.raises(ValueError):
+        store.page(limit=1, cursor="not a cursor!")
+
+
+def test_legacy_pins_are_imported_once(tmp_path):
+    legacy = tmp_path / "pins.json"
+    legacy.write_text(json.dumps([{"title": "Old pin", "id": 7}, "junk"]))
+
+    store = PinStore(str(tmp_path / "pins.db"), str(legacy))
+    pins = store.list()
+    assert [p["title"] for p in pins] == ["Old pin"]
+    assert isinstance(pins[0]["id"], str)
+
+    again = PinStore(str(tmp_path / "pins.db"), str(legacy))
+    assert again.list() == pins
+
+
+def test_concurrent_adds(store):
+    threads = [threading.Thread(target=add_many, args=(store, 25)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    pins = store.list()
+    assert len(pins) == 200
+    assert len({p["id"] for p in pins}) == 200
+
+
+def test_pins_endpoint_pages_with_the_header(search_env):
+    for i in range(5):
+        assert request("POST", "/pin", json={"content": {"title": f"Pin {i}"}}).status_code == 200
+
+    titles = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        r = request("GET", "/pins", params=params)
+        titles += [p["title"] for p in r.json()]
+        pages += 1
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert titles == [f"Pin {i}" for i in range(5)]
+    assert pages == 3
+
+
+def test_pins_endpoint_rejects_a_bad_cursor(search_env):
+    r = request("GET", "/pins", params={"limit": 2, "cursor": "bogus"})
+    assert r.status_code == 400
+
+
+def test_delete_endpoint(search_env):
+    pin_id = request("POST", "/pin", json={"content": {"title": "Pin"}}).json()["id"]
+    assert request("DELETE", f"/pin/{pin_id}").status_code == 200
+    assert request("DELETE", f"/pin/{pin_id}").status_code == 404
+
+
+def test_upcoming_pins_lead_the_search_results(search_env):
+    request("POST", "/pin", json={"content": {"title": "Bluewater Christmas Market", "location": "Bluewater", "date": future(5)}})
+    request("POST", "/pin", json={"content": {"title": "Past Christmas Market", "location": "Dover", "date": future(-5)}})
+    search_env.seeds = [{"title": "Maidstone Christmas Market", "location": "Maidstone, Kent", "date": future(20)}]
+
+    events = request("POST", "/search", json={"region": "Kent", "keywords": "christmas market"}).json()
+    assert [e["title"] for e in events] == ["Bluewater Christmas Market", "Maidstone Christmas Market"]
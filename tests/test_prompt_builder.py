@@ -0,0 +1,95 @@
+import pytest
+
+from backend.ai.prompt_builder import INSTRUCTIONS, build_search_prompt, build_search_prompts, minify_json
+from backend.ai.tokens import estimate_tokens
+
+
+def entry(i, text=None, event=None):
+    return {"id": f"r{i}", "text": text or f"Market {i} — Hall {i} — {i} Dec 2026", "event": event}
+
+
+def build(entries=(), guidance=("Prefer markets.",), hints=(), region="Kent", keywords="market", **kwargs):
+    return build_search_prompt(list(entries), list(guidance), list(hints), region, keywords, "2026-11-01", **kwargs)
+
+
+def test_static_prefix_first_and_query_last():
+    prompt, _ = build([entry(1)])
+
+    assert prompt.startswith(INSTRUCTIONS)
+    assert prompt.index("RULES.TXT GUIDANCE") < prompt.index("CATALOGUE ENTRIES") < prompt.index("NOTES.TXT")
+    assert prompt.rstrip().endswith("Region: Kent\nKeywords: market\nToday: 2026-11-01")
+
+
+def test_prefix_is_shared_across_queries():
+    entries = [entry(1), entry(2)]
+    a, _ = build(entries, region="Kent", keywords="market")
+    b, _ = build(entries, region="London", keywords="fair")
+
+    query = a.index("USER QUERY")
+    assert a[:query] == b[:query]
+
+
+def test_catalogue_in_index_order_whatever_the_relevance():
+    prompt, _ = build([entry(10), entry(2), entry(1)])
+    assert prompt.index("Market 1 ") < prompt.index("Market 2 ") < prompt.index("Market 10 ")
+
+
+def test_structured_entries_are_minified():
+    event = {"title": "Fair", "date": "1 Dec 2026", "url": "https://x"}
+    prompt, _ = build([entry(1, event=event)])
+    assert minify_json(event) in prompt
+    assert minify_json(event) == '{"date":"1 Dec 2026","title":"Fair","url":"https://x"}'
+
+
+def test_duplicate_entries_and_notes_are_dropped():
+    prompt, stats = build(
+        [entry(1, "Craft Fair — York"), entry(2, "craft  fair — YORK")],
+        hints=["Craft Fair — York", "Bring cash", "bring   cash", ""],
+    )
+    assert stats["entries"] == 1
+    assert stats["notes"] == 1
+    assert stats["duplicates"] == 4
+    assert prompt.count("Bring cash") == 1
+
+
+def test_budget_admits_the_most_relevant_entries():
+    entries = [entry(i, f"Market {i} " + "word " * 200) for i in range(20)]
+    prompt, stats = build(entries, budget=2000)
+
+    assert estimate_tokens(prompt) <= 2000
+    assert 0 < stats["entries"] < 20
+    assert stats["entries"] + stats["entries_dropped"] == 20
+    # relevance order decides what fits
+    assert "Market 0 " in prompt and "Market 19 " not in prompt
+
+
+def test_notes_get_at_most_their_share():
+    hints = [f"note {i} " + "word " * 100 for i in range(20)]
+    prompt, stats = build([entry(1)], hints=hints, budget=3000)
+
+    assert estimate_tokens(prompt) <= 3000
+    assert stats["notes"] + stats["notes_dropped"] == 20
+    assert stats["notes"] * 125 <= 3000 * 0.2 + 125
+
+
+def test_oversized_guidance_is_truncated():
+    prompt, _ = build([entry(1)], guidance=["rule " * 5000], budget=1500)
+    assert estimate_tokens(prompt) <= 1500
+    assert prompt.rstrip().endswith("Today: 2026-11-01")
+
+
+def test_shards_share_the_prefix():
+    entries = [entry(i, f"Market {i} " + "word " * 200) for i in range(12)]
+    prompts, stats = build_search_prompts(entries, ["Prefer markets."], [], "Kent", "market", "2026-11-01",
+                                          budget=2000, max_shards=4)
+
+    assert stats["shards"] == len(prompts) > 1
+    assert sum(stats["shard_entries"]) == stats["entries"]
+    head = prompts[0][:prompts[0].index("CATALOGUE ENTRIES")]
+    assert all(p.startswith(head) and estimate_tokens(p) <= 2000 for p in prompts)
+
+
+@pytest.mark.parametrize("entries", [[], [entry(1)]])
+def test_always_one_prompt(entries):
+    prompts, stats = build_search_prompts(entries, [], [], "UK", "", "2026-11-01")
+    assert len(prompts) == 1 and stats["shards"] == 1
@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+
+import pytest
+
+from conftest import future
+
+from backend.ai import ranker
+from backend.ai.ranker import feature_columns, rank_events, score_batch, score_events
+from backend.ai.score_event import score_event
+from backend.ai.search_engine import smart_event_search
+
+TODAY = datetime.date(2026, 11, 1)
+
+
+def ev(title, location="", date="", category="", url="", **extra):
+    return dict(title=title, location=location, date=date, category=category, url=url, **extra)
+
+
+def test_feature_columns():
+    events = [
+        ev("Canterbury Christmas Market", "Canterbury, Kent", "1 Nov 2026", "christmas market",
+           "https://www.eventbrite.co.uk/e/1", sources=["a", "b", "c"]),
+        ev("Craft Fair", "Brighton, Sussex", "30 Jan 2027", "fair", "https://blog.example.com/x"),
+        ev("Comic Con", "Glasgow", "", "", ""),
+    ]
+    cols = feature_columns(events, "Kent", "christmas market", TODAY)
+
+    assert cols["keyword"] == [1.0, 0.0, 0.0]
+    assert cols["region"] == [1.0, ranker.NEARBY_SHARE, 0.0]
+    assert cols["date"][0] == 1.0 and 0 < cols["date"][1] < 1 and cols["date"][2] == 0.0
+    assert cols["category"] == [1.0, 0.8, ranker.CATEGORY_DEFAULT]
+    assert cols["trust"] == [1.0, 0.5, 0.2]
+
+
+def test_uk_wide_and_keywordless_queries_do_not_penalise():
+    cols = feature_columns([ev("Anything", "Glasgow")], "UK", "", TODAY)
+    assert cols["keyword"] == [1.0] and cols["region"] == [1.0]
+
+
+def test_scores_are_the_sum_of_contributions():
+    events = [ev("Kent Christmas Market", "Maidstone, Kent", "5 Dec 2026", "christmas market")]
+    scores, contributions = score_batch(events, "Kent", "christmas market", TODAY)
+
+    assert 0 < scores[0] <= 100
+    assert scores[0] == pytest.approx(sum(c[0] for c in contributions.values()), abs=0.01)
+    assert set(contributions) == set(ranker.FEATURES)
+
+
+def test_score_events_adds_fields_without_touching_the_input():
+    original = ev("Kent Christmas Market", "Maidstone, Kent", "5 Dec 2026", "christmas market")
+    (scored,) = score_events([original], "Kent", "christmas market", TODAY)
+
+    assert "score" not in original
+    assert set(scored["score_features"]) == set(ranker.FEATURES)
+    assert 0 <= scored["footfall_score"] <= 10 and 0 <= scored["vendor_fit_score"] <= 10
+    assert score_event(original, "Kent", "christmas market")["score"] > 0
+
+
+def test_rank_events_best_first_ties_in_input_order():
+    events = [
+        ev("Comic Con", "Glasgow", "1 Oct 2027"),
+        ev("Twin A", "Dover, Kent", "1 Dec 2026", "market"),
+        ev("Rochester Christmas Market", "Rochester, Kent", "3 Nov 2026", "christmas market",
+           "https://www.visitkent.co.uk/r"),
+        ev("Twin B", "Dover, Kent", "1 Dec 2026", "market"),
+    ]
+    ranked = [e["title"] for e in rank_events(events, "Kent", "christmas market", TODAY)]
+    assert ranked == ["Rochester Christmas Market", "Twin A", "Twin B", "Comic Con"]
+
+
+def test_rank_is_deterministic():
+    events = [ev(f"Market {i}", "Kent", f"{i + 1} Dec 2026", "market") for i in range(20)]
+    first = rank_events(events, "Kent", "market", TODAY)
+    assert rank_events(events, "Kent", "market", TODAY) == first
+
+
+def test_weights():
+    events = [
+        ev("Christmas Market", "Glasgow", "1 Nov 2026"),
+        ev("Craft Fair", "Canterbury, Kent", "1 Nov 2026"),
+    ]
+    by_keyword = rank_events(events, "Kent", "christmas market", TODAY, weights={"keyword": 1.0})
+    by_region = rank_events(events, "Kent", "christmas market", TODAY, weights={"region": 1.0})
+
+    assert by_keyword[0]["title"] == "Christmas Market" and by_keyword[0]["score"] == 100.0
+    assert by_region[0]["title"] == "Craft Fair"
+
+
+def test_weights_from_the_environment_spec():
+    weights = ranker._parse_weights("keyword=0.9, date=bad, unknown=1, trust=0")
+    assert weights["keyword"] == 0.9
+    assert weights["date"] == ranker.DEFAULT_WEIGHTS["date"]
+    assert weights["trust"] == 0.0
+    assert "unknown" not in weights
+    assert ranker._parse_weights(None) == ranker.DEFAULT_WEIGHTS
+
+
+def test_search_results_pins_first_then_ranked(search_env):
+    search_env.pins = [{"title": "Glasgow Comic Con", "date": future(300), "location": "Glasgow",
+                        "url": "https://www.eventbrite.co.uk/e/9"}]
+    search_env.seeds = [
+        {"title": "Dover Craft Market", "date": future(150), "location": "Dover, Kent", "category": "market",
+         "url": "https://www.eventbrite.co.uk/e/1"},
+        {"title": "Canterbury Christmas Market", "date": future(5), "location": "Canterbury, Kent",
+         "category": "christmas market", "url": "https://www.eventbrite.co.uk/e/2"},
+    ]
+
+    events = asyncio.run(smart_event_search("Kent", "christmas market"))
+
+    assert [e["title"] for e in events] == ["Glasgow Comic Con", "Canterbury Christmas Market", "Dover Craft Market"]
+    assert search_env.model.calls == []
+    assert all("score_features" in e for e in events)
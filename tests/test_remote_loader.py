@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from backend.ai import remote_loader
+
+
+class Origin:
+    """
+    MockTransport handler serving {path: body} with an optional delay,
+    an ETag per body, and a switch to take the origin down.
+    """
+
+    def __init__(self, files, delay=0.0):
+        self.files = dict(files)
+        self.delay = delay
+        self.down = False
+        self.requests = []
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.down:
+            return httpx.Response(503)
+        body = self.files.get(request.url.path)
+        if body is None:
+            return httpx.Response(404)
+        etag = f'"{hash(body) & 0xffffffff:x}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, text=body, headers={"etag": etag})
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    origin = Origin({})
+    monkeypatch.setattr(remote_loader, "CACHE_FILE", str(tmp_path / "remote_cache.json"))
+    monkeypatch.setattr(remote_loader, "_entries", {})
+    monkeypatch.setattr(remote_loader, "_stats", dict.fromkeys(remote_loader._stats, 0))
+    monkeypatch.setattr(remote_loader, "_saved_generation", 0)
+    monkeypatch.setattr(remote_loader, "REVALIDATE_AFTER", 60)
+    monkeypatch.setattr(remote_loader, "_client", httpx.AsyncClient(transport=httpx.MockTransport(origin)))
+    return origin
+
+
+def test_load_all_fetches_sources_concurrently(origin):
+    origin.files = {
+        "/rules.txt": "rules",
+        "/notes.txt": "notes",
+        "/pins.json": '[{"title": "Pin"}]',
+        "/seed_events.json": "[]",
+    }
+    origin.delay = 0.2
+
+    start = time.perf_counter()
+    data, timings = asyncio.run(remote_loader.load_all({
+        "rules": ("http://data/rules.txt", "text"),
+        "notes": ("http://data/notes.txt", "text"),
+        "pins": ("http://data/pins.json", "json"),
+        "seeds": ("http://data/seed_events.json", "json"),
+    }))
+    elapsed = time.perf_counter() - start
+
+    assert data == {"rules": "rules", "notes": "notes", "pins": [{"title": "Pin"}], "seeds": []}
+    assert set(timings) == {"rules", "notes", "pins", "seeds"}
+    assert elapsed < 0.6
+
+
+def test_failed_source_without_a_copy_is_empty(origin):
+    data, _ = asyncio.run(remote_loader.load_all({
+        "notes": ("http://data/missing.txt", "text"),
+        "pins": ("http://data/missing.json", "json"),
+    }))
+    assert data == {"notes": "", "pins": []}
+
+
+def restart(monkeypatch):
+    monkeypatch.setattr(remote_loader, "_entries", None)
+
+
+def test_fresh_copy_is_served_from_memory(origin):
+    origin.files = {"/rules.txt": "v1"}
+    assert asyncio.run(remote_loader.fetch_text("http://data/rules.txt")) == "v1"
+    assert asyncio.run(remote_loader.fetch_text("http://data/rules.txt")) == "v1"
+    assert len(origin.requests) == 1
+    assert remote_loader.cache_stats()["fresh"] == 1
+
+
+def test_stale_copy_is_revalidated_with_its_etag(origin, monkeypatch):
+    origin.files = {"/rules.txt": "v1"}
+    monkeypatch.setattr(remote_loader, "REVALIDATE_AFTER", 0)
+
+    assert asyncio.run(remote_loader.fetch_text("http://data/rules.txt")) == "v1"
+    assert asyncio.run(remote_loader.fetch_text("http://data/rules.txt")) == "v1"
+    assert "if-none-match" not in origin.requests[0].headers
+    assert origin.requests[1].headers["if-none-match"]
+    assert remote_loader.cache_stats()["not_modified"] == 1
+
+    origin.files = {"/rules.txt": "v2"}
+    assert asyncio.run(remote_loader.fetch_text("http://data/rules.txt")) == "v2"
+    assert remote_loader.cache_stats()["downloaded"] == 2
+
+
+def test_last_good_copy_survives_an_outage_and_a_restart(origin, monkeypatch):
+    origin.files = {"/pins.json": '[{"title": "Pin"}]'}
+    monkeypatch.setattr(remote_loader, "REVALIDATE_AFTER", 0)
+    assert asyncio.run(remote_loader.fetch_json("http://data/pins.json")) == [{"title": "Pin"}]
+
+    origin.down = True
+    restart(monkeypatch)
+    assert asyncio.run(remote_loader.fetch_json("http://data/pins.json")) == [{"title": "Pin"}]
+    assert remote_loader.cache_stats()["stale"] == 1
+
+
+def test_concurrent_cold_loads_leave_a_valid_cache_file(origin, tmp_path):
+    urls = [f"http://data/file{i}.txt" for i in range(200)]
+    origin.files = {f"/file{i}.txt": f"body {i} " * 200 for i in range(200)}
+
+    async def load():
+        return await asyncio.gather(*(remote_loader.fetch_text(u) for u in urls))
+
+    assert asyncio.run(load()) == [f"body {i} " * 200 for i in range(200)]
+
+    with open(tmp_path / "remote_cache.json", encoding="utf-8") as f:
+        saved = json.load(f)
+    # the newest snapshot holds every download
+    assert set(saved) == set(urls)
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
+
+
+def test_older_snapshot_never_replaces_a_newer_one(origin, tmp_path):
+    remote_loader._save_entries({"u": {"body": "new"}}, 5)
+    remote_loader._save_entries({"u": {"body": "old"}}, 4)
+
+    with open(tmp_path / "remote_cache.json", encoding="utf-8") as f:
+        assert json.load(f) == {"u": {"body": "new"}}
+
+
+def test_overlapping_saves_do_not_interleave(origin, tmp_path):
+    snapshots = [{f"u{i}": {"body": str(i) * 5000}} for i in range(1, 41)]
+    threads = [
+        threading.Thread(target=remote_loader._save_entries, args=(snap, gen))
+        for gen, snap in enumerate(snapshots, 1)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with open(tmp_path / "remote_cache.json", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved in snapshots
+    assert remote_loader._saved_generation == max(
+        gen for gen, snap in enumerate(snapshots, 1) if snap == saved
+    )
+
+
+def test_concurrent_fetches_of_one_url_share_a_request(origin):
+    origin.files = {"/rules.txt": "v1"}
+    origin.delay = 0.05
+
+    async def main():
+        return await asyncio.gather(*(remote_loader.fetch_text("http://data/rules.txt") for _ in range(10)))
+
+    assert asyncio.run(main()) == ["v1"] * 10
+    assert len(origin.requests) == 1
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from conftest import future
+
+from backend.ai.result_cache import ResultCache, make_key, normalize_query
+from backend.ai.search_engine import smart_event_search
+
+
+def test_normalize_query_ignores_order_case_and_plurals():
+    assert normalize_query("Christmas Markets London") == normalize_query("london christmas market")
+    assert normalize_query("the  markets") == "market"
+
+
+def test_key_includes_data_version_and_day():
+    key = make_key("London", "Markets", "v1", "2026-01-01")
+    assert key == make_key("london", "market", "v1", "2026-01-01")
+    assert key != make_key("london", "market", "v2", "2026-01-01")
+    assert key != make_key("london", "market", "v1", "2026-01-02")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire(monkeypatch):
+    cache = ResultCache(max_size=2, ttl=10)
+    cache.put("a", 1)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_stats_count_hits_and_misses():
+    cache = ResultCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def catalogue(env):
+    env.rules = f"Canterbury's Christmas market opens on {future(30, '%d %b %Y')} by the Cathedral.\n"
+    env.answer([{
+        "title": "Canterbury Christmas Market",
+        "date": future(30),
+        "location": "Canterbury, Kent",
+        "url": "",
+    }])
+
+
+def test_repeated_search_is_served_from_the_cache(search_env):
+    catalogue(search_env)
+
+    first = asyncio.run(smart_event_search("Kent", "christmas markets"))
+    again = asyncio.run(smart_event_search("kent", "Christmas Market"))
+
+    assert [e["title"] for e in first] == ["Canterbury Christmas Market"]
+    assert again == first
+    assert len(search_env.model.calls) == 1
+
+
+def test_changed_data_misses_the_cache(search_env):
+    catalogue(search_env)
+    asyncio.run(smart_event_search("Kent", "christmas market"))
+
+    search_env.rules += f"\nRochester's Christmas market runs on {future(40, '%d %b %Y')} at the castle.\n"
+    asyncio.run(smart_event_search("Kent", "christmas market"))
+    assert len(search_env.model.calls) == 2
@@ -0,0 +1,100 @@
+import asyncio
+
+from conftest import future
+
+from backend import metrics
+from backend.ai import routing
+from backend.ai.routing import choose_route, format_entry, output_budget
+from backend.ai.search_engine import smart_event_search
+
+
+def entry(i, text=None, start="2026-12-05", end=None, url=None):
+    return {
+        "id": f"r{i}",
+        "text": text or f"- Craft Fair {i} — Hall {i} — 5 Dec 2026\nStalls and food. https://example.com/{i}",
+        "start": start,
+        "end": end,
+        "url": url,
+        "event": None,
+    }
+
+
+def test_format_entry():
+    ev = format_entry(entry(1, url="https://example.com/1"))
+    assert ev == {
+        "title": "Craft Fair 1",
+        "date": "2026-12-05",
+        "location": "Hall 1",
+        "description": "Stalls and food.",
+        "url": "https://example.com/1",
+        "category": "fair",
+    }
+
+    ranged = format_entry(entry(2, "Christmas Market | Old Town | 5–7 Dec 2026", end="2026-12-07"))
+    assert ranged["date"] == "2026-12-05 to 2026-12-07"
+    assert ranged["category"] == "christmas market"
+
+
+def test_entries_without_the_catalogue_shape_need_the_model():
+    assert format_entry(entry(1, start=None)) is None
+    assert format_entry(entry(1, "   \n  ")) is None
+    assert format_entry(entry(1, "5 Dec 2026 — https://example.com")) is None
+    assert format_entry(entry(1, "x" * 200 + " — Hall — 5 Dec 2026")) is None
+
+
+def test_routes_by_candidate_count():
+    assert choose_route([]) == ("index", None, [])
+
+    route, model, events = choose_route([entry(i) for i in range(routing.LOCAL_MAX)])
+    assert (route, model) == ("local", None) and len(events) == routing.LOCAL_MAX
+
+    # one unformattable block sends a small set to the model
+    mixed = [entry(1), entry(2, start=None)]
+    assert choose_route(mixed) == ("small", routing.SMALL_MODEL, None)
+
+    assert choose_route([entry(i) for i in range(routing.LOCAL_MAX + 1)])[0] == "small"
+    assert choose_route([entry(i) for i in range(routing.SMALL_MAX)])[0] == "small"
+    assert choose_route([entry(i) for i in range(routing.SMALL_MAX + 1)]) == ("large", routing.LARGE_MODEL, None)
+
+
+def test_output_budget_follows_the_prompt_size():
+    assert output_budget("small", 1) == routing.OUTPUT_BASE + routing.TOKENS_PER_EVENT["small"]
+    assert output_budget("small", 10) < output_budget("small", 20)
+    assert output_budget("small", 1000) == routing.SMALL_OUTPUT_MAX
+    assert output_budget("large", routing.MAX_EVENTS) == routing.LARGE_OUTPUT_MAX
+    # more blocks than MAX_EVENTS cannot produce more output
+    assert output_budget("large", 500) == output_budget("large", routing.MAX_EVENTS)
+
+
+def route_count(route):
+    return metrics.SEARCH_ROUTES.values.get((("route", route),), 0)
+
+
+def test_few_catalogue_matches_skip_the_model(search_env):
+    day = future(30, "%d %b %Y")
+    search_env.rules = "\n\n".join(
+        f"- {name} Christmas Market — {name} Castle, Kent — {day}\nMulled wine. https://www.visitkent.co.uk/{name}"
+        for name in ("Rochester", "Leeds", "Dover")
+    )
+    before = route_count("local")
+
+    events = asyncio.run(smart_event_search("Kent", "christmas market"))
+
+    assert search_env.model.calls == []
+    assert {ev["title"] for ev in events} == {
+        "Rochester Christmas Market", "Leeds Christmas Market", "Dover Christmas Market",
+    }
+    assert route_count("local") == before + 1
+
+
+def test_prose_matches_use_the_small_model_with_a_sized_budget(search_env):
+    day = future(30, "%d %b %Y")
+    search_env.rules = "\n\n".join(
+        f"{name}'s Christmas market opens on {day} in Kent." for name in ("Rochester", "Leeds", "Dover")
+    )
+
+    asyncio.run(smart_event_search("Kent", "christmas market"))
+
+    (call,) = search_env.model.calls
+    assert call["model"] == routing.SMALL_MODEL
+    assert call["max_output_tokens"] == output_budget("small", 3)
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from conftest import future
+
+from backend.ai import search_engine
+from backend.ai.search_engine import smart_event_search
+
+NAMES = [
+    "alder", "birch", "cedar", "damson", "elm", "fir", "gorse", "hazel", "ivy", "juniper",
+    "larch", "maple", "nettle", "oak", "poplar", "quince", "rowan", "sorrel", "teasel", "willow",
+]
+
+
+def setup(env, names=NAMES, filler=300):
+    # long entries, so the catalogue needs more than one prompt
+    env.rules = "\n\n".join(
+        f"{name.title()} craft market, {name.title()} Hall, Kent on {future(20 + i, '%d %b %Y')}. "
+        + "stalls " * filler
+        for i, name in enumerate(names)
+    )
+
+    def answer(prompt):
+        found = re.findall(r"^(\w+) craft market", prompt, re.M)
+        events = [
+            {"title": f"{name} craft market", "date": future(20 + NAMES.index(name.lower())),
+             "location": f"{name} Hall, Kent"}
+            for name in found
+        ]
+        # every shard also reports the same county-wide event
+        events.append({"title": "Kent Christmas Fair", "date": future(25), "location": "Detling Showground"})
+        return json.dumps(events)
+
+    env.model.output = answer
+
+
+def catalogue_names(prompt):
+    return re.findall(r"^(\w+) craft market", prompt, re.M)
+
+
+def test_large_catalogue_is_split_into_shards(search_env):
+    setup(search_env)
+    events = asyncio.run(smart_event_search("Kent", "craft market"))
+
+    prompts = [c["input"] for c in search_env.model.calls]
+    assert len(prompts) > 1
+    # every entry in exactly one shard, each shard within the prompt budget
+    names = [n for p in prompts for n in catalogue_names(p)]
+    assert sorted(n.lower() for n in names) == sorted(NAMES)
+    head = prompts[0][:prompts[0].index("CATALOGUE ENTRIES")]
+    assert all(p.startswith(head) for p in prompts)
+
+    titles = [ev["title"] for ev in events]
+    assert sorted(t.split()[0].lower() for t in titles if "craft" in t) == sorted(NAMES)
+    assert titles.count("Kent Christmas Fair") == 1
+    assert len(events) == len(NAMES) + 1
+
+
+def test_failed_shard_keeps_the_others_and_is_not_cached(search_env):
+    setup(search_env)
+    answer = search_env.model.output
+
+    def flaky(prompt):
+        if "Alder craft market" in prompt:
+            raise RuntimeError("model timeout")
+        return answer(prompt)
+
+    search_env.model.output = flaky
+    events = asyncio.run(smart_event_search("Kent", "craft market"))
+
+    calls = len(search_env.model.calls)
+    assert calls > 1
+    titles = {ev["title"] for ev in events}
+    assert "Alder craft market" not in titles
+    assert "Willow craft market" in titles
+
+    asyncio.run(smart_event_search("Kent", "craft market"))
+    assert len(search_env.model.calls) == 2 * calls
+
+
+def test_every_shard_failing_fails_the_search(search_env):
+    setup(search_env)
+
+    def down(prompt):
+        raise RuntimeError("model down")
+
+    search_env.model.output = down
+    with pytest.raises(RuntimeError, match="model down"):
+        asyncio.run(smart_event_search("Kent", "craft market"))
+
+
+def test_shards_run_at_most_shard_workers_at_a_time(search_env, monkeypatch):
+    monkeypatch.setattr(search_engine, "SHARD_WORKERS", 2)
+    setup(search_env, filler=600)
+    search_env.model.delay = 0.05
+
+    running = 0
+    peak = 0
+    create = search_env.model.create
+
+    async def tracked(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            return await create(**kwargs)
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(search_env.model, "create", tracked)
+    asyncio.run(smart_event_search("Kent", "craft market"))
+
+    assert len(search_env.model.calls) > 2
+    assert peak == 2
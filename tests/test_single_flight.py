@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from conftest import future
+
+from backend.ai.search_engine import smart_event_search
+from backend.ai.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(runs) == 1
+    assert flight.stats() == {"started": 1, "shared": 4, "in_flight": 0}
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0, "a")), flight.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.started == 2
+
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        # the next call starts afresh
+        return await flight.do("k", lambda: asyncio.sleep(0, "ok"))
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_identical_concurrent_searches_make_one_model_call(search_env):
+    search_env.rules = f"Canterbury's Christmas market opens on {future(30, '%d %b %Y')} by the Cathedral.\n"
+    search_env.answer([{"title": "Canterbury Christmas Market", "date": future(30), "location": "Canterbury"}])
+    search_env.model.delay = 0.05
+
+    async def main():
+        return await asyncio.gather(
+            smart_event_search("Kent", "christmas market"),
+            smart_event_search("kent", "Christmas Markets"),
+            smart_event_search("KENT", "market christmas"),
+        )
+
+    results = asyncio.run(main())
+    assert results[0] == results[1] == results[2]
+    assert len(search_env.model.calls) == 1
+    assert search_env.loads == 1
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+from conftest import future, request
+
+from backend.ai.json_utils import JsonArrayStream
+from backend.ai.result_cache import search_cache
+from backend.ai.search_engine import smart_event_search, stream_event_search
+
+
+def feed_in_chunks(text, size):
+    parser = JsonArrayStream()
+    out = []
+    for i in range(0, len(text), size):
+        out.extend(parser.feed(text[i:i + size]))
+    return parser, out
+
+
+def test_stream_parser_yields_objects_as_they_complete():
+    parser = JsonArrayStream()
+    assert parser.feed('```json\n[{"title": "A", "tags": ["x", "}"]},') == [{"title": "A", "tags": ["x", "}"]}]
+    assert parser.feed(' {"title": "B \\"q\\""') == []
+    assert parser.pending
+    assert parser.feed("}]\n```") == [{"title": 'B "q"'}]
+    assert parser.closed and not parser.pending
+
+
+def test_stream_parser_is_independent_of_chunking():
+    events = [{"title": f"Event {i}", "nested": {"a": [1, 2, {"b": "]"}]}} for i in range(5)]
+    text = "Here you go: " + json.dumps(events)
+    for size in (1, 3, 7, 64, len(text)):
+        parser, out = feed_in_chunks(text, size)
+        assert out == events and parser.closed and parser.errors == 0
+
+
+def test_stream_parser_counts_malformed_objects():
+    parser, out = feed_in_chunks('[{"title": "A",}, {"title": oops}, {"title": "C"}]', 5)
+    assert out == [{"title": "A"}, {"title": "C"}]
+    assert parser.errors == 1
+
+
+def model_events():
+    return [
+        {"title": "Canterbury Christmas Market", "date": future(30), "location": "Canterbury, Kent"},
+        {"title": "Rochester Christmas Market", "date": future(40), "location": "Rochester, Kent"},
+        {"title": "Past Christmas Market", "date": future(-40), "location": "Dover, Kent"},
+    ]
+
+
+def setup(env):
+    env.rules = (
+        f"Canterbury's Christmas market opens on {future(30, '%d %b %Y')} by the Cathedral.\n\n"
+        f"Rochester's Christmas market runs on {future(40, '%d %b %Y')} at the castle.\n"
+    )
+    env.pins = [{"title": "Bluewater Christmas Market", "date": future(10), "location": "Bluewater, Kent"}]
+    env.answer(model_events())
+
+
+async def collect(agen):
+    return [ev async for ev in agen]
+
+
+def test_stream_gives_the_same_events_as_search(search_env):
+    setup(search_env)
+    streamed = asyncio.run(collect(stream_event_search("Kent", "christmas market")))
+
+    search_cache.clear()
+    searched = asyncio.run(smart_event_search("Kent", "christmas market"))
+
+    assert streamed[0]["title"] == "Bluewater Christmas Market"
+    assert {e["title"] for e in streamed} == {e["title"] for e in searched}
+    assert "Past Christmas Market" not in {e["title"] for e in streamed}
+
+
+def test_stream_fills_the_result_cache(search_env):
+    setup(search_env)
+    asyncio.run(collect(stream_event_search("Kent", "christmas market")))
+    searched = asyncio.run(smart_event_search("Kent", "christmas market"))
+
+    assert len(search_env.model.calls) == 1
+    assert [e["title"] for e in searched][0] == "Bluewater Christmas Market"
+
+
+def test_stream_endpoint_sends_ndjson(search_env):
+    setup(search_env)
+    r = request("POST", "/search/stream", json={"region": "Kent", "keywords": "christmas market"})
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [e["title"] for e in lines][0] == "Bluewater Christmas Market"
+    assert len(lines) == 3
+
+
+def test_stream_endpoint_reports_late_errors(search_env):
+    setup(search_env)
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("model down")
+
+    search_env.model.create = broken
+    r = request("POST", "/search/stream", json={"region": "Kent", "keywords": "christmas market"})
+
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines[0]["title"] == "Bluewater Christmas Market"
+    assert lines[-1] == {"error": "model down"}
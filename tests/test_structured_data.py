@@ -0,0 +1,120 @@
+import json
+
+from bs4 import BeautifulSoup
+
+from backend.ai.structured_data import extract_structured_events
+
+URL = "https://www.eventbrite.co.uk/e/123"
+
+
+def page(head="", body=""):
+    return f"<html><head>{head}</head><body>{body}</body></html>"
+
+
+def jsonld(data):
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+
+def test_jsonld_event():
+    html = page(jsonld({
+        "@context": "https://schema.org",
+        "@type": "MusicEvent",
+        "name": "Winter Folk Night",
+        "startDate": "2026-12-12T19:00:00+00:00",
+        "endDate": "2026-12-12T23:00:00+00:00",
+        "location": {
+            "@type": "Place",
+            "name": "The Forum",
+            "address": {"streetAddress": "9-17 Highgate Road", "addressLocality": "London"},
+        },
+        "description": "<p>An evening of <b>folk</b></p>",
+        "url": "https://example.org/folk",
+    }))
+
+    assert extract_structured_events(html, URL) == [{
+        "title": "Winter Folk Night",
+        "date": "2026-12-12",
+        "location": "The Forum, 9-17 Highgate Road, London",
+        "description": "An evening of folk",
+        "url": "https://example.org/folk",
+        "category": "music",
+        "source": "jsonld",
+    }]
+
+
+def test_jsonld_graph_and_item_lists():
+    html = page(jsonld({
+        "@graph": [
+            {"@type": "WebPage", "name": "What's on"},
+            {"@type": "ItemList", "itemListElement": [
+                {"@type": "ListItem", "item": {"@type": "Festival", "name": "Food Fest", "startDate": "2026-07-01", "endDate": "2026-07-03"}},
+                {"@type": "ListItem", "item": {"@type": "SaleEvent", "name": "Vintage Sale", "startDate": "2026-08-01"}},
+            ]},
+        ],
+    }))
+
+    events = extract_structured_events(html, URL)
+    assert [(e["title"], e["date"], e["category"], e["url"]) for e in events] == [
+        ("Food Fest", "2026-07-01 to 2026-07-03", "festival", URL),
+        ("Vintage Sale", "2026-08-01", "market", URL),
+    ]
+
+
+def test_invalid_jsonld_and_duplicates_are_skipped():
+    event = {"@type": "Event", "name": "Craft Fair", "startDate": "2026-05-05"}
+    html = page(
+        '<script type="application/ld+json">{not json</script>'
+        + jsonld(event) + jsonld([event, {"@type": "Event", "name": ""}])
+    )
+    assert [e["title"] for e in extract_structured_events(html, URL)] == ["Craft Fair"]
+
+
+def test_microdata_event():
+    html = page(body="""
+      <div itemscope itemtype="https://schema.org/Event">
+        <h1 itemprop="name">Riverside Market</h1>
+        <time itemprop="startDate" datetime="2026-06-06">6 June</time>
+        <div itemprop="location" itemscope itemtype="https://schema.org/Place">
+          <span itemprop="name">Riverside Park</span>
+          <span itemprop="address">Maidstone</span>
+        </div>
+        <p itemprop="description">Local producers</p>
+      </div>
+    """)
+
+    assert extract_structured_events(html, URL) == [{
+        "title": "Riverside Market",
+        "date": "2026-06-06",
+        "location": "Riverside Park, Maidstone",
+        "description": "Local producers",
+        "url": URL,
+        "category": "event",
+        "source": "microdata",
+    }]
+
+
+def test_opengraph_event():
+    html = page(head="""
+      <meta property="og:type" content="event">
+      <meta property="og:title" content="Dover Fete">
+      <meta property="event:start_time" content="2026-08-01T10:00">
+      <meta property="event:location" content="Dover Castle">
+    """)
+    events = extract_structured_events(html, URL)
+    assert [(e["title"], e["date"], e["location"], e["source"]) for e in events] == [
+        ("Dover Fete", "2026-08-01", "Dover Castle", "opengraph"),
+    ]
+
+
+def test_plain_page_has_no_structured_events():
+    html = page(
+        '<meta property="og:type" content="website"><meta property="og:title" content="Home">',
+        "<h1>Events</h1><p>Christmas market, 12 Dec 2026</p>",
+    )
+    assert extract_structured_events(html, URL) == []
+    assert extract_structured_events("", URL) == []
+
+
+def test_accepts_a_parsed_page():
+    soup = BeautifulSoup(page(jsonld({"@type": "Event", "name": "Fair", "startDate": "2026-05-05"})), "html.parser")
+    assert [e["title"] for e in extract_structured_events(soup, URL)] == ["Fair"]
@@ -0,0 +1,52 @@
+import datetime
+
+from backend.ai import validator
+from backend.ai.validator import check_event, url_is_trusted, validate_events
+
+TODAY = datetime.date(2026, 1, 10)
+
+
+def event(**fields):
+    ev = {"title": "Winter Craft Show", "date": "20 Jan 2026", "url": "https://www.eventbrite.co.uk/e/1"}
+    ev.update(fields)
+    return ev
+
+
+def test_trusted_urls():
+    assert url_is_trusted("https://tickets.excel.london/show")
+    assert url_is_trusted("www.eventbrite.co.uk/e/123")
+    assert url_is_trusted("https://visitbrighton.com/whats-on")
+    assert not url_is_trusted("https://excel.london.example.com/")
+    assert not url_is_trusted("https://randomblog.net/post")
+    assert not url_is_trusted("short")
+    assert not url_is_trusted(None)
+
+
+def test_check_event_rules():
+    assert check_event(event(), TODAY) is None
+    assert check_event("not an event", TODAY) == "invalid"
+    assert check_event(event(date="soon"), TODAY) == "no_date"
+    assert check_event(event(date="2 Jan 2026"), TODAY) == "past"
+    assert check_event(event(title="Retro Gaming Weekend"), TODAY) == "banned"
+    assert check_event(event(url="https://randomblog.net/post"), TODAY) == "untrusted_url"
+    # recurring events are allowed without a trusted URL
+    assert check_event(event(title="Winter Food Festival", url=""), TODAY) is None
+
+
+def test_event_is_kept_until_its_last_day():
+    assert check_event(event(date="28 Dec – 10 Jan 2026"), TODAY) is None
+    assert check_event(event(date="Dec 2025 - Jan 2026"), TODAY) is None
+    assert check_event(event(date="Nov - Dec 2025"), TODAY) == "past"
+
+
+def test_validate_events_counts_rejections(monkeypatch):
+    monkeypatch.setattr(validator, "_totals", validator.Counter())
+    kept, rejected = validate_events(
+        [event(), event(date="2 Jan 2026"), event(date="soon"), event(date="3 Jan 2026")],
+        TODAY,
+    )
+
+    assert kept == [event()]
+    assert rejected == {"past": 2, "no_date": 1}
+    stats = validator.validator_stats()
+    assert stats["checked"] == 4 and stats["kept"] == 1 and stats["past"] == 2